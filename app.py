@@ -1,15 +1,21 @@
+import functools
+import os
 import streamlit as st
-import pandas as pd
-import numpy as np
-from passing_network import PassingNetwork
-from player_visualization import PlayerVisualization
-from positional_map import PositionalMap
-from clubs import clubs_list, clubs_ids
 from st_files_connection import FilesConnection
-from utils import find_clubs, check_card_type, calculate_expected_threat
+from game_analyzer import PassingNetwork, PassingNetworkAnimation, PlayerVisualization, PositionalMap, PressingTimeline
+from game_analyzer import League, load_league_events, open_league_store, select_team_events, get_match_context
+from game_analyzer.data import league_events_path
+from game_analyzer.prefetch import Prefetcher
+from game_analyzer.cache import cache_key
+from game_analyzer.rendering import encode_preview, release_figure, render_chart
+from game_analyzer.search import search_index
+from game_analyzer.game_state import GAME_STATES, game_state_timeline
 
 st.set_page_config(page_title='Game Analyzer')
 
+# Local folder with the league csv files (ex: for the load tests), the leagues are loaded from AWS S3 if not set
+DATA_DIR = os.environ.get("GAME_ANALYZER_DATA_DIR")
+
 ## Display analysis logo in the sidebar
 col1, col2, col3 = st.sidebar.columns(3)
 with col1:
@@ -31,68 +37,162 @@ st.sidebar.markdown("<h1 style='text-align: center; color: white;'>{}</h1>".form
 
 ## User league selection
 st.sidebar.markdown("<h2 style='text-align: center; color: white;'>Team performance</h2>", unsafe_allow_html=True)
-league = st.sidebar.selectbox('Select a league', ["Bundesliga", "Champions League", "Eredivisie", "EPL", "Jupiler Pro League", "La Liga", "Liga Nos", "Ligue 1", "Serie A"])
+leagues = ["Bundesliga", "Champions League", "Eredivisie", "EPL", "Jupiler Pro League", "La Liga", "Liga Nos", "Ligue 1", "Serie A"]
+if DATA_DIR is not None:
+    leagues = [league for league in leagues if os.path.exists(league_events_path(league, DATA_DIR))]
+
+# Load league data in AWS S3 bucket (or in DATA_DIR), refreshed every 10 mins.
+# The league is held once per host in a memory-mapped Arrow file shared by all the sessions (no per-session copy),
+# normalized and indexed by game once per data load.
+@st.cache_resource(ttl=600)
+def load_league_s3(league):
+    if DATA_DIR is not None:
+        load_events = lambda: load_league_events(league_events_path(league, DATA_DIR))
+    else:
+        conn = st.connection('s3', type=FilesConnection)
+        load_events = lambda: conn.read("footballanalytics/csv_data/{league}_2025_events.csv".format(league=league), input_format="csv", ttl=600)
+    return League(league, open_league_store(league, load_events, max_age=600))
+
+# One prefetcher per server, loading the next games and the recent leagues in the background
+@st.cache_resource
+def get_prefetcher():
+    return Prefetcher(load_league_s3)
+
+## Search a player or a club in all the leagues, and open one of its games
+search = st.sidebar.text_input("Search a player or a club")
+# The leagues are indexed once their store is built on the host, all of them are loaded in the background (prefetch_leagues)
+# A league whose load failed is loaded again on the next rerun
+not_indexed = [league for league in leagues if league not in search_index().leagues]
+failed = [league for league in not_indexed if league in get_prefetcher().failed_leagues]
+loading = [league for league in not_indexed if league not in failed]
+if loading:
+    st.sidebar.caption("Not searchable yet (loading): {}".format(", ".join(loading)))
+if failed:
+    st.sidebar.caption("Not searchable (load failed, retrying): {}".format(", ".join(failed)))
+if search:
+    results = [result for result in search_index().search(search, k=10) if result["league"] in leagues]
+    if results:
+        labels = ["{} ({}, {})".format(result["name"], result["club"].replace("-", " "), result["league"]) if result["kind"] == "player"
+                  else "{} ({})".format(result["name"], result["league"]) for result in results]
+        result = results[labels.index(st.sidebar.selectbox("Results", labels))]
+        game_ids = {"{} ({})".format(game["game"], game["date"].split("T")[0]): game["game_id"] for game in result["games"]}
+        searched_game_id = game_ids[st.sidebar.selectbox("Games", list(game_ids))]
+        if st.sidebar.button("Open the game"):
+            # The selections are applied to the selectboxes below, before they are created
+            st.session_state["league"] = result["league"]
+            st.session_state["searched"] = (searched_game_id, result["club"], result["name"] if result["kind"] == "player" else None)
+    else:
+        st.sidebar.info("No player or club found")
+
+league = st.sidebar.selectbox('Select a league', leagues, key="league")
 
 # Unused: load csv from folder
 @st.cache_data
 def load_dataframe(league):
-    return pd.read_csv("csv_data/{league}_events.csv".format(league=league.replace(" ", "_")))
+    return load_league_events("csv_data/{league}_events.csv".format(league=league.replace(" ", "_")))
 
-# Load league data in AWS S3 bucket, cached for 10 mins.
-@st.cache_data
-def load_dataframe_s3(league):
-    conn = st.connection('s3', type=FilesConnection)
-    df = conn.read("footballanalytics/csv_data/{league}_2025_events.csv".format(league=league), input_format="csv", ttl=600)
-    return df
-
-## Load data in df and select the events from the game chose by the user
-df = load_dataframe_s3(league)
-df = df.sort_values(by="date")
-df['game'] = df['game'].apply(lambda x: '-'.join(word.capitalize() for word in x.split('-')))
-game = st.sidebar.selectbox("Select a game", df["game"].unique())
-events_df = df[df["game"] == game].reset_index()
+## Chart quality: the previews are encoded for the client viewport, the full quality images (dpi 400) are kept in the render cache
+PROGRESSIVE, PREVIEW, FULL_QUALITY = "Preview first, full quality after", "Preview, full quality on demand", "Full quality"
+# The viewport of the client is not sent to the server: the embedding page can give it in the url (?width=1280&pixel_ratio=2)
+viewport_width = int(st.query_params.get("width", 0)) or None
+pixel_ratio = float(st.query_params.get("pixel_ratio", 2))
+# Charts displayed as previews, replaced by their full quality image once all the charts are displayed
+pending_charts = []
+
+# Display a chart (full quality if already in the render cache), its figure is not kept from one rerun to the next
+def display_chart(key, build):
+    placeholder = st.empty()
+    if quality == FULL_QUALITY or render_chart.is_cached(key, build):
+        image = render_chart(key, build)
+        placeholder.image(image)
+        if quality == PREVIEW:
+            st.download_button("Download", image, file_name="{}.png".format(key[1]), key="download-{}".format(key[1:]))
+        return
+    fig = build()
+    placeholder.image(encode_preview(fig, viewport_width, pixel_ratio))
+    if quality == PROGRESSIVE:
+        pending_charts.append((placeholder, key, fig))
+    elif st.button("Full quality", key="full-quality-{}".format(key[1:])):
+        placeholder.image(render_chart(key, lambda: fig))
+    else:
+        release_figure(fig)
+
+## Load data and select the events from the game chose by the user
+league_data = load_league_s3(league)
+searched = st.session_state.pop("searched", None)
+if searched is not None:
+    searched_game_id, searched_club, searched_player = searched
+    st.session_state["game"] = {game_id: label for label, game_id in league_data.game_ids.items()}[searched_game_id]
+game = st.sidebar.selectbox("Select a game", league_data.game_names(), key="game")
 
 ## Data Preprocessing
-events_df["league"] = league.replace("_", " ")
-ids = [events_df.loc[0, "team_id"], events_df.loc[1, "team_id"]]
-clubs = find_clubs(events_df.loc[0, "game"], clubs_list)
-# Determine the order of the clubs in the string
-club_order = [events_df.loc[0, "game"].index(club) for club in clubs]
-# Reorganise the clubs list according to this order
-clubs_sorted = [club for _, club in sorted(zip(club_order, clubs))]
-team_ids = {value: key for key, value in clubs_ids.items()}
-events_df["team_name"] = events_df["team_id"].apply(lambda x: team_ids[x])
-events_df["h_a"] = events_df["team_name"].apply(lambda x: 'h' if x == clubs_sorted[0] else 'a')
-events_df["qualifiers"] = events_df["qualifiers"].apply(lambda x: eval(x))
-events_df['cardType'] = events_df.apply(lambda row: check_card_type(row['qualifiers']) if row['type_name'] == 'Card' else None, axis=1)
-events_df['xT_added'] = events_df.apply(calculate_expected_threat, axis=1)
-events_df = events_df.rename(columns={'start_x': 'x', 'start_y': 'y'})
+game_id = league_data.game_ids[game]
+events_df, clubs_sorted = league_data.game_events(game_id)
+# Game details shared by all the charts (clubs, score, date, logos)
+context = get_match_context(events_df)
+
+# Leagues visited in this session, most recent first
+recent_leagues = [league] + [other for other in st.session_state.get("recent_leagues", []) if other != league][:2]
+st.session_state["recent_leagues"] = recent_leagues
 
 # Display the length of the match
 max_minute = events_df["minute"].max()
 minutes = st.sidebar.slider('Select the game timelapse', 0, max_minute, (0, max_minute))
+# Passing network of all the windows of the game at once, instead of dragging the slider window by window
+animate = st.sidebar.checkbox('Animate the passing network (15 minutes windows)')
+# Events of each team only while it was leading, drawing or trailing
+state = st.sidebar.selectbox("Game state", ["Whole game"] + [state.capitalize() for state in GAME_STATES])
+state = state.lower() if state != "Whole game" else None
+quality = st.sidebar.radio("Chart quality", [PROGRESSIVE, PREVIEW, FULL_QUALITY])
 
 ## Display the team performance visualisations
 st.markdown("<h2 style='text-align: center; color: black;'>Team performance</h2>", unsafe_allow_html=True)
 
-passing_network = PassingNetwork(events_df, mins=minutes)
-st.pyplot(passing_network.plot_passing_network())
+passing_network = PassingNetwork(events_df, mins=minutes, context=context, state=state)
+display_chart(cache_key(events_df, "passing-network", minutes, state),  passing_network.plot_passing_network)
+
+if animate:
+    st.image(PassingNetworkAnimation(events_df, context=context, state=state).encode_animation())
+
+positional_map = PositionalMap(events_df=events_df , mins= minutes, context=context, state=state)
+display_chart(cache_key(events_df, "positional-map", minutes, state), positional_map.plot_positional_map)
 
-positional_map = PositionalMap(events_df=events_df , mins= minutes)
-st.pyplot(positional_map.plot_positional_map())
+pressing_timeline = PressingTimeline(events_df, minutes, context=context, pressing=league_data.game_pressing(game_id), state=state)
+display_chart(cache_key(events_df, "pressing-timeline", minutes, state), pressing_timeline.plot_pressing_timeline)
 
 ## Display the player filters
 st.sidebar.markdown("<h2 style='text-align: center; color: white;'>Player performance</h2>", unsafe_allow_html=True)
-club = st.sidebar.selectbox("Select a club", clubs_sorted)
+if searched is not None:
+    st.session_state["club"] = searched_club
+club = st.sidebar.selectbox("Select a club", clubs_sorted, key="club")
+# Game state timeline from the goals of both teams, before selecting the player events
+timeline = game_state_timeline(events_df)
 # Select only the player events
-events_df = events_df[events_df["team_name"] == club].reset_index(drop=True)
-player = st.sidebar.selectbox("Select a player", sorted([x for x in events_df["player_name"].unique() if isinstance(x, str)]))
+events_df = select_team_events(events_df, club)
+if searched is not None and searched_player is not None:
+    st.session_state["player"] = searched_player
+player = st.sidebar.selectbox("Select a player", sorted([x for x in events_df["player_name"].unique() if isinstance(x, str)]), key="player")
 
 ## Display the player performance visualisations
-player_viz = PlayerVisualization(events_df, player, minutes, club)
+player_viz = PlayerVisualization(events_df, player, minutes, club, context=context, percentiles=league_data.season_percentiles(),
+                                 state=state, timeline=timeline)
 st.markdown("<h2 style='text-align: center; color: black;'>Player performance</h2>", unsafe_allow_html=True)
-st.pyplot(player_viz.plot_passes_game())
-st.pyplot(player_viz.plot_heatmap_game())
-st.pyplot(player_viz.plot_dribbles())
-st.pyplot(player_viz.plot_shotmap_player())
-st.pyplot(player_viz.plot_game_player_defensive())
+for chart in PlayerVisualization.charts:
+    display_chart(cache_key(events_df, chart, minutes, player, league_data.version, state), functools.partial(player_viz.plot_chart, chart))
+
+## Display the players of the league with the most similar season profile
+st.markdown("<h2 style='text-align: center; color: black;'>Similar players</h2>", unsafe_allow_html=True)
+try:
+    similar_players = league_data.similar_players(player, club)
+    st.dataframe(similar_players[["team_name", "player_name", "games", "minutes", "similarity"]], hide_index=True, use_container_width=True)
+except LookupError as e:
+    st.info(str(e))
+
+## Replace the previews with the full quality images, once all the charts are displayed
+for placeholder, key, fig in pending_charts:
+    placeholder.image(render_chart(key, lambda: fig))
+
+## Prefetch the games around the displayed one and the recent leagues while the user reads the charts
+get_prefetcher().prefetch(league, game_id, recent_leagues[1:])
+# Build the stores of all the leagues for the search, again after a failed load or the stores max age
+get_prefetcher().prefetch_leagues(leagues)
@@ -0,0 +1,103 @@
+"""
+Concurrency check of the chart rendering: render the charts of different games in parallel threads and check that
+each image is identical to the one rendered alone.
+
+Usage:
+    python benchmarks/concurrency_check.py --data-dir csv_data --league "Ligue 1" --games 4 --workers 4
+
+The reference images are rendered one after the other, then the same charts are rendered again in a thread pool,
+in a shuffled order so that the charts of different games overlap. The check fails if an image differs from its
+reference (a title, a score, a logo or a legend scale leaking from another game).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+def chart_jobs(league_data, games):
+    """
+    Get the charts to render: the team charts and the player charts of the first games of the league.
+
+    Parameters:
+    - league_data (League): The league.
+    - games (int): The number of games.
+
+    Returns:
+    - list: The charts, as (game id, chart, player, club, mins) tuples.
+    """
+    from game_analyzer import select_team_events, PlayerVisualization
+
+    jobs = []
+    for game_id in list(league_data.game_ids.values())[:games]:
+        events_df, clubs_sorted = league_data.game_events(game_id)
+        mins = (0, int(events_df["minute"].max()))
+        jobs += [(game_id, "passing-network", None, None, mins), (game_id, "positional-map", None, None, mins)]
+        for club in clubs_sorted:
+            player = select_team_events(events_df, club)["player_name"].dropna().iloc[0]
+            jobs += [(game_id, chart, player, club, mins) for chart in PlayerVisualization.charts]
+    return jobs
+
+def render(league_data, game_id, chart, player, club, mins):
+    """
+    Render a chart in png, with a match context of its own as the app and the API do.
+
+    Returns:
+    - bytes: The encoded image.
+    """
+    from game_analyzer import PassingNetwork, PositionalMap, PlayerVisualization, get_match_context, select_team_events
+    from game_analyzer.rendering import encode_figure
+
+    events_df, _ = league_data.game_events(game_id)
+    context = get_match_context(events_df)
+    if chart == "passing-network":
+        fig = PassingNetwork(events_df, mins, context=context).plot_passing_network()
+    elif chart == "positional-map":
+        fig = PositionalMap(events_df, mins, context=context).plot_positional_map()
+    else:
+        fig = PlayerVisualization(select_team_events(events_df, club), player, mins, club, context=context).plot_chart(chart)
+    return encode_figure(fig, "png")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="csv_data")
+    parser.add_argument("--league", required=True)
+    parser.add_argument("--games", type=int, default=4, help="Number of games rendered concurrently")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=2, help="Number of concurrent renderings of all the charts")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import matplotlib
+    matplotlib.use("Agg")
+    from game_analyzer import League, load_league_events, open_league_store
+    from game_analyzer.data import league_events_path
+
+    league_data = League(args.league, open_league_store(args.league, lambda: load_league_events(league_events_path(args.league, args.data_dir))))
+    jobs = chart_jobs(league_data, args.games)
+
+    ## Reference images, rendered one after the other
+    start = time.perf_counter()
+    references = [render(league_data, *job) for job in jobs]
+    print(f"{len(jobs)} charts of {args.games} games rendered sequentially in {time.perf_counter() - start:.1f}s")
+
+    ## Same charts rendered in parallel threads, in a shuffled order
+    order = list(range(len(jobs))) * args.rounds
+    random.Random(args.seed).shuffle(order)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        images = list(executor.map(lambda index: render(league_data, *jobs[index]), order))
+    print(f"{len(order)} charts rendered by {args.workers} threads in {time.perf_counter() - start:.1f}s")
+
+    mismatches = sorted({jobs[index][:4] for index, image in zip(order, images) if image != references[index]})
+    for game_id, chart, player, club in mismatches:
+        print(f"MISMATCH game {game_id} {chart} {player or ''} {club or ''}")
+    assert not mismatches, f"{len(mismatches)} charts differ from their sequential rendering"
+    print("OK")
+
+if __name__ == "__main__":
+    main()
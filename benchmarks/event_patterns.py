@@ -0,0 +1,94 @@
+"""
+Event sequence patterns over a season: the vectorized pattern search compared with a custom pandas query per game.
+
+Usage:
+    python benchmarks/event_patterns.py --data-dir csv_data --league "Ligue 1"
+
+The pandas reference chains pd.merge_asof (the next event of each step by the same team) game by game, with the
+same constraints and the same matching semantics as game_analyzer.patterns, and the matches are checked to be the
+same events.
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+def pandas_matches(df, masks, within):
+    """
+    Search a pattern with pandas, game by game (all the steps in the same possession).
+
+    Parameters:
+    - df (pd.DataFrame): The league events, with a row column (the row in the league store).
+    - masks (list): The boolean mask of each step.
+    - within (float): The maximum number of seconds between the first step and the last one.
+
+    Returns:
+    - set: The matched rows of the steps (tuples), the latest start kept for the starts sharing the next steps.
+    """
+    matches = set()
+    for _, game_df in df.groupby("game_id", sort=False):
+        game_masks = [mask[game_df.index] for mask in masks]
+        partial = game_df.loc[game_masks[0], ["row", "team_id", "possession_id", "clock"]].rename(columns={"row": "step_0"})
+        partial["start_clock"] = partial["clock"]
+        for k, mask in enumerate(game_masks[1:], start=1):
+            step = game_df.loc[mask, ["row", "team_id", "possession_id", "clock"]].rename(columns={"row": f"step_{k}", "possession_id": "next_possession", "clock": "next_clock"})
+            step["key"] = step[f"step_{k}"]
+            partial["key"] = partial[f"step_{k - 1}"]
+            partial = pd.merge_asof(partial.sort_values("key"), step.sort_values("key"), on="key", by="team_id",
+                                    direction="forward", allow_exact_matches=False)
+            partial = partial[(partial["next_possession"] == partial["possession_id"]) & (partial["next_clock"] - partial["start_clock"] <= within)]
+            partial = partial.drop(columns=["next_possession", "clock", "key"]).rename(columns={"next_clock": "clock"})
+            partial[f"step_{k}"] = partial[f"step_{k}"].astype(np.int64)
+        last = partial.sort_values("step_0").groupby("step_1" if len(masks) > 1 else "step_0").tail(1)
+        matches.update(map(tuple, last[[f"step_{k}" for k in range(len(masks))]].to_numpy(dtype=np.int64).tolist()))
+    return matches
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="csv_data")
+    parser.add_argument("--league", required=True)
+    parser.add_argument("--within", type=float, default=10)
+    args = parser.parse_args()
+
+    from game_analyzer import League, load_league_events, open_league_store, pattern, where
+    from game_analyzer.bitmaps import THIRDS_X
+    from game_analyzer.data import league_events_path
+
+    league_data = League(args.league, open_league_store(args.league, lambda: load_league_events(league_events_path(args.league, args.data_dir))))
+    df = league_data.store.to_pandas()
+    df["row"] = np.arange(len(df))
+
+    start = time.perf_counter()
+    matcher = league_data.pattern_matcher()
+    print(f"matcher build {time.perf_counter() - start:8.3f}s  {len(df)} events, {len(league_data.games)} games")
+
+    is_pass = ((df["type_name"] == "Pass") & (df["outcome"] == True)).to_numpy()
+    patterns = {
+        "pass final third -> take-on -> shot": (
+            pattern(where(type_name="Pass", outcome=True, end_third="final"), where(type_name="TakeOn"), where(shot=True), within=args.within),
+            [is_pass & (df["end_x"] >= THIRDS_X[2]).to_numpy(), (df["type_name"] == "TakeOn").to_numpy(), (df["shot"] == True).to_numpy()]),
+        "recovery -> shot": (
+            pattern(where(type_name="BallRecovery"), where(shot=True), within=args.within),
+            [(df["type_name"] == "BallRecovery").to_numpy(), (df["shot"] == True).to_numpy()]),
+        "pass -> pass -> pass -> shot": (
+            pattern(where(type_name="Pass", outcome=True), where(type_name="Pass", outcome=True), where(type_name="Pass", outcome=True), where(shot=True), within=args.within),
+            [is_pass, is_pass, is_pass, (df["shot"] == True).to_numpy()]),
+    }
+    print(f"{'pattern':<38}{'matches':>8}{'patterns (ms)':>15}{'pandas (ms)':>13}")
+    for name, (event_pattern, masks) in patterns.items():
+        start = time.perf_counter()
+        matches = matcher.match(event_pattern)
+        pattern_time = time.perf_counter() - start
+        start = time.perf_counter()
+        reference = pandas_matches(df, masks, args.within)
+        pandas_time = time.perf_counter() - start
+        assert set(map(tuple, matches.tolist())) == reference, name
+        print(f"{name:<38}{len(matches):>8}{pattern_time * 1000:>15.1f}{pandas_time * 1000:>13.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Season event queries on the bitmap index compared with boolean scans of the event columns.
+
+Usage:
+    python benchmarks/event_queries.py --data-dir csv_data --league "Ligue 1" --players 50
+
+For players of the league, the successful take-ons in the final third, the defensive actions and the shots of the
+season are selected with the bitmap index (League.event_index) and with pandas boolean scans of the whole season
+frame. The results are checked to be the same rows.
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+DEFENSIVE_ACTIONS = ["Tackle", "Interception", "BlockedPass", "Clearance", "Aerial"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="csv_data")
+    parser.add_argument("--league", required=True)
+    parser.add_argument("--players", type=int, default=50)
+    args = parser.parse_args()
+
+    from game_analyzer import League, load_league_events, open_league_store, where
+    from game_analyzer.bitmaps import THIRDS_X
+    from game_analyzer.data import league_events_path
+
+    league_data = League(args.league, open_league_store(args.league, lambda: load_league_events(league_events_path(args.league, args.data_dir))))
+    df = league_data.store.to_pandas()
+    players = df["player_name"].dropna().unique()[:args.players]
+
+    start = time.perf_counter()
+    index = league_data.event_index()
+    print(f"index build {time.perf_counter() - start:8.3f}s  {index.num_rows} events")
+
+    queries = {
+        "take-ons final third": (lambda player: where(type_name="TakeOn", outcome=True, third="final", player_name=player),
+                                 lambda player: (df["type_name"] == "TakeOn") & (df["outcome"] == True) & (df["start_x"] >= THIRDS_X[2]) & (df["player_name"] == player)),
+        "defensive actions": (lambda player: where(type_name=DEFENSIVE_ACTIONS, outcome=True, player_name=player),
+                              lambda player: df["type_name"].isin(DEFENSIVE_ACTIONS) & (df["outcome"] == True) & (df["player_name"] == player)),
+        "shots": (lambda player: where(shot=True, player_name=player),
+                  lambda player: (df["shot"] == True) & (df["player_name"] == player)),
+    }
+    print(f"{'query':<24}{'bitmaps (ms)':>14}{'scans (ms)':>12}")
+    for name, (query, scan) in queries.items():
+        start = time.perf_counter()
+        rows = [index.rows(query(player)) for player in players]
+        bitmap_time = time.perf_counter() - start
+        start = time.perf_counter()
+        masks = [scan(player).fillna(False).to_numpy() for player in players]
+        scan_time = time.perf_counter() - start
+        assert all(np.array_equal(row_ids, np.flatnonzero(mask)) for row_ids, mask in zip(rows, masks)), name
+        print(f"{name:<24}{bitmap_time / len(players) * 1000:>14.3f}{scan_time / len(players) * 1000:>12.3f}")
+
+if __name__ == "__main__":
+    main()
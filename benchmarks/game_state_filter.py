@@ -0,0 +1,107 @@
+"""
+Game state filter of the charts: interval slice of the goal timeline against a state computed event by event.
+
+Usage:
+    python benchmarks/game_state_filter.py --data-dir csv_data --league "Ligue 1" --repeat 20
+
+For every game of the league and every game state, the events of a minute window are selected with state_window
+(binary searches of the timeline intervals in the clock column) and with the game state of each event computed
+again from the goals (add_game_state on the game then a boolean mask), and both selections are checked equal.
+The game_state column of the whole season, written at ingest in the league store, is also timed.
+
+With --heatmaps, the player heat map is drawn for every player of every game in every game state (a state with
+few events of the player gives few locations, drawn as a scatter when a density cannot be estimated) and the
+failed charts are listed.
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="csv_data")
+    parser.add_argument("--league", required=True)
+    parser.add_argument("--mins", type=int, nargs=2, default=(15, 75), help="Minute window of the charts")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--heatmaps", action="store_true", help="Draw the heat map of every player in every game state")
+    args = parser.parse_args()
+
+    from game_analyzer import League, load_league_events, open_league_store
+    from game_analyzer.clock import window
+    from game_analyzer.data import league_events_path
+    from game_analyzer.game_state import GAME_STATES, GameStateTimeline, add_game_state, goal_events, state_window
+
+    league_data = League(args.league, open_league_store(args.league, lambda: load_league_events(league_events_path(args.league, args.data_dir))))
+    games = [league_data.game_events(game["game_id"])[0] for game in league_data.games]
+
+    slice_times, recompute_times, mismatches = [], [], 0
+    for events_df in games:
+        team_ids = events_df.loc[events_df["team_id"].notnull(), "team_id"].unique()
+        events = window(events_df, args.mins)
+        for state in GAME_STATES:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                # The timeline is built for each selection, as for a game not seen yet
+                sliced = state_window(window(events_df, args.mins), GameStateTimeline(team_ids, goal_events(events_df)), state)
+            slice_times.append((time.perf_counter() - start) / args.repeat)
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                with_state = add_game_state(events_df.drop(columns="game_state").copy())
+                recomputed = window(with_state, args.mins)
+                recomputed = recomputed[(recomputed["game_state"] == state).to_numpy()]
+            recompute_times.append((time.perf_counter() - start) / args.repeat)
+            mismatches += not np.array_equal(sliced.index.to_numpy(), recomputed.index.to_numpy())
+            mismatches += not np.array_equal(sliced.index.to_numpy(), events[(events["game_state"] == state).to_numpy()].index.to_numpy())
+
+    print(f"interval slice           p50 {np.median(slice_times) * 1e3:7.3f}ms  max {max(slice_times) * 1e3:7.3f}ms")
+    print(f"state per event          p50 {np.median(recompute_times) * 1e3:7.3f}ms  max {max(recompute_times) * 1e3:7.3f}ms")
+    print(f"mismatches               {mismatches} / {len(slice_times) * 2} selections ({len(games)} games)")
+
+    df = league_data.store.table.drop(["game_state"]).to_pandas()
+    start = time.perf_counter()
+    add_game_state(df)
+    print(f"season game_state column {time.perf_counter() - start:8.3f}s  ({len(df)} events)")
+
+    if args.heatmaps:
+        draw_heatmaps(games, args.mins)
+
+def draw_heatmaps(games, mins):
+    """
+    Draw the heat map of every player of the games in every game state, and print the failed charts.
+
+    Parameters:
+    - games (list): The prepared events of the games.
+    - mins (tuple): The minute window of the charts.
+    """
+    from game_analyzer import PlayerVisualization, get_match_context, select_team_events
+    from game_analyzer.game_state import GAME_STATES, game_state_timeline
+    from game_analyzer.rendering import release_figure
+
+    draw_times, failures = [], []
+    for events_df in games:
+        context, timeline = get_match_context(events_df), game_state_timeline(events_df)
+        for club in events_df["team_name"].dropna().unique():
+            team_events = select_team_events(events_df, club)
+            for player in sorted(x for x in team_events["player_name"].unique() if isinstance(x, str)):
+                for state in GAME_STATES:
+                    viz = PlayerVisualization(team_events, player, mins, club, context=context, state=state, timeline=timeline)
+                    start = time.perf_counter()
+                    try:
+                        release_figure(viz.plot_heatmap_game())
+                    except Exception as e:
+                        failures.append(f"{context.game_id} {player} {state}: {type(e).__name__}: {e}")
+                    draw_times.append(time.perf_counter() - start)
+
+    print(f"heat maps                p50 {np.median(draw_times) * 1e3:7.1f}ms  max {max(draw_times) * 1e3:7.1f}ms")
+    print(f"failed heat maps         {len(failures)} / {len(draw_times)}")
+    for failure in failures:
+        print(f"  {failure}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Measure the cold-start import time of the core library with `python -X importtime`.
+
+Usage:
+    python benchmarks/import_time.py [--runs 5]
+
+Each scenario is imported in a fresh interpreter, the cumulative time of the top-level imports
+is summed and the median over the runs is reported.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "core library (batch / API path)": "import game_analyzer; from game_analyzer import PassingNetwork, PositionalMap, PlayerVisualization, prepare_game_events",
+    "core library + plotting dependencies (first chart)": "from game_analyzer import PassingNetwork; import matplotlib.pyplot, mplsoccer.pitch, seaborn, fuzzywuzzy.process, PIL.Image",
+    "streamlit app shell": "import streamlit, st_files_connection; from game_analyzer import PassingNetwork, PositionalMap, PlayerVisualization, prepare_game_events",
+}
+
+def import_time_ms(statement):
+    """
+    Import a statement in a fresh interpreter and sum the cumulative time of the top-level imports.
+
+    Parameters:
+    - statement (string): The python import statement.
+
+    Returns:
+    - float: The import time in milliseconds.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # nested imports are indented, only count the top-level ones
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for scenario, statement in SCENARIOS.items():
+        timings = [import_time_ms(statement) for _ in range(args.runs)]
+        print(f"{scenario:<55} median {statistics.median(timings):8.1f} ms  (min {min(timings):.1f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Weekly data refresh with the per-game content hashes: only the new and corrected games are prepared again.
+
+Usage:
+    python benchmarks/incremental_refresh.py --data-dir csv_data --league "Ligue 1" --new-games 10 --corrected-games 1
+
+The league store is first built without its latest games and all the caches are warmed (game events, season cube,
+pressing metrics, similar players index, league percentiles). The refresh then brings the latest games (the new matchweek) and a
+correction of some earlier games, and the number of games still cached and the duration of the season aggregates
+are reported, compared with the same computations on cold caches.
+When the refresh adds more than store.XG_REFIT_GROWTH shots to the league, the xG model is refitted and the xG of
+most games change: with a small league file, lower --new-games to see the incremental refresh.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+def warm(league_data):
+    """
+    Compute the game events and the season aggregates of a league.
+
+    Returns:
+    - float: The duration in seconds.
+    """
+    start = time.perf_counter()
+    for game_id in league_data.game_ids.values():
+        league_data.game_events(game_id)
+    league_data.season_cube()
+    league_data.season_pressing()
+    league_data.similarity_index()
+    league_data.season_percentiles()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="csv_data")
+    parser.add_argument("--league", required=True)
+    parser.add_argument("--new-games", type=int, default=10)
+    parser.add_argument("--corrected-games", type=int, default=1)
+    args = parser.parse_args()
+
+    from game_analyzer import League, load_league_events, open_league_store
+    from game_analyzer.data import league_events_path
+
+    events = load_league_events(league_events_path(args.league, args.data_dir))
+    game_ids = list(events.sort_values("date", kind="stable")["game_id"].unique())
+    # At least one game before the refresh, and the corrected games are not new games
+    new_games = max(min(args.new_games, len(game_ids) - 1), 0)
+    corrected_games = min(args.corrected_games, len(game_ids) - new_games)
+    latest, corrected = game_ids[len(game_ids) - new_games:], game_ids[:corrected_games]
+    refreshed = events.copy()
+    # Correction of the earlier games: the outcome of their first pass is fixed
+    for game_id in corrected:
+        row = refreshed.index[(refreshed["game_id"] == game_id).to_numpy() & (refreshed["type_name"] == "Pass").to_numpy()][0]
+        refreshed.at[row, "outcome"] = not refreshed.at[row, "outcome"]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        before = League(args.league, open_league_store(args.league, lambda: events[~events["game_id"].isin(latest)], cache_dir=cache_dir))
+        warm(before)
+
+        start = time.perf_counter()
+        after = League(args.league, open_league_store(args.league, lambda: refreshed, cache_dir=cache_dir, max_age=0))
+        store_time = time.perf_counter() - start
+        is_cached = League.game_events.is_cached
+        cached = sum(is_cached(after, game_id) for game_id in after.game_ids.values())
+        changed = [game_id for game_id, game_hash in after.game_hashes.items() if before.game_hashes.get(game_id) != game_hash]
+        print(f"refresh: {len(after.games)} games, {len(changed)} new or corrected, {cached} still cached, store rebuilt in {store_time:.2f}s")
+        incremental_time = warm(after)
+
+        for function in [League.game_events, League.season_cube, League.season_pressing, League.similarity_index, League.season_percentiles]:
+            function.cache_clear()
+        from game_analyzer.cache import _game_results
+        _game_results.clear()
+        from game_analyzer.percentiles import _league_percentiles
+        _league_percentiles.clear()
+        cold_time = warm(after)
+        print(f"games and season aggregates: {incremental_time:.2f}s after the refresh, {cold_time:.2f}s on cold caches")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+League percentiles of the per-90 player metrics: accuracy of the quantile sketches, incremental fold and lookups.
+
+Usage:
+    python benchmarks/league_percentiles.py --data-dir csv_data --league "Ligue 1" --new-games 10 --stream 1000000
+
+The accuracy is the largest gap between the percentile given by a sketch and the exact percentile (midrank in the
+sorted values), over the player games of the league and over a stream of --stream values resampled from them (the
+league alone is often smaller than the sketch, which is then exact). The fold is measured by building the sketches
+without the latest games (as if they were the new matchweek of the weekly refresh) and folding them in, compared
+with a rebuild of the sketches from all the observations.
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+def exact_percentiles(values, points):
+    """
+    Get the exact percentiles of points in values, the values equal to a point counted for half.
+
+    Returns:
+    - np.array: The percentiles (0 to 100).
+    """
+    values = np.sort(values)
+    return (np.searchsorted(values, points, side="left") + np.searchsorted(values, points, side="right")) / 2 / len(values) * 100
+
+def max_error(sketch, values):
+    """
+    Get the largest percentile error of a sketch of values, at the percentiles of the values.
+
+    Returns:
+    - float: The largest error, in percentile points.
+    """
+    points = np.unique(np.quantile(values, np.linspace(0, 1, 101)))
+    return float(np.max(np.abs([sketch.percentile(point) for point in points] - exact_percentiles(values, points))))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="csv_data")
+    parser.add_argument("--league", required=True)
+    parser.add_argument("--new-games", type=int, default=10, help="Number of latest games folded into the sketches")
+    parser.add_argument("--stream", type=int, default=1000000, help="Number of resampled values of the large stream")
+    parser.add_argument("--lookups", type=int, default=10000)
+    args = parser.parse_args()
+
+    from game_analyzer import League, load_league_events, open_league_store
+    from game_analyzer.cache import game_results
+    from game_analyzer.data import league_events_path
+    from game_analyzer.percentiles import METRICS, LeaguePercentiles, QuantileSketch
+
+    league_data = League(args.league, open_league_store(args.league, lambda: load_league_events(league_events_path(args.league, args.data_dir))))
+    start = time.perf_counter()
+    league_data.season_percentiles()
+    print(f"observations + sketches  {time.perf_counter() - start:8.3f}s  {len(league_data.games)} games")
+    observations = game_results("percentiles", args.league).update(league_data.game_hashes, lambda game_ids: {})
+    folded = {game_id: (league_data.game_hashes[game_id], game_df) for game_id, game_df in observations.items()}
+
+    start = time.perf_counter()
+    full = LeaguePercentiles().fold(folded)
+    rebuild_time = time.perf_counter() - start
+    latest = [game["game_id"] for game in league_data.games[-args.new_games:]]
+    previous = LeaguePercentiles().fold({game_id: result for game_id, result in folded.items() if game_id not in latest})
+    start = time.perf_counter()
+    previous.fold({game_id: result for game_id, result in folded.items() if game_id in latest})
+    print(f"rebuild                  {rebuild_time:8.3f}s")
+    print(f"fold of {len(latest):<3} new games     {time.perf_counter() - start:8.3f}s")
+
+    values = pd.concat(observations.values(), ignore_index=True)
+    errors = [max_error(full.sketches[("all", metric)], values[metric].to_numpy(dtype=float)) for metric in METRICS]
+    print(f"league max error         {max(errors):8.2f} percentile points  ({len(values)} player games)")
+
+    rng = np.random.default_rng(0)
+    for metric in ["passes_p90", "xg_p90"]:
+        stream = rng.choice(values[metric].to_numpy(dtype=float), size=args.stream) * rng.lognormal(0, 0.1, size=args.stream)
+        # Built in chunks and merged, as the games of the successive refreshes
+        sketch = QuantileSketch()
+        for chunk in np.array_split(stream, 100):
+            sketch = sketch.merge(QuantileSketch().update(chunk))
+        print(f"stream {metric:<17} {max_error(sketch, stream):8.2f} percentile points  ({args.stream} values in {sum(len(level) for level in sketch.levels)} items)")
+
+    sketch = full.sketches[("all", "passes_p90")]
+    points = rng.uniform(0, values["passes_p90"].max(), size=args.lookups)
+    latencies = []
+    for point in points:
+        start = time.perf_counter()
+        sketch.percentile(point)
+        latencies.append(time.perf_counter() - start)
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1e6
+    print(f"lookup                   p50 {p50:.1f}us  p99 {p99:.1f}us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Load test of the HTTP API: p50 / p90 / p99 latency per endpoint under concurrent clients.
+
+Usage:
+    # start a local API on a data directory and load test it
+    python benchmarks/load_test_api.py --data-dir csv_data --league "Ligue 1" --requests 200 --concurrency 16
+
+    # or load test an API which is already running
+    python benchmarks/load_test_api.py --url http://127.0.0.1:8080 --league "Ligue 1"
+
+The requests are drawn from a small set of games / players, so identical concurrent requests are
+coalesced by the API: use --games to widen the set of distinct requests.
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import quote
+import numpy as np
+import aiohttp
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHARTS = ["passes", "heatmap", "dribbles", "shotmap", "defensive"]
+
+async def wait_until_ready(session, url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(f"{url}/games", params={"league": "ping"}) as response:
+                return
+        except aiohttp.ClientConnectionError:
+            await asyncio.sleep(0.5)
+    raise TimeoutError(f"API not ready after {timeout}s on {url}")
+
+async def build_requests(session, url, league, n_games):
+    """
+    Build the request pool: the team charts of the first games and the player charts of one player per game.
+    """
+    async with session.get(f"{url}/games", params={"league": league}) as response:
+        response.raise_for_status()
+        games = (await response.json())[:n_games]
+
+    requests = []
+    for game in games:
+        game_id = game["game_id"]
+        requests.append(("passing-network", f"/games/{game_id}/passing-network"))
+        requests.append(("positional-map", f"/games/{game_id}/positional-map"))
+        async with session.get(f"{url}/games/{game_id}/passing-network", params={"league": league, "format": "json"}) as response:
+            stats = await response.json()
+        for team in stats["teams"]:
+            player = team["player_pass_count"][0]["player_name"]
+            for chart in CHARTS:
+                requests.append((f"player/{chart}", f"/players/{quote(player)}/{chart}?game_id={game_id}"))
+    return requests
+
+async def load_test(url, league, n_requests, concurrency, n_games, fmt, seed):
+    latencies = {}
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=600)) as session:
+        await wait_until_ready(session, url)
+        pool = await build_requests(session, url, league, n_games)
+        random.seed(seed)
+        sample = [random.choice(pool) for _ in range(n_requests)]
+
+        async def fetch(endpoint, path):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                async with session.get(f"{url}{path}", params={"league": league, "format": fmt}) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+                latencies.setdefault(endpoint, []).append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[fetch(endpoint, path) for endpoint, path in sample])
+        duration = time.perf_counter() - start
+
+    print(f"{n_requests} requests, concurrency {concurrency}, {len(pool)} distinct requests, {errors} errors")
+    print(f"throughput: {n_requests / duration:.1f} req/s over {duration:.1f}s\n")
+    print(f"{'endpoint':<20}{'count':>7}{'p50 (ms)':>11}{'p90 (ms)':>11}{'p99 (ms)':>11}")
+    all_latencies = []
+    for endpoint, values in sorted(latencies.items()):
+        all_latencies.extend(values)
+        p50, p90, p99 = np.percentile(np.array(values) * 1000, [50, 90, 99])
+        print(f"{endpoint:<20}{len(values):>7}{p50:>11.0f}{p90:>11.0f}{p99:>11.0f}")
+    p50, p90, p99 = np.percentile(np.array(all_latencies) * 1000, [50, 90, 99])
+    print(f"{'all':<20}{len(all_latencies):>7}{p50:>11.0f}{p90:>11.0f}{p99:>11.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="URL of a running API")
+    parser.add_argument("--data-dir", default=None, help="Start a local API on this data directory")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--league", required=True)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--games", type=int, default=3, help="Number of games in the request pool")
+    parser.add_argument("--format", default="png", choices=["png", "svg", "json"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if (args.url is None) == (args.data_dir is None):
+        parser.error("Give either --url or --data-dir")
+
+    server = None
+    url = args.url
+    if args.data_dir is not None:
+        command = [sys.executable, "-m", "game_analyzer.api", "--data-dir", args.data_dir, "--port", str(args.port)]
+        if args.workers:
+            command += ["--workers", str(args.workers)]
+        server = subprocess.Popen(command, cwd=ROOT_DIR, stdout=subprocess.DEVNULL)
+        url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        asyncio.run(load_test(url.rstrip("/"), args.league, args.requests, args.concurrency, args.games, args.format, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Load test of the streamlit app: N simulated user sessions against a local data directory, with the latency of each
+interaction (p50 / p90 / p99), the CPU usage and the resident memory of the process.
+
+Usage:
+    # 8 sessions making 10 random choices each (league, game, timelapse, club, player), and record the trace
+    python benchmarks/load_test_app.py --data-dir csv_data --sessions 8 --interactions 10 --record trace.jsonl
+
+    # replay a recorded trace, to compare two versions of the app on the same interactions
+    python benchmarks/load_test_app.py --data-dir csv_data --replay trace.jsonl
+
+The sessions are driven by streamlit's AppTest in one process, as the sessions of a server share its process:
+the caches (st.cache_resource, memoized analyses, league stores) and the CPU are shared. Each session runs in its
+own thread and waits --think seconds between two interactions. A trace is a JSON lines file with one interaction
+per line: {"session": 0, "widget": "game", "value": "...", "think": 1.0}.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from soak_rendering import rss_mb
+
+# Label of the app widget changed by each interaction, "open" is the first run of a session
+WIDGETS = {"league": ("selectbox", "Select a league"),
+           "game": ("selectbox", "Select a game"),
+           "timelapse": ("slider", "Select the game timelapse"),
+           "club": ("selectbox", "Select a club"),
+           "player": ("selectbox", "Select a player")}
+# Relative frequency of the interactions of the generated sessions
+WIDGET_WEIGHTS = {"league": 1, "game": 4, "timelapse": 3, "club": 1, "player": 3}
+
+def share_runtime():
+    """
+    Let several AppTest run at the same time in one process.
+
+    AppTest installs a mock streamlit runtime for each run and removes it at the end of the run, which breaks the
+    other sessions running at that time: the runtime is installed once for all the sessions instead.
+    """
+    from unittest.mock import MagicMock
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.testing.v1 import app_test
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    # The runtime set and removed by AppTest goes to a subclass, the shared runtime stays in place
+    app_test.Runtime = type("SessionRuntime", (Runtime,), {})
+
+def find_widget(at, widget):
+    """
+    Find the app widget of an interaction.
+
+    Parameters:
+    - at (AppTest): The session.
+    - widget (string): The interaction widget, one of WIDGETS.
+
+    Returns:
+    - streamlit.testing.v1.element_tree.Widget: The widget, None if the app does not display it.
+    """
+    kind, label = WIDGETS[widget]
+    return next((element for element in getattr(at.sidebar, kind) if element.label == label), None)
+
+def random_value(at, widget, rng):
+    """
+    Draw the value of an interaction among the current options of its widget.
+
+    Returns:
+    - The widget value (a list for the timelapse), None if the widget is not displayed.
+    """
+    element = find_widget(at, widget)
+    if element is None:
+        return None
+    if widget == "timelapse":
+        start, end = sorted(rng.sample(range(int(element.min), int(element.max) + 1), 2))
+        return [start, end]
+    return rng.choice(element.options)
+
+class Session:
+    """
+    A simulated user session, running its interactions in a thread.
+    """
+    def __init__(self, session_id, interactions, timeout):
+        """
+        Parameters:
+        - session_id (int): The session id.
+        - interactions (list or int): The interactions to replay, or the number of random interactions.
+        - timeout (float): The maximum duration of a run of the app.
+        """
+        from streamlit.testing.v1 import AppTest
+
+        self.session_id = session_id
+        self.interactions = interactions
+        self.at = AppTest.from_file(os.path.join(ROOT_DIR, "app.py"), default_timeout=timeout)
+        self.results = []
+        self.trace = []
+
+    def interact(self, widget, value, think):
+        """
+        Apply an interaction and rerun the app, recording its latency.
+        """
+        time.sleep(think)
+        error = None
+        start = time.perf_counter()
+        try:
+            if widget != "open":
+                element = find_widget(self.at, widget)
+                if element is None:
+                    raise LookupError(f"Widget {widget} not displayed")
+                element.set_value(tuple(value) if widget == "timelapse" else value)
+            self.at.run()
+            if len(self.at.exception):
+                error = self.at.exception[0].message
+        except Exception as exception:
+            error = repr(exception)
+        self.results.append((widget, time.perf_counter() - start, error))
+        self.trace.append({"session": self.session_id, "widget": widget, "value": value, "think": think})
+
+    def run(self, think, seed):
+        """
+        Run the session: the recorded interactions, or random ones.
+
+        Parameters:
+        - think (float): The mean time between two random interactions, in seconds.
+        - seed (int): The seed of the random interactions.
+        """
+        if isinstance(self.interactions, list):
+            for interaction in self.interactions:
+                self.interact(interaction["widget"], interaction.get("value"), interaction.get("think", 0))
+            return
+        rng = random.Random(seed)
+        self.interact("open", None, 0)
+        widgets = list(WIDGET_WEIGHTS)
+        for _ in range(self.interactions):
+            widget = rng.choices(widgets, weights=[WIDGET_WEIGHTS[widget] for widget in widgets])[0]
+            value = random_value(self.at, widget, rng)
+            if value is not None:
+                self.interact(widget, value, round(rng.expovariate(1 / think), 2) if think else 0)
+
+class ResourceMonitor:
+    """
+    Sample the resident memory of the process in a background thread, and measure its CPU time.
+    """
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+
+    def sample(self):
+        while not self.stopped.wait(self.interval):
+            self.samples.append(rss_mb())
+
+    def __enter__(self):
+        self.rss_start = rss_mb()
+        self.cpu_start = time.process_time()
+        self.wall_start = time.perf_counter()
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+        self.cpu = time.process_time() - self.cpu_start
+        self.wall = time.perf_counter() - self.wall_start
+        self.samples.append(rss_mb())
+
+def print_report(sessions, monitor):
+    results = [result for session in sessions for result in session.results]
+    errors = [(widget, error) for widget, _, error in results if error is not None]
+    latencies = {}
+    for widget, latency, error in results:
+        if error is None:
+            latencies.setdefault(widget, []).append(latency)
+
+    print(f"{len(sessions)} sessions, {len(results)} interactions, {len(errors)} errors, {monitor.wall:.1f}s")
+    print(f"cpu: {monitor.cpu:.1f}s, {100 * monitor.cpu / monitor.wall:.0f}% of a core ({os.cpu_count()} cores)")
+    print(f"rss: {monitor.rss_start:.0f} MB at start, {max(monitor.samples):.0f} MB peak, {monitor.samples[-1]:.0f} MB at the end\n")
+    print(f"{'interaction':<14}{'count':>7}{'p50 (ms)':>11}{'p90 (ms)':>11}{'p99 (ms)':>11}")
+    all_latencies = []
+    for widget, values in sorted(latencies.items()):
+        all_latencies.extend(values)
+        p50, p90, p99 = np.percentile(np.array(values) * 1000, [50, 90, 99])
+        print(f"{widget:<14}{len(values):>7}{p50:>11.0f}{p90:>11.0f}{p99:>11.0f}")
+    if all_latencies:
+        p50, p90, p99 = np.percentile(np.array(all_latencies) * 1000, [50, 90, 99])
+        print(f"{'all':<14}{len(all_latencies):>7}{p50:>11.0f}{p90:>11.0f}{p99:>11.0f}")
+    for widget, error in errors[:10]:
+        print(f"ERROR {widget}: {error}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="csv_data", help="Local folder with the league csv files")
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--interactions", type=int, default=10, help="Random interactions per session")
+    parser.add_argument("--think", type=float, default=1.0, help="Mean time between two interactions of a session (s)")
+    parser.add_argument("--replay", default=None, help="Replay the interactions of a trace file")
+    parser.add_argument("--record", default=None, help="Record the interactions in a trace file")
+    parser.add_argument("--timeout", type=float, default=300, help="Maximum duration of a run of the app (s)")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="Interval of the memory samples (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # The app reads the leagues in the local folder instead of the S3 bucket
+    os.environ["GAME_ANALYZER_DATA_DIR"] = os.path.abspath(args.data_dir)
+    os.chdir(ROOT_DIR)
+    import matplotlib
+    matplotlib.use("Agg")
+    from streamlit.logger import set_log_level
+    set_log_level("error")
+    share_runtime()
+
+    if args.replay is not None:
+        with open(args.replay) as trace:
+            interactions = [json.loads(line) for line in trace if line.strip()]
+        session_ids = sorted({interaction["session"] for interaction in interactions})
+        sessions = [Session(session_id, [interaction for interaction in interactions if interaction["session"] == session_id], args.timeout)
+                    for session_id in session_ids]
+    else:
+        sessions = [Session(session_id, args.interactions, args.timeout) for session_id in range(args.sessions)]
+
+    threads = [threading.Thread(target=session.run, args=(args.think, args.seed + session.session_id)) for session in sessions]
+    with ResourceMonitor(args.sample_interval) as monitor:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    print_report(sessions, monitor)
+    if args.record is not None:
+        with open(args.record, "w") as trace:
+            for session in sessions:
+                for interaction in session.trace:
+                    trace.write(json.dumps(interaction) + "\n")
+
+if __name__ == "__main__":
+    main()
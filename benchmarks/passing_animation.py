@@ -0,0 +1,61 @@
+"""
+Cost of the windowed passing network animation compared with static passing network renders.
+
+Usage:
+    python benchmarks/passing_animation.py --data-dir csv_data --league "Ligue 1" --games 3 --window 15 --step 5
+
+For each game, the full-match animation (PassingNetworkAnimation, gif) is compared with:
+- one static render of the whole game (PassingNetwork, png at 400 dpi),
+- the static renders of all the windows of the animation, the cost of dragging the minute slider window by window.
+The animation should take about as long as a couple of static renders.
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="csv_data")
+    parser.add_argument("--league", required=True)
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--window", type=int, default=15)
+    parser.add_argument("--step", type=int, default=5)
+    parser.add_argument("--dpi", type=int, default=100, help="Resolution of the animation frames")
+    args = parser.parse_args()
+
+    import matplotlib
+    matplotlib.use("Agg")
+    from game_analyzer import League, PassingNetwork, load_league_events, open_league_store
+    from game_analyzer.data import league_events_path
+    from game_analyzer.passing_animation import PassingNetworkAnimation
+    from game_analyzer.rendering import encode_figure
+
+    league_data = League(args.league, open_league_store(args.league, lambda: load_league_events(league_events_path(args.league, args.data_dir))))
+
+    print(f"{'game':>10}{'frames':>8}{'animation (s)':>15}{'static (s)':>12}{'static windows (s)':>20}{'ratio':>8}")
+    for game_id in list(league_data.game_ids.values())[:args.games]:
+        events_df, _ = league_data.game_events(game_id)
+
+        start = time.perf_counter()
+        animation = PassingNetworkAnimation(events_df, args.window, args.step)
+        animation.encode_animation(dpi=args.dpi)
+        animation_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        encode_figure(PassingNetwork(events_df, (0, int(events_df["minute"].max()))).plot_passing_network(), "png")
+        static_time = time.perf_counter() - start
+
+        frames = animation.windows.frames
+        start = time.perf_counter()
+        for mins in frames.itertuples(index=False):
+            encode_figure(PassingNetwork(events_df, (int(mins.start), int(mins.end))).plot_passing_network(), "png")
+        windows_time = time.perf_counter() - start
+
+        print(f"{game_id:>10}{len(frames):>8}{animation_time:>15.2f}{static_time:>12.2f}{windows_time:>20.2f}{animation_time / static_time:>8.1f}")
+
+if __name__ == "__main__":
+    main()
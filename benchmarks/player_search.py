@@ -0,0 +1,92 @@
+"""
+Latency and accuracy of the player and club search index, compared with fuzzywuzzy.process.extractOne over all the names.
+
+Usage:
+    python benchmarks/player_search.py --data-dir csv_data --leagues "Ligue 1" "EPL" --queries 1000
+
+The league stores are built (or opened) first, the index is built from their search manifests. The queries are
+player names of the leagues with a typo (a letter removed, doubled or swapped) and accents added, the hit rate is
+the share of the queries whose player is the first result.
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+ACCENTS = {"a": "á", "e": "é", "i": "í", "o": "ö", "u": "ü", "c": "ç", "n": "ñ"}
+
+def misspell(name, rng):
+    """
+    Add a typo and an accent to a name.
+
+    Parameters:
+    - name (string): The name.
+    - rng (np.random.Generator): The random generator.
+
+    Returns:
+    - string: The misspelled name.
+    """
+    k = int(rng.integers(1, max(len(name) - 1, 2)))
+    typo = int(rng.integers(3))
+    if typo == 0:
+        name = name[:k] + name[k + 1:]
+    elif typo == 1:
+        name = name[:k] + name[k] + name[k:]
+    elif k + 1 < len(name):
+        name = name[:k] + name[k + 1] + name[k] + name[k + 2:]
+    letters = [k for k, char in enumerate(name) if char.lower() in ACCENTS]
+    if letters:
+        k = letters[int(rng.integers(len(letters)))]
+        name = name[:k] + ACCENTS[name[k].lower()] + name[k + 1:]
+    return name
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="csv_data")
+    parser.add_argument("--leagues", nargs="+", required=True)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    from game_analyzer import load_league_events, open_league_store
+    from game_analyzer.data import league_events_path
+    from game_analyzer.search import search_index
+
+    for league in args.leagues:
+        open_league_store(league, lambda: load_league_events(league_events_path(league, args.data_dir)))
+    start = time.perf_counter()
+    index = search_index()
+    players = [entry for entry in index.entries if entry["kind"] == "player"]
+    print(f"index build {time.perf_counter() - start:8.3f}s  {len(players)} players, {len(index.entries) - len(players)} clubs")
+
+    rng = np.random.default_rng(0)
+    targets = [players[k]["name"] for k in rng.integers(len(players), size=args.queries)]
+    queries = [misspell(name, rng) for name in targets]
+
+    latencies, hits = [], 0
+    for query, target in zip(queries, targets):
+        start = time.perf_counter()
+        results = index.search(query, k=10)
+        latencies.append(time.perf_counter() - start)
+        hits += bool(results) and results[0]["name"] == target
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"trigram index   p50 {p50:.3f}ms  p99 {p99:.3f}ms  hit rate {hits / len(queries):.1%}")
+
+    from fuzzywuzzy import process
+
+    names = sorted({entry["name"] for entry in players})
+    count = min(len(queries), 100)
+    latencies, hits = [], 0
+    for query, target in zip(queries[:count], targets[:count]):
+        start = time.perf_counter()
+        match = process.extractOne(query, names)
+        latencies.append(time.perf_counter() - start)
+        hits += match is not None and match[0] == target
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"extractOne      p50 {p50:.3f}ms  p99 {p99:.3f}ms  hit rate {hits / count:.1%} ({count} queries)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Progressive rendering of the charts of a game: time until all the previews are displayed, compared with the full
+quality images (dpi 400), and the encoded sizes.
+
+Usage:
+    python benchmarks/progressive_rendering.py --data-dir csv_data --league "Ligue 1" --width 704 --pixel-ratio 2
+
+The eight charts of the app (team charts and player charts of the first player of the home club) are built once
+each; a preview is encoded for the viewport (rendering.encode_preview), then the full quality image from the same
+figure (rendering.render_chart, kept in the render cache). The figures are built in both modes, so the gain of the
+previews is the encoding time.
+"""
+import argparse
+import functools
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="csv_data")
+    parser.add_argument("--league", required=True)
+    parser.add_argument("--width", type=int, default=None, help="Viewport width in CSS pixels, defaults to rendering.DEFAULT_VIEWPORT_WIDTH")
+    parser.add_argument("--pixel-ratio", type=float, default=2)
+    args = parser.parse_args()
+
+    import matplotlib
+    matplotlib.use("Agg")
+    from game_analyzer import League, PassingNetwork, PlayerVisualization, PositionalMap, PressingTimeline
+    from game_analyzer import get_match_context, load_league_events, open_league_store, select_team_events
+    from game_analyzer.cache import cache_key
+    from game_analyzer.data import league_events_path
+    from game_analyzer.rendering import encode_preview, render_chart, viewport_dpi
+
+    league_data = League(args.league, open_league_store(args.league, lambda: load_league_events(league_events_path(args.league, args.data_dir))))
+    game_id = league_data.games[0]["game_id"]
+    events_df, clubs_sorted = league_data.game_events(game_id)
+    context = get_match_context(events_df)
+    mins = (0, int(events_df["minute"].max()))
+    team_events = select_team_events(events_df, clubs_sorted[0])
+    player = sorted(name for name in team_events["player_name"].unique() if isinstance(name, str))[0]
+    player_viz = PlayerVisualization(team_events, player, mins, clubs_sorted[0], context=context)
+
+    charts = [("passing-network", events_df, PassingNetwork(events_df, mins, context=context).plot_passing_network),
+              ("positional-map", events_df, PositionalMap(events_df, mins, context=context).plot_positional_map),
+              ("pressing-timeline", events_df, PressingTimeline(events_df, mins, context=context, pressing=league_data.game_pressing(game_id)).plot_pressing_timeline)]
+    charts += [(chart, team_events, functools.partial(player_viz.plot_chart, chart)) for chart in PlayerVisualization.charts]
+
+    print(f"{'chart':<20}{'build (s)':>10}{'dpi':>6}{'preview (s)':>13}{'size (kB)':>11}{'full (s)':>10}{'size (kB)':>11}")
+    totals = {"build": 0, "preview": 0, "full": 0}
+    for chart, df, build in charts:
+        start = time.perf_counter()
+        fig = build()
+        build_time = time.perf_counter() - start
+        dpi = viewport_dpi(fig, args.width, args.pixel_ratio)
+        start = time.perf_counter()
+        preview = encode_preview(fig, args.width, args.pixel_ratio)
+        preview_time = time.perf_counter() - start
+        start = time.perf_counter()
+        full = render_chart(cache_key(df, chart, mins, player), lambda: fig)
+        full_time = time.perf_counter() - start
+        totals["build"] += build_time
+        totals["preview"] += preview_time
+        totals["full"] += full_time
+        print(f"{chart:<20}{build_time:>10.2f}{dpi:>6}{preview_time:>13.2f}{len(preview) / 1000:>11.0f}{full_time:>10.2f}{len(full) / 1000:>11.0f}")
+
+    print(f"all the previews displayed after {totals['build'] + totals['preview']:.2f}s, "
+          f"all the full quality images after {totals['build'] + totals['preview'] + totals['full']:.2f}s "
+          f"({totals['build'] + totals['full']:.2f}s without the previews)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Latency of the similar players search: full index build, incremental update after a new matchweek, and queries.
+
+Usage:
+    python benchmarks/similar_players.py --data-dir csv_data --league "Ligue 1" --new-games 10 --queries 1000
+
+The incremental update is measured by dropping the counts of the latest games (as if they were the new matchweek
+of the weekly refresh) and updating the index from the league store.
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="csv_data")
+    parser.add_argument("--league", required=True)
+    parser.add_argument("--new-games", type=int, default=10, help="Number of latest games counted by the incremental update")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--min-minutes", type=int, default=None, help="Defaults to similarity.MIN_MINUTES")
+    args = parser.parse_args()
+
+    from game_analyzer import League, load_league_events, open_league_store, similarity
+    from game_analyzer.cache import game_results
+    from game_analyzer.data import league_events_path
+
+    league_data = League(args.league, open_league_store(args.league, lambda: load_league_events(league_events_path(args.league, args.data_dir))))
+    min_minutes = args.min_minutes if args.min_minutes is not None else similarity.MIN_MINUTES
+
+    counts = game_results("similarity", args.league)
+    counts.results = {}
+    start = time.perf_counter()
+    index = similarity.league_similarity_index(args.league, league_data.store, min_minutes)
+    print(f"full build        {time.perf_counter() - start:8.3f}s  {len(league_data.games)} games, {len(index.players)} players indexed")
+
+    latest = [game["game_id"] for game in league_data.games[-args.new_games:]]
+    counts.results = {game_id: result for game_id, result in counts.results.items() if game_id not in latest}
+    start = time.perf_counter()
+    index = similarity.league_similarity_index(args.league, league_data.store, min_minutes)
+    print(f"incremental       {time.perf_counter() - start:8.3f}s  {len(latest)} new games")
+
+    if len(index.players) < 2:
+        print("Not enough players indexed for the queries, lower --min-minutes")
+        return
+    rng = np.random.default_rng(0)
+    players = index.players.iloc[rng.integers(len(index.players), size=args.queries)]
+    latencies = []
+    for player, club in zip(players["player_name"], players["team_name"]):
+        start = time.perf_counter()
+        index.similar_players(player, club, args.k)
+        latencies.append(time.perf_counter() - start)
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"query top-{args.k:<6}  p50 {p50:.2f}ms  p99 {p99:.2f}ms")
+
+    start = time.perf_counter()
+    index.similar_players_batch(list(zip(players["player_name"], players["team_name"])), args.k)
+    print(f"batch of {args.queries:<8} {time.perf_counter() - start:8.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Soak test of the chart rendering: render many charts in one process and check that the memory stays bounded.
+
+Usage:
+    python benchmarks/soak_rendering.py --data-dir csv_data --league "Ligue 1" --charts 1000
+
+The charts cycle over the games of the league and all the chart types, each one is encoded in png and released
+as the API does. The resident memory is sampled after a warm-up (caches, fonts, logos), the test fails if it
+grows by more than --max-growth-mb over the remaining renders, if a figure is left open in pyplot, or if the
+global rcParams were modified.
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+def rss_mb():
+    """
+    Get the resident memory of the process.
+
+    Returns:
+    - float: The resident memory in MB.
+    """
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def chart_jobs(league_data):
+    """
+    Yield the charts to render endlessly: the team charts and the player charts of each game.
+    """
+    from game_analyzer import select_team_events, PlayerVisualization
+
+    while True:
+        for game_id in league_data.game_ids.values():
+            events_df, clubs_sorted = league_data.game_events(game_id)
+            mins = (0, int(events_df["minute"].max()))
+            yield "passing-network", events_df, None, None, mins
+            yield "positional-map", events_df, None, None, mins
+            club = clubs_sorted[0]
+            club_df = select_team_events(events_df, club)
+            player = club_df["player_name"].dropna().iloc[0]
+            for chart in PlayerVisualization.charts:
+                yield chart, club_df, player, club, mins
+
+def render(chart, events_df, player, club, mins):
+    from game_analyzer import PassingNetwork, PositionalMap, PlayerVisualization
+    from game_analyzer.rendering import encode_figure
+
+    if chart == "passing-network":
+        fig = PassingNetwork(events_df, mins).plot_passing_network()
+    elif chart == "positional-map":
+        fig = PositionalMap(events_df, mins).plot_positional_map()
+    else:
+        fig = PlayerVisualization(events_df, player, mins, club).plot_chart(chart)
+    return encode_figure(fig, "png")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="csv_data")
+    parser.add_argument("--league", required=True)
+    parser.add_argument("--charts", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50, help="Renders before the memory baseline")
+    parser.add_argument("--sample-every", type=int, default=50, help="Renders between two memory samples")
+    parser.add_argument("--max-growth-mb", type=float, default=100)
+    args = parser.parse_args()
+
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib import pyplot as plt
+    from game_analyzer import League, load_league_events, open_league_store
+    from game_analyzer.data import league_events_path
+
+    league_data = League(args.league, open_league_store(args.league, lambda: load_league_events(league_events_path(args.league, args.data_dir))))
+    rc_params = dict(matplotlib.rcParams)
+    jobs = chart_jobs(league_data)
+
+    start = time.perf_counter()
+    baseline = None
+    samples = []
+    for i in range(args.charts):
+        render(*next(jobs))
+        if (i + 1) % args.sample_every == 0 or i + 1 == args.charts:
+            # Collect first, the memory of the released figures is reclaimed by the cycle collector
+            gc.collect()
+            rss = rss_mb()
+            print(f"{i + 1:>6} charts  rss {rss:8.1f} MB  {time.perf_counter() - start:7.1f}s")
+            if baseline is None and i + 1 >= args.warmup:
+                baseline = rss
+            elif baseline is not None:
+                samples.append(rss)
+
+    assert baseline is not None and samples, "Not enough charts after the warm-up to measure the memory growth"
+    growth = max(samples) - baseline
+    open_figures = len(plt.get_fignums())
+    rc_modified = dict(matplotlib.rcParams) != rc_params
+    print(f"\nbaseline {baseline:.1f} MB after the warm-up, max growth {growth:.1f} MB, "
+          f"{open_figures} figures open in pyplot, rcParams modified: {rc_modified}")
+
+    assert growth <= args.max_growth_mb, f"Memory grew by {growth:.1f} MB (limit {args.max_growth_mb} MB)"
+    assert open_figures == 0, f"{open_figures} figures left open in pyplot"
+    assert not rc_modified, "The global rcParams were modified by the rendering"
+    print("OK")
+
+if __name__ == "__main__":
+    main()
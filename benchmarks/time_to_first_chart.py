@@ -0,0 +1,108 @@
+"""
+Time to first chart of a fresh instance: cold, with a restored cache snapshot, and after the warm-up.
+
+Usage:
+    python benchmarks/time_to_first_chart.py --data-dir csv_data --league "Ligue 1" --snapshot-age 86400
+
+Each scenario runs in a new process with an empty cache folder and an empty matplotlib folder, as a new container:
+- cold: the first chart pays for the imports, the csv parse, the Arrow file, the font scan and the logo scans.
+- snapshot: the cache snapshot is restored first (game_analyzer.warmup.restore_snapshot), as the streamlit app at
+  container start.
+- warm: the snapshot is restored and the process is warmed (game_analyzer.warmup.warm_up) before the first chart,
+  as an API rendering process started with --warm-up.
+The first chart is the first screen of the app, the passing network and the positional map of the latest game.
+The league stores are opened with the max_age of the app, and the snapshot files are dated --snapshot-age seconds
+ago, as a snapshot built with the container image.
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ["cold", "snapshot", "warm"]
+# Maximum age of the league stores of the app (app.py)
+APP_MAX_AGE = 600
+
+def child(scenario, data_dir, league, snapshot_dir, max_age):
+    """
+    Run a scenario in the current (new) process and print its timings as JSON.
+    """
+    start = time.perf_counter()
+    sys.path.insert(0, ROOT_DIR)
+    from game_analyzer import warmup
+
+    if scenario != "cold":
+        warmup.restore_snapshot(snapshot_dir)
+    import matplotlib
+    matplotlib.use("Agg")
+    from game_analyzer import League, PassingNetwork, PositionalMap, load_league_events, open_league_store
+    from game_analyzer.data import league_events_path
+    from game_analyzer.rendering import encode_figure
+
+    load_league = lambda league: League(league, open_league_store(league, lambda: load_league_events(league_events_path(league, data_dir)),
+                                                                  max_age=max_age))
+    if scenario == "warm":
+        warmup.warm_up(load_league, [league])
+    ready = time.perf_counter()
+
+    league_data = load_league(league)
+    events_df, _ = league_data.game_events(list(league_data.game_ids.values())[-1])
+    mins = (0, int(events_df["minute"].max()))
+    encode_figure(PassingNetwork(events_df, mins).plot_passing_network(), "png")
+    encode_figure(PositionalMap(events_df, mins).plot_positional_map(), "png")
+    done = time.perf_counter()
+    print(json.dumps({"startup": ready - start, "first_chart": done - ready}))
+
+def run_scenario(scenario, data_dir, league, snapshot_dir, max_age):
+    """
+    Run a scenario in a new process, with empty caches.
+
+    Returns:
+    - dict: The startup (restore and warm-up) and first chart durations in seconds, and the process total.
+    """
+    with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as mpl_dir:
+        env = dict(os.environ, GAME_ANALYZER_CACHE_DIR=cache_dir, MPLCONFIGDIR=mpl_dir)
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, __file__, "--child", scenario, "--data-dir", data_dir, "--league", league,
+                                 "--snapshot", snapshot_dir, "--max-age", str(max_age)], env=env, check=True, capture_output=True, text=True).stdout
+        timings = json.loads(output.strip().splitlines()[-1])
+        timings["total"] = time.perf_counter() - start
+        return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="csv_data")
+    parser.add_argument("--league", required=True)
+    parser.add_argument("--snapshot", default=None, help="Snapshot folder, built in a temporary folder if not given")
+    parser.add_argument("--max-age", type=int, default=APP_MAX_AGE, help="Maximum age of the league stores in seconds")
+    parser.add_argument("--snapshot-age", type=int, default=3600, help="Age given to the snapshot files built by the benchmark, in seconds")
+    parser.add_argument("--child", default=None, choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    data_dir = os.path.abspath(args.data_dir)
+
+    if args.child is not None:
+        child(args.child, data_dir, args.league, args.snapshot, args.max_age)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot_dir = args.snapshot or os.path.join(tmp_dir, "snapshot")
+        if args.snapshot is None:
+            subprocess.run([sys.executable, "-m", "game_analyzer.warmup", "--data-dir", data_dir, "--leagues", args.league,
+                            "--create-snapshot", snapshot_dir], cwd=ROOT_DIR, check=True, capture_output=True,
+                           env=dict(os.environ, GAME_ANALYZER_CACHE_DIR=tmp_dir))
+            built = time.time() - args.snapshot_age
+            for path in glob.glob(os.path.join(snapshot_dir, "**", "*"), recursive=True):
+                os.utime(path, (built, built))
+
+        print(f"{'scenario':<10}{'startup (s)':>13}{'first chart (s)':>17}{'process (s)':>13}")
+        for scenario in SCENARIOS:
+            timings = run_scenario(scenario, data_dir, args.league, snapshot_dir, args.max_age)
+            print(f"{scenario:<10}{timings['startup']:>13.2f}{timings['first_chart']:>17.2f}{timings['total']:>13.2f}")
+
+if __name__ == "__main__":
+    main()
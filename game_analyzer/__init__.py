@@ -0,0 +1,54 @@
+"""
+Game Analyzer core library: data preparation and visualisations of a game, without any streamlit dependency.
+
+The visualisation classes are loaded on first access so that importing the package stays cheap,
+matplotlib, mplsoccer, seaborn, fuzzywuzzy and PIL are only imported when a chart is drawn.
+"""
+import importlib
+
+_lazy_attributes = {
+    "PassingNetwork": "passing_network",
+    "PositionalMap": "positional_map",
+    "PlayerVisualization": "player_visualization",
+    "PressingTimeline": "pressing_timeline",
+    "PassingNetworkAnimation": "passing_animation",
+    "league_events_path": "data",
+    "load_league_events": "data",
+    "normalize_league_events": "data",
+    "prepare_game_events": "data",
+    "select_team_events": "data",
+    "get_path_logo": "logos",
+    "League": "league",
+    "LeagueStore": "store",
+    "open_league_store": "store",
+    "game_lineups": "lineups",
+    "players_on_pitch": "lineups",
+    "window": "clock",
+    "clock_window": "clock",
+    "game_cube": "cube",
+    "cube_slice": "cube",
+    "SimilarityIndex": "similarity",
+    "QuantileSketch": "percentiles",
+    "LeaguePercentiles": "percentiles",
+    "BitmapIndex": "bitmaps",
+    "where": "bitmaps",
+    "EventPattern": "patterns",
+    "pattern": "patterns",
+    "SearchIndex": "search",
+    "search_index": "search",
+    "GameStateTimeline": "game_state",
+    "game_state_timeline": "game_state",
+    "state_window": "game_state",
+    "MatchContext": "context",
+    "get_match_context": "context",
+}
+
+__all__ = list(_lazy_attributes)
+
+def __getattr__(name):
+    if name not in _lazy_attributes:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{_lazy_attributes[name]}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,466 @@
+"""
+Asynchronous HTTP API serving the game charts as images (png / svg) or as the underlying JSON statistics.
+
+Usage:
+    python -m game_analyzer.api --data-dir csv_data --port 8080 --workers 4 --warm-up "Ligue 1" "EPL"
+
+Endpoints (all of them take a `league` query parameter):
+    GET /games
+    GET /games/{game_id}/passing-network?start=0&end=90&state=...&format=png|svg|json&width=...&pixel_ratio=...
+    GET /games/{game_id}/positional-map?start=0&end=90&state=...&format=png|svg|json&width=...&pixel_ratio=...
+    GET /games/{game_id}/pressing-timeline?start=0&end=90&state=...&format=png|svg|json&width=...&pixel_ratio=...
+    GET /players/{name}/{chart}?game_id=...&start=0&end=90&state=...&format=png|svg|json&width=...&pixel_ratio=...
+    GET /players/{name}/similar?club=...&k=10
+    GET /search?q=...&k=10&kind=player|club (all the leagues with a store on the host, no league parameter)
+
+The rendering is CPU bound, so it runs in a process pool. Concurrent identical requests are coalesced
+into a single render (single-flight).
+
+The chart endpoints take an optional `state` (leading, drawing or trailing): only the events of each team while it
+was in this game state are used.
+
+With a `width` (the CSS pixels available to the chart in the client) and a `pixel_ratio` (the device pixel ratio,
+1 by default), a png is a low resolution preview for this viewport, fast to encode and to download: a client can
+display it first and request the full quality image (without width) afterwards or on download. The encoded images
+are kept in the render cache of each rendering process, keyed on the content hash of the game.
+"""
+import argparse
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from aiohttp import web
+from .context import get_match_context
+from .data import league_events_path, load_league_events, select_team_events
+from .game_state import GAME_STATES, game_state_timeline
+from .league import League
+from .cache import cache_key
+from .rendering import render_chart
+from .store import open_league_store
+
+IMAGE_FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+FORMATS = list(IMAGE_FORMATS) + ["json"]
+# Maximum age of the league stores in seconds, as in the app: a data refresh is served within 10 minutes
+STORE_MAX_AGE = 600
+
+## Worker side: everything below runs in the process pool
+
+def init_worker(data_dir=None, warm_up_leagues=()):
+    """
+    Initialize a rendering process with a non-interactive matplotlib backend, and warm its caches: the pool runs
+    the initializer in each process before its first job, so that no request is served by a cold process.
+
+    Parameters:
+    - data_dir (string): The folder (or fsspec url) with the league csv files.
+    - warm_up_leagues (list): The leagues warmed in the process, no warm-up if empty.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    if warm_up_leagues:
+        warm_up_worker(data_dir, list(warm_up_leagues))
+
+def worker_pid():
+    """
+    Get the process id of a rendering process, to wait for the start of all the processes of the pool.
+
+    Returns:
+    - int: The process id.
+    """
+    # Held briefly, so that the concurrent calls spread over the idle processes
+    time.sleep(0.05)
+    return os.getpid()
+
+# Leagues opened by the worker process: (data_dir, league) -> (time of the last store check, League)
+opened_leagues = {}
+
+def get_league(data_dir, league):
+    """
+    Open the memory-mapped league events, shared by all the worker processes of the host.
+    The store is checked every STORE_MAX_AGE seconds, as in the app: it is rebuilt from the league csv file when
+    older (weekly refresh), and the League is replaced when the store of the host has another data version (rebuilt
+    by this process or by another one), so that only the new or corrected games are computed again.
+
+    Parameters:
+    - data_dir (string): The folder (or fsspec url) with the league csv files.
+    - league (string): The league name.
+
+    Returns:
+    - League: The league events and its game index.
+    """
+    checked, league_data = opened_leagues.get((data_dir, league), (None, None))
+    if checked is not None and time.time() - checked < STORE_MAX_AGE:
+        return league_data
+    store = open_league_store(league, lambda: load_league_events(league_events_path(league, data_dir)), max_age=STORE_MAX_AGE)
+    if league_data is None or store.version != league_data.version:
+        league_data = League(league, store)
+    opened_leagues[(data_dir, league)] = (time.time(), league_data)
+    return league_data
+
+def get_game_events(data_dir, league, game_id):
+    """
+    Get the prepared events of a game, cached in each worker process by the league.
+
+    Parameters:
+    - data_dir (string): The folder (or fsspec url) with the league csv files.
+    - league (string): The league name.
+    - game_id (int): The game id.
+
+    Returns:
+    - pd.DataFrame: The events of the game, ready for the visualisations.
+    - list: The two clubs of the game, home club first.
+    """
+    return get_league(data_dir, league).game_events(game_id)
+
+def warm_up_worker(data_dir, leagues):
+    """
+    Warm the caches of a rendering process before its first request (see game_analyzer.warmup).
+
+    Parameters:
+    - data_dir (string): The folder (or fsspec url) with the league csv files.
+    - leagues (list): The league names.
+
+    Returns:
+    - dict: The duration of each warm-up step in seconds.
+    """
+    from .warmup import warm_up
+
+    return warm_up(functools.partial(get_league, data_dir), leagues)
+
+def list_games(data_dir, league):
+    """
+    List the games of a league.
+
+    Parameters:
+    - data_dir (string): The folder (or fsspec url) with the league csv files.
+    - league (string): The league name.
+
+    Returns:
+    - list: The games (id, name, date and score), ordered by date.
+    """
+    return [{"game_id": game["game_id"], "game": game["game"], "date": game["date"], "score": game["score"].replace(":", "-")}
+            for game in get_league(data_dir, league).games]
+
+def find_similar_players(data_dir, league, player, club, k):
+    """
+    Find the players of a league most similar to a player over the season.
+
+    Parameters:
+    - data_dir (string): The folder (or fsspec url) with the league csv files.
+    - league (string): The league name.
+    - player (string): The player name.
+    - club (string): The club of the player, None for the first club of the player.
+    - k (int): The number of similar players.
+
+    Returns:
+    - list: The similar players (team, player, games, minutes, similarity and the season features), most similar first.
+    """
+    similar_players = get_league(data_dir, league).similar_players(player, club, k)
+    return similar_players.drop(columns=["league"]).to_dict(orient="records")
+
+def search_players(query, k, kind):
+    """
+    Search the players and clubs of all the leagues by name (accent insensitive, typo tolerant).
+
+    Parameters:
+    - query (string): The searched name.
+    - k (int): The maximum number of results.
+    - kind (string): "player" or "club", both if None.
+
+    Returns:
+    - list: The matching players and clubs (kind, name, league, club, score and games), best first.
+    """
+    from .search import search_index
+
+    return search_index().search(query, k, kind)
+
+def render(data_dir, league, game_id, chart, mins, fmt, player=None, viewport=None, state=None):
+    """
+    Render a chart of a game, or get its JSON statistics.
+
+    Parameters:
+    - data_dir (string): The folder (or fsspec url) with the league csv files.
+    - league (string): The league name.
+    - game_id (int): The game id.
+    - chart (string): "passing-network", "positional-map", "pressing-timeline" or one of PlayerVisualization.charts.
+    - mins (tuple): The game timelapse, None bounds are replaced by the start / end of the game.
+    - fmt (string): "png", "svg" or "json".
+    - player (string): The player name, for the player charts.
+    - viewport (tuple): The (width, device pixel ratio) of the client for a low resolution png, full quality if None.
+    - state (string): The game state filter (see GAME_STATES), the whole game if None.
+
+    Returns:
+    - bytes or dict: The encoded image or the JSON statistics.
+    """
+    from .passing_network import PassingNetwork
+    from .positional_map import PositionalMap
+    from .player_visualization import PlayerVisualization
+    from .pressing_timeline import PressingTimeline
+
+    events_df, clubs_sorted = get_game_events(data_dir, league, game_id)
+    mins = (mins[0] if mins[0] is not None else 0, mins[1] if mins[1] is not None else int(events_df["minute"].max()))
+    context = get_match_context(events_df)
+    key = cache_key(events_df, chart, mins, player, state)
+
+    if chart == "passing-network":
+        viz = PassingNetwork(events_df, mins=mins, context=context, state=state)
+        if fmt == "json":
+            return viz.get_stats()
+        return render_chart(key, viz.plot_passing_network, fmt, viewport)
+
+    if chart == "positional-map":
+        viz = PositionalMap(events_df=events_df, mins=mins, context=context, state=state)
+        if fmt == "json":
+            return viz.get_stats()
+        return render_chart(key, viz.plot_positional_map, fmt, viewport)
+
+    if chart == "pressing-timeline":
+        viz = PressingTimeline(events_df, mins, context=context, pressing=get_league(data_dir, league).game_pressing(game_id), state=state)
+        if fmt == "json":
+            return viz.get_stats()
+        return render_chart(key, viz.plot_pressing_timeline, fmt, viewport)
+
+    clubs = events_df[events_df["player_name"] == player]["team_name"].unique()
+    if len(clubs) == 0:
+        raise LookupError(f"Unknown player {player} in game {game_id}")
+    club = clubs[0]
+    league_data = get_league(data_dir, league)
+    viz = PlayerVisualization(select_team_events(events_df, club), player, mins, club, context=context,
+                              percentiles=league_data.season_percentiles(), state=state,
+                              timeline=game_state_timeline(events_df))
+    if fmt == "json":
+        return viz.get_stats(chart)
+    # The league percentiles on the chart change with the data version
+    return render_chart(cache_key(events_df, chart, mins, player, league_data.version, state), functools.partial(viz.plot_chart, chart), fmt, viewport)
+
+## Server side
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into a single execution.
+    """
+    def __init__(self):
+        self.calls = {}
+
+    async def do(self, key, func):
+        """
+        Run func() once for all the concurrent callers with the same key.
+
+        Parameters:
+        - key (hashable): The call key.
+        - func (callable): Coroutine function executed by the first caller.
+
+        Returns:
+        - The result of func(), shared by all the callers.
+        """
+        task = self.calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self.calls[key] = task
+            task.add_done_callback(lambda _: self.calls.pop(key, None))
+        # A client disconnecting must not cancel the render of the other callers
+        return await asyncio.shield(task)
+
+def get_query(request):
+    """
+    Parse the query parameters shared by all the endpoints.
+
+    Parameters:
+    - request (aiohttp.web.Request): The HTTP request.
+
+    Returns:
+    - string: The league.
+    - tuple: The game timelapse (start, end), None if not given.
+    - string: The output format.
+    - tuple: The (width, device pixel ratio) of the client viewport, None if no width is given.
+    """
+    league = request.query.get("league")
+    if not league:
+        raise web.HTTPBadRequest(reason="Missing league query parameter")
+    fmt = request.query.get("format", "png")
+    if fmt not in FORMATS:
+        raise web.HTTPBadRequest(reason=f"Unknown format {fmt}, expected one of {FORMATS}")
+    try:
+        mins = tuple(int(request.query[key]) if key in request.query else None for key in ["start", "end"])
+    except ValueError:
+        raise web.HTTPBadRequest(reason="start and end must be integers")
+    try:
+        viewport = (int(request.query["width"]), float(request.query.get("pixel_ratio", 1))) if "width" in request.query else None
+    except ValueError:
+        raise web.HTTPBadRequest(reason="width and pixel_ratio must be numbers")
+    if viewport is not None and (viewport[0] <= 0 or viewport[1] <= 0):
+        raise web.HTTPBadRequest(reason="width and pixel_ratio must be positive")
+    return league, mins, fmt, viewport
+
+def get_game_id(value):
+    """
+    Parse a game id from the URL.
+
+    Parameters:
+    - value (string): The raw game id.
+
+    Returns:
+    - int: The game id.
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise web.HTTPBadRequest(reason=f"Invalid game id {value}")
+
+def get_state(request):
+    """
+    Parse the game state filter of a chart.
+
+    Parameters:
+    - request (aiohttp.web.Request): The HTTP request.
+
+    Returns:
+    - string: The game state, None for the whole game.
+    """
+    state = request.query.get("state")
+    if state is not None and state not in GAME_STATES:
+        raise web.HTTPBadRequest(reason=f"Unknown game state {state}, expected one of {GAME_STATES}")
+    return state
+
+async def run(request, key, func, *args):
+    """
+    Run a worker function in the process pool, coalescing identical concurrent requests.
+
+    Parameters:
+    - request (aiohttp.web.Request): The HTTP request.
+    - key (tuple): The coalescing key.
+    - func (callable): The worker function.
+    - args: The worker function arguments.
+
+    Returns:
+    - The worker function result.
+    """
+    app = request.app
+    loop = asyncio.get_running_loop()
+    try:
+        return await app["single_flight"].do(key, lambda: loop.run_in_executor(app["executor"], func, *args))
+    except LookupError as e:
+        raise web.HTTPNotFound(reason=str(e).strip("'"))
+    except FileNotFoundError:
+        raise web.HTTPNotFound(reason="Unknown league")
+
+def make_response(result, fmt):
+    """
+    Build the HTTP response of a chart.
+
+    Parameters:
+    - result (bytes or dict): The encoded image or the JSON statistics.
+    - fmt (string): The output format.
+
+    Returns:
+    - aiohttp.web.Response: The HTTP response.
+    """
+    if fmt == "json":
+        return web.json_response(result)
+    return web.Response(body=result, content_type=IMAGE_FORMATS[fmt])
+
+async def games_handler(request):
+    league, _, _, _ = get_query(request)
+    data_dir = request.app["data_dir"]
+    games = await run(request, ("games", league), list_games, data_dir, league)
+    return web.json_response(games)
+
+async def game_chart_handler(request):
+    league, mins, fmt, viewport = get_query(request)
+    game_id = get_game_id(request.match_info["game_id"])
+    chart = request.match_info["chart"]
+    state = get_state(request)
+    data_dir = request.app["data_dir"]
+    result = await run(request, (league, game_id, chart, mins, fmt, viewport, state), render, data_dir, league, game_id, chart, mins, fmt, None, viewport, state)
+    return make_response(result, fmt)
+
+async def similar_players_handler(request):
+    league, _, _, _ = get_query(request)
+    player = request.match_info["name"]
+    club = request.query.get("club")
+    try:
+        k = int(request.query.get("k", 10))
+    except ValueError:
+        raise web.HTTPBadRequest(reason="k must be an integer")
+    data_dir = request.app["data_dir"]
+    result = await run(request, ("similar", league, player, club, k), find_similar_players, data_dir, league, player, club, k)
+    return web.json_response(result)
+
+async def search_handler(request):
+    query = request.query.get("q", "").strip()
+    if not query:
+        raise web.HTTPBadRequest(reason="Missing q query parameter")
+    kind = request.query.get("kind")
+    if kind not in (None, "player", "club"):
+        raise web.HTTPBadRequest(reason="kind must be player or club")
+    try:
+        k = int(request.query.get("k", 10))
+    except ValueError:
+        raise web.HTTPBadRequest(reason="k must be an integer")
+    result = await run(request, ("search", query, k, kind), search_players, query, k, kind)
+    return web.json_response(result)
+
+async def player_chart_handler(request):
+    from .player_visualization import PlayerVisualization
+
+    league, mins, fmt, viewport = get_query(request)
+    game_id = get_game_id(request.query.get("game_id"))
+    player = request.match_info["name"]
+    chart = request.match_info["chart"]
+    if chart not in PlayerVisualization.charts:
+        raise web.HTTPNotFound(reason=f"Unknown chart {chart}, expected one of {PlayerVisualization.charts}")
+    state = get_state(request)
+    data_dir = request.app["data_dir"]
+    result = await run(request, (league, game_id, chart, mins, fmt, player, viewport, state), render, data_dir, league, game_id, chart, mins, fmt, player, viewport, state)
+    return make_response(result, fmt)
+
+def create_app(data_dir, workers=None, warm_up_leagues=()):
+    """
+    Create the API application.
+
+    Parameters:
+    - data_dir (string): The folder (or fsspec url) with the league csv files.
+    - workers (int): The number of rendering processes, defaults to the number of CPUs.
+    - warm_up_leagues (list): The leagues warmed in each rendering process before the server accepts requests.
+
+    Returns:
+    - aiohttp.web.Application: The application.
+    """
+    app = web.Application()
+    app["data_dir"] = data_dir
+    app["single_flight"] = SingleFlight()
+
+    async def executor_context(app):
+        processes = workers or os.cpu_count()
+        app["executor"] = ProcessPoolExecutor(max_workers=processes, initializer=init_worker,
+                                              initargs=(data_dir, tuple(warm_up_leagues)))
+        if warm_up_leagues:
+            # Every process runs the warm-up before its first job: the server accepts requests once each process
+            # has answered a job (a warm process can take several jobs of a round while another one still warms up)
+            loop = asyncio.get_running_loop()
+            started = set()
+            while len(started) < processes:
+                started.update(await asyncio.gather(*[loop.run_in_executor(app["executor"], worker_pid) for _ in range(processes)]))
+        yield
+        app["executor"].shutdown(cancel_futures=True)
+
+    app.cleanup_ctx.append(executor_context)
+    app.router.add_get("/games", games_handler)
+    app.router.add_get("/search", search_handler)
+    app.router.add_get("/games/{game_id}/{chart:passing-network|positional-map|pressing-timeline}", game_chart_handler)
+    app.router.add_get("/players/{name}/similar", similar_players_handler)
+    app.router.add_get("/players/{name}/{chart}", player_chart_handler)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Game Analyzer HTTP API")
+    parser.add_argument("--data-dir", default="csv_data", help="Folder (or fsspec url) with the league csv files")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None, help="Number of rendering processes")
+    parser.add_argument("--warm-up", nargs="*", default=[], help="Leagues warmed in each rendering process at start")
+    args = parser.parse_args()
+    web.run_app(create_app(args.data_dir, args.workers, args.warm_up), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
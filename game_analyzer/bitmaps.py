@@ -0,0 +1,224 @@
+"""
+Bitmap index over the event attributes of a league, for composable event queries without scanning the columns.
+
+For each indexed column, the row ids of the events are sorted by value once (one stable argsort per column): the
+rows of a value are a contiguous slice of this order, a sorted row-id list. A query condition is turned into a
+packed bitmap (one bit per event of the league, np.packbits) and the conditions are combined with bitwise AND / OR /
+NOT on these bitmaps, so "successful take-ons in the final third by a player this season" is a few vector
+operations on bitmaps of n / 8 bytes instead of scans of the event columns. The games are contiguous row ranges of
+the league store, a game condition is a range of bits.
+
+Usage:
+    index = league.event_index()
+    query = where(type_name="TakeOn", outcome=True, third="final", player_name="Kylian Mbappe")
+    index.count(query), index.select(query, ["game_id", "minute", "start_x", "start_y"])
+    index.rows(where(type_name=["Tackle", "Interception"]) | where(type_name="Foul", outcome=False))
+
+The third of the end location (end_third) is indexed too: where(type_name="Pass", outcome=True, end_third="final")
+are the successful passes into (or within) the final third.
+"""
+import threading
+import numpy as np
+import pandas as pd
+from .cube import get_bins
+
+# Thirds of the pitch along the x axis (the own third of the team first)
+THIRDS = ["defensive", "middle", "final"]
+THIRDS_X = np.array([0, 100 / 3, 200 / 3, 100])
+
+INDEXED_COLUMNS = ["type_name", "outcome", "team_id", "player_name", "period_id", "zone", "third", "end_third", "shot", "goal", "game_state"]
+# Columns derived from the locations when the index is built: the third of the start and of the end of the events
+THIRD_COLUMNS = {"third": "start_x", "end_third": "end_x"}
+
+# Number of bits set in each byte, to count the events of a bitmap without unpacking it
+POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.int64)
+
+def get_thirds(x):
+    """
+    Get the third of the pitch of each location.
+
+    Parameters:
+    - x (np.array): The opta x coordinates.
+
+    Returns:
+    - np.array: The third indexes (see THIRDS), -1 out of the pitch.
+    """
+    return get_bins(x, THIRDS_X)
+
+class EventQuery:
+    """
+    Condition on the events, combined with & (and), | (or) and ~ (not). Built with where().
+    """
+    def __init__(self, op, operands):
+        """
+        Parameters:
+        - op (string): "where", "and", "or" or "not".
+        - operands (tuple): The conditions (column, values) of a "where", the sub-queries otherwise.
+        """
+        self.op = op
+        self.operands = operands
+
+    def __and__(self, other):
+        return EventQuery("and", (self, other))
+
+    def __or__(self, other):
+        return EventQuery("or", (self, other))
+
+    def __invert__(self):
+        return EventQuery("not", (self,))
+
+    def __repr__(self):
+        if self.op == "where":
+            return "where({})".format(", ".join(f"{column}={values!r}" for column, values in self.operands))
+        if self.op == "not":
+            return f"~{self.operands[0]!r}"
+        return "({})".format(f" {'&' if self.op == 'and' else '|'} ".join(repr(operand) for operand in self.operands))
+
+def where(**conditions):
+    """
+    Build a query from conditions on the indexed columns (INDEXED_COLUMNS or game_id), all of them must hold.
+    A list of values matches any of them (ex: type_name=["Tackle", "Interception"]).
+
+    Parameters:
+    - conditions: The column conditions (ex: type_name="TakeOn", outcome=True, third="final").
+
+    Returns:
+    - EventQuery: The query.
+    """
+    return EventQuery("where", tuple((column, values if isinstance(values, (list, tuple, set)) else [values])
+                                     for column, values in conditions.items()))
+
+class BitmapIndex:
+    """
+    Sorted row-id lists of the values of the indexed columns of a league store, and their packed bitmaps.
+    """
+    def __init__(self, store):
+        """
+        Parameters:
+        - store (LeagueStore): The memory-mapped league events.
+        """
+        self.store = store
+        self.num_rows = store.table.num_rows
+        self.values = {}
+        self.orders = {}
+        self.offsets = {}
+        self.bitmaps = {}
+        self.lock = threading.Lock()
+
+        columns = store.table.select([column for column in INDEXED_COLUMNS if column not in THIRD_COLUMNS] + list(THIRD_COLUMNS.values())).to_pandas()
+        for column, x_column in THIRD_COLUMNS.items():
+            thirds = get_thirds(columns[x_column].to_numpy(dtype=float))
+            columns[column] = np.where(thirds >= 0, np.array(THIRDS, dtype=object)[thirds], None)
+        for column in INDEXED_COLUMNS:
+            codes, uniques = pd.factorize(columns[column], sort=True)
+            # The missing values (code -1) are sorted first and left out of the row-id lists
+            order = np.argsort(codes, kind="stable").astype(np.int32)
+            counts = np.bincount(codes + 1, minlength=len(uniques) + 1)
+            self.values[column] = pd.Index(uniques)
+            self.orders[column] = order
+            self.offsets[column] = np.cumsum(counts)
+        # Bitmap of all the events, the padding bits of the last byte unset
+        self.all_events = np.packbits(np.ones(self.num_rows, dtype=bool))
+
+    def row_ids(self, column, value):
+        """
+        Get the sorted row ids of the events with a value.
+
+        Parameters:
+        - column (string): The indexed column.
+        - value: The value.
+
+        Returns:
+        - np.array: The row ids in the league table.
+        """
+        if column not in self.values:
+            raise KeyError(f"{column} is not indexed, expected one of {INDEXED_COLUMNS + ['game_id']}")
+        code = self.values[column].get_indexer([value])[0]
+        if code < 0:
+            return np.zeros(0, dtype=np.int32)
+        return self.orders[column][self.offsets[column][code]:self.offsets[column][code + 1]]
+
+    def bitmap(self, column, value):
+        """
+        Get the packed bitmap of the events with a value, built from its row ids on first use.
+
+        Parameters:
+        - column (string): The indexed column, or game_id.
+        - value: The value.
+
+        Returns:
+        - np.array: The packed bitmap (uint8), it must not be modified in place.
+        """
+        key = (column, value)
+        bitmap = self.bitmaps.get(key)
+        if bitmap is None:
+            mask = np.zeros(self.num_rows, dtype=bool)
+            if column == "game_id":
+                start, stop = self.store.offsets.get(value, (0, 0))
+                mask[start:stop] = True
+            else:
+                mask[self.row_ids(column, value)] = True
+            bitmap = np.packbits(mask)
+            with self.lock:
+                self.bitmaps[key] = bitmap
+        return bitmap
+
+    def evaluate(self, query):
+        """
+        Evaluate a query on the bitmaps.
+
+        Parameters:
+        - query (EventQuery): The query.
+
+        Returns:
+        - np.array: The packed bitmap of the events matching the query.
+        """
+        if query.op == "where":
+            result = None
+            for column, values in query.operands:
+                bitmaps = [self.bitmap(column, value) for value in values]
+                condition = np.bitwise_or.reduce(bitmaps) if len(bitmaps) > 1 else bitmaps[0]
+                result = condition if result is None else result & condition
+            return result if result is not None else self.all_events
+        if query.op == "not":
+            return ~self.evaluate(query.operands[0]) & self.all_events
+        operator = np.bitwise_and if query.op == "and" else np.bitwise_or
+        return operator.reduce([self.evaluate(operand) for operand in query.operands])
+
+    def count(self, query):
+        """
+        Count the events matching a query, without materializing their rows.
+
+        Parameters:
+        - query (EventQuery): The query.
+
+        Returns:
+        - int: The number of events.
+        """
+        return int(POPCOUNT[self.evaluate(query)].sum())
+
+    def rows(self, query):
+        """
+        Get the rows of the events matching a query.
+
+        Parameters:
+        - query (EventQuery): The query.
+
+        Returns:
+        - np.array: The sorted row ids in the league table.
+        """
+        return np.flatnonzero(np.unpackbits(self.evaluate(query), count=self.num_rows))
+
+    def select(self, query, columns=None):
+        """
+        Get the events matching a query, only their rows are read from the league table.
+
+        Parameters:
+        - query (EventQuery): The query.
+        - columns (list): The columns to read, all of them if None.
+
+        Returns:
+        - pd.DataFrame: The events, in the order of the league table.
+        """
+        table = self.store.table if columns is None else self.store.table.select(columns)
+        return table.take(self.rows(query)).to_pandas()
@@ -0,0 +1,177 @@
+"""
+Memoization of the analysis functions keyed on identifiers carried alongside the DataFrames.
+
+Hashing a whole events DataFrame on every call (as st.cache_data does) costs close to the computation itself.
+Instead, the frames carry their identifiers (content hash, league, game id, team...) in `df.attrs`, set once
+when they are loaded, and the cache key is built from those identifiers and the call parameters (window, player...).
+The game frames are identified by the content hash of the game (written at ingest, see store), not by the version
+of the whole league: a data refresh keeps the caches of the games it does not change. The season computations
+keep their results game by game (GameResults) and only compute the new or corrected games again.
+"""
+import functools
+import threading
+from collections import OrderedDict
+
+IDENTIFIERS = "identifiers"
+
+def with_identifiers(df, **identifiers):
+    """
+    Attach identifiers to a DataFrame, on top of the identifiers it already carries.
+
+    Parameters:
+    - df (pd.DataFrame): The events.
+    - identifiers: The identifiers of the frame content (ex: game_hash="...", game_id=1234, team="Lille").
+
+    Returns:
+    - pd.DataFrame: The same DataFrame, with the identifiers in df.attrs.
+    """
+    # Tuples only: pandas copies attrs to the derived frames, they must never be mutated in place
+    df.attrs[IDENTIFIERS] = tuple(sorted({**dict(df.attrs.get(IDENTIFIERS, ())), **identifiers}.items()))
+    return df
+
+def frame_key(df):
+    """
+    Get the cache key of a DataFrame from its identifiers.
+
+    The number of rows and the first / last event ids are added, so that a frame filtered without
+    updating its identifiers never hits the entry of its parent frame.
+
+    Parameters:
+    - df (pd.DataFrame): The events.
+
+    Returns:
+    - tuple: The frame key, None if the frame carries no identifiers.
+    """
+    identifiers = df.attrs.get(IDENTIFIERS)
+    if identifiers is None:
+        return None
+    bounds = (df["event_id"].iat[0], df["event_id"].iat[-1]) if "event_id" in df.columns and len(df) else None
+    return identifiers + (("rows", len(df)), ("event_ids", bounds))
+
+def cache_key(df, *args):
+    """
+    Build the cache key of a call from the frame identifiers and the call parameters.
+
+    Parameters:
+    - df (pd.DataFrame): The events.
+    - args: The other (hashable) parameters of the call (window, player, team id...).
+
+    Returns:
+    - tuple: The cache key, None (no caching) if the frame carries no identifiers.
+    """
+    key = frame_key(df)
+    return None if key is None else (key,) + args
+
+def memoize(key, maxsize=128, maxbytes=None):
+    """
+    Memoize a function in a thread-safe LRU cache, with a key built from its arguments.
+
+    The cached values are shared between the callers and must not be modified in place.
+
+    Parameters:
+    - key (callable): Receives the function arguments and returns the cache key, or None to skip the cache.
+    - maxsize (int): The maximum number of cached values.
+    - maxbytes (int): The maximum total size of the cached values (bytes values, ex: encoded images), None for no
+      limit. A value larger than the limit is not cached.
+
+    Returns:
+    - callable: The decorator.
+    """
+    def decorator(func):
+        cache = OrderedDict()
+        lock = threading.Lock()
+        total = 0
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal total
+            call_key = key(*args, **kwargs)
+            if call_key is None:
+                return func(*args, **kwargs)
+            with lock:
+                if call_key in cache:
+                    cache.move_to_end(call_key)
+                    return cache[call_key]
+            value = func(*args, **kwargs)
+            if maxbytes is not None and len(value) > maxbytes:
+                return value
+            with lock:
+                if maxbytes is not None:
+                    total += len(value) - (len(cache[call_key]) if call_key in cache else 0)
+                cache[call_key] = value
+                while len(cache) > maxsize or (maxbytes is not None and total > maxbytes):
+                    _, evicted = cache.popitem(last=False)
+                    if maxbytes is not None:
+                        total -= len(evicted)
+            return value
+
+        def cache_clear():
+            nonlocal total
+            with lock:
+                cache.clear()
+                total = 0
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache_clear
+        wrapper.maxsize = maxsize
+        wrapper.maxbytes = maxbytes
+        wrapper.cache_bytes = lambda: total
+        wrapper.is_cached = lambda *args, **kwargs: key(*args, **kwargs) in cache
+        return wrapper
+    return decorator
+
+class GameResults:
+    """
+    Results computed game by game and kept from one data version to the next: on a data refresh, only the games
+    whose content hash changed (new or corrected games) are computed again.
+    """
+    def __init__(self):
+        self.results = {}
+        self.lock = threading.Lock()
+
+    def update(self, game_hashes, compute):
+        """
+        Get the results of the games of a data version, computing only the stale ones.
+        The games no longer in the data are dropped.
+
+        Parameters:
+        - game_hashes (dict): The content hash of each game (the version vector of the league).
+        - compute (callable): Receives the list of the stale game ids and returns their results by game id
+          (a game without result is left out).
+
+        Returns:
+        - dict: The result of each game with one, in the order of game_hashes.
+        """
+        with self.lock:
+            previous = self.results
+        stale = [game_id for game_id, game_hash in game_hashes.items() if previous.get(game_id, (None,))[0] != game_hash]
+        computed = compute(stale) if stale else {}
+        results = {}
+        for game_id, game_hash in game_hashes.items():
+            if game_id in computed:
+                results[game_id] = (game_hash, computed[game_id])
+            elif game_id not in stale:
+                results[game_id] = previous[game_id]
+            else:
+                results[game_id] = (game_hash, None)
+        with self.lock:
+            self.results = results
+        return {game_id: result for game_id, (_, result) in results.items() if result is not None}
+
+_game_results = {}
+_game_results_lock = threading.Lock()
+
+def game_results(*key):
+    """
+    Get the per-game results of a season computation (ex: game_results("pressing", league)), created on first use.
+
+    Parameters:
+    - key: The name of the computation and the league.
+
+    Returns:
+    - GameResults: The results kept for this computation.
+    """
+    with _game_results_lock:
+        if key not in _game_results:
+            _game_results[key] = GameResults()
+        return _game_results[key]
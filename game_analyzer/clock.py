@@ -0,0 +1,151 @@
+"""
+Continuous game clock and window slicing by binary search.
+
+The `minute` of the events restarts at 45 in the second half while the stoppage time of the first half goes
+on with 45, 46, 47..., so the minutes are not ordered across the periods. The `clock` column is the number of
+seconds elapsed since the kick-off, with the periods back to back (stoppage time included): it increases with
+the events, which are kept sorted by it, and a window of the game is a contiguous row range found by searchsorted.
+
+Window convention, the same for all the charts: a window (start, end) in minutes contains the events from
+start:00 to end:59, both minutes included. The stoppage time of a period belongs to its last minute
+(the events of 45+2 are in the windows ending at 45 or later, not in the windows ending at 44).
+"""
+import numpy as np
+import pandas as pd
+
+# Start minute of each period: halves, extra time halves and penalty shootout
+PERIOD_START_MINUTES = {1: 0, 2: 45, 3: 90, 4: 105, 5: 120}
+# Order of the periods in the game: pre-match (16), ..., post-game (14)
+PERIOD_ORDER = [16, 1, 2, 3, 4, 5, 14]
+
+def period_elapsed(df):
+    """
+    Get the seconds elapsed since the start of the period of each event.
+
+    Parameters:
+    - df (pd.DataFrame): The events, with the period_id, minute and second columns.
+
+    Returns:
+    - np.array: The elapsed seconds in the period.
+    """
+    start = df["period_id"].map(PERIOD_START_MINUTES).fillna(0).to_numpy()
+    elapsed = (df["minute"].to_numpy() - start) * 60 + df["second"].fillna(0).to_numpy()
+    return np.maximum(elapsed, 0).astype(float)
+
+def period_rank(df):
+    """
+    Get the rank of the period of each event in the game (pre-match first, post-game last).
+
+    Parameters:
+    - df (pd.DataFrame): The events, with the period_id column.
+
+    Returns:
+    - np.array: The period ranks.
+    """
+    return df["period_id"].map({period: rank for rank, period in enumerate(PERIOD_ORDER)}).fillna(len(PERIOD_ORDER)).to_numpy()
+
+def add_game_clock(df):
+    """
+    Add the clock column to the events of a game or of a whole season: the seconds elapsed since the kick-off,
+    and the window_minute column used by the precomputed counts (see get_window_minute).
+
+    Each period starts when the previous one ends, a period lasts at least its regulation time.
+
+    Parameters:
+    - df (pd.DataFrame): The events.
+
+    Returns:
+    - pd.DataFrame: The events with the clock and window_minute columns (in the same order, to be sorted by game then clock).
+    """
+    df = df.reset_index(drop=True)
+    elapsed = period_elapsed(df)
+    rank = period_rank(df)
+    periods = pd.DataFrame({"game_id": df["game_id"].to_numpy(), "rank": rank, "elapsed": elapsed})
+
+    # Length of each period of each game: its last event, at least the regulation time
+    lengths = periods.groupby(["game_id", "rank"])["elapsed"].max() + 1
+    regulation = {PERIOD_ORDER.index(period): (PERIOD_START_MINUTES[period + 1] - start) * 60
+                  for period, start in PERIOD_START_MINUTES.items() if period + 1 in PERIOD_START_MINUTES}
+    lengths = np.maximum(lengths, lengths.index.get_level_values("rank").map(regulation).fillna(0).to_numpy())
+    offsets = lengths.groupby(level="game_id").cumsum() - lengths
+
+    df["clock"] = offsets.reindex(pd.MultiIndex.from_arrays([df["game_id"], rank])).to_numpy() + elapsed
+    df["window_minute"] = get_window_minute(df)
+    return df
+
+def get_window_minute(df):
+    """
+    Get the minute of each event in the window convention: the stoppage time of a period followed by another one
+    counts as its last minute (45+2 is 45), the events out of the periods (pre-match, post-game) are -1.
+    An event is in the window (start, end) if start <= window_minute <= end, as with window().
+
+    Parameters:
+    - df (pd.DataFrame): The events of a game or a season, with the game_id, period_id and minute columns.
+
+    Returns:
+    - np.array: The window minutes.
+    """
+    period = df["period_id"].to_numpy()
+    window_minute = df["minute"].to_numpy().copy()
+    for current in PERIOD_START_MINUTES:
+        if current + 1 not in PERIOD_START_MINUTES:
+            continue
+        next_games = df.loc[period == current + 1, "game_id"].unique()
+        mask = (period == current) & df["game_id"].isin(next_games).to_numpy()
+        window_minute[mask] = np.minimum(window_minute[mask], PERIOD_START_MINUTES[current + 1])
+    window_minute[~np.isin(period, list(PERIOD_START_MINUTES))] = -1
+    return window_minute.astype("int16")
+
+def minute_to_clock(df, minute):
+    """
+    Convert a game minute to the clock of a game.
+
+    The minute is in the last period started before it (the minute 45 is the end of the first half,
+    the minute 46 is in the second half). The period offsets are read from the events themselves, a period
+    without events in the frame is placed after the previous one, which keeps the bound ordered with the rows.
+
+    Parameters:
+    - df (pd.DataFrame): The events of a game (or a part of it), with the clock column.
+    - minute (int): The game minute.
+
+    Returns:
+    - float: The clock at the start of the minute, in seconds.
+    """
+    offsets = pd.Series(df["clock"].to_numpy() - period_elapsed(df), index=df["period_id"].to_numpy())
+    offsets = offsets.groupby(level=0).first()
+    periods = [period for period in PERIOD_START_MINUTES if period in offsets.index]
+    if not periods:
+        return minute * 60.0
+    period = periods[0]
+    for candidate in periods[1:]:
+        if PERIOD_START_MINUTES[candidate] < minute:
+            period = candidate
+    return offsets[period] + max(minute - PERIOD_START_MINUTES[period], 0) * 60.0
+
+def clock_window(df, start, end):
+    """
+    Select the events of a clock window [start, end) with a binary search, as a slice of the frame.
+
+    Parameters:
+    - df (pd.DataFrame): The events sorted by clock.
+    - start (float): The start of the window in seconds, included.
+    - end (float): The end of the window in seconds, excluded.
+
+    Returns:
+    - pd.DataFrame: The events of the window.
+    """
+    start, stop = np.searchsorted(df["clock"].to_numpy(), [start, end], side="left")
+    return df.iloc[start:stop]
+
+def window(df, mins):
+    """
+    Select the events of a game timelapse in minutes, both minutes included (see the module convention).
+
+    Parameters:
+    - df (pd.DataFrame): The events sorted by clock.
+    - mins (tuple): The game timelapse (start, end) in minutes.
+
+    Returns:
+    - pd.DataFrame: The events of the timelapse.
+    """
+    return clock_window(df, minute_to_clock(df, mins[0]), minute_to_clock(df, mins[1] + 1))
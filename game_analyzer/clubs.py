@@ -192,3 +192,36 @@ clubs_ids = {"Paris-Saint-Germain": 304,
               "Slovan-Bratislava": 698,
               "FK-Crvena-Zvezda": 579}
 
+
+# Other names of the clubs, for the player and club search
+clubs_aliases = {"Paris-Saint-Germain": ["PSG", "Paris SG"],
+                 "Marseille": ["OM", "Olympique de Marseille"],
+                 "Lyon": ["OL", "Olympique Lyonnais"],
+                 "Saint-Etienne": ["ASSE"],
+                 "Clermont-Foot": ["Clermont"],
+                 "Bayern-Munich": ["Bayern Munchen", "FC Bayern"],
+                 "Borussia-Dortmund": ["BVB", "Dortmund"],
+                 "Bayer-Leverkusen": ["Leverkusen"],
+                 "Borussia-M-Gladbach": ["Gladbach", "Monchengladbach"],
+                 "RB-Leipzig": ["Leipzig"],
+                 "Eintracht-Frankfurt": ["Frankfurt"],
+                 "Vfb-Stuttgart": ["Stuttgart"],
+                 "Manchester-City": ["Man City"],
+                 "Manchester-United": ["Man Utd", "Man United"],
+                 "Tottenham": ["Spurs", "Tottenham Hotspur"],
+                 "Wolves": ["Wolverhampton"],
+                 "Nottingham-Forest": ["Forest"],
+                 "Barcelona": ["Barca"],
+                 "Atletico-Madrid": ["Atleti"],
+                 "Athletic-Club": ["Athletic Bilbao"],
+                 "Inter": ["Inter Milan", "Internazionale"],
+                 "AC-Milan": ["Milan"],
+                 "Juventus": ["Juve"],
+                 "Sporting-CP": ["Sporting Lisbon"],
+                 "FC-Porto": ["Porto"],
+                 "Vitoria-de-Guimaraes": ["Guimaraes"],
+                 "PSV-Eindhoven": ["PSV"],
+                 "AZ-Alkmaar": ["AZ"],
+                 "Club-Bruges": ["Club Brugge"],
+                 "Union-St-Gilloise": ["Union SG"],
+                 "FK-Crvena-Zvezda": ["Red Star Belgrade"]}
@@ -0,0 +1,125 @@
+"""
+Immutable match context shared by the visualisations of a game.
+
+The game details (league, date, score, clubs, team ids, logos) are built once per game and passed explicitly to
+the visualisation classes, instead of being stored in class attributes: two games rendered at the same time in
+different threads never see each other's titles, logos or scales.
+"""
+from collections import namedtuple
+from .cache import memoize, frame_key
+from .clubs import clubs_ids
+from .data import get_game_clubs
+from .logos import get_path_logo
+
+MATCH_CONTEXT_FIELDS = ["league", "game", "game_id", "date", "score", "home_club", "away_club",
+                        "home_team_id", "away_team_id", "home_logo", "away_logo", "scales"]
+
+class MatchContext(namedtuple("MatchContext", MATCH_CONTEXT_FIELDS)):
+    """
+    Details of a game for the visualisations (a named tuple: read-only, use with_scales to derive a new context).
+
+    - league, game, game_id, date, score: The game details, the date as "YYYY-MM-DD" and the score as "2-1".
+    - home_club, away_club: The club names as displayed (ex: "Paris Saint Germain").
+    - home_team_id, away_team_id: The team ids.
+    - home_logo, away_logo: The paths of the club logos.
+    - scales: The scales shared by the teams of a chart (ex: the maximum pass count of the passing network), None by default.
+    """
+    __slots__ = ()
+
+    def club(self, team_id):
+        """
+        Get the displayed club name of a team.
+
+        Parameters:
+        - team_id (int): The team id.
+
+        Returns:
+        - string: The club name.
+        """
+        return self.home_club if team_id == self.home_team_id else self.away_club
+
+    def team_id(self, club):
+        """
+        Get the team id of a club of the game.
+
+        Parameters:
+        - club (string): The club name (displayed or raw, ex: "Paris-Saint-Germain").
+
+        Returns:
+        - int: The team id.
+        """
+        return self.home_team_id if club.replace("-", " ") == self.home_club else self.away_team_id
+
+    def team(self, team_id):
+        """
+        Get the team of the JSON statistics of the charts, the same for all the charts so that they can be joined.
+
+        Parameters:
+        - team_id (int): The team id.
+
+        Returns:
+        - dict: The team id and the displayed club name.
+        """
+        return {"team_id": int(team_id), "team_name": self.club(team_id)}
+
+    def logo(self, club):
+        """
+        Get the logo of a club of the game.
+
+        Parameters:
+        - club (string): The club name (displayed or raw, ex: "Paris-Saint-Germain").
+
+        Returns:
+        - string: The path of the png logo.
+        """
+        club = club.replace("-", " ")
+        if club == self.home_club:
+            return self.home_logo
+        if club == self.away_club:
+            return self.away_logo
+        return get_path_logo(self.league, club)
+
+    def with_scales(self, scales):
+        """
+        Derive the context of a chart with its scales.
+
+        Parameters:
+        - scales (tuple): The chart scales (a named tuple).
+
+        Returns:
+        - MatchContext: A new context, the current one is not modified.
+        """
+        return self._replace(scales=scales)
+
+@memoize(key=frame_key, maxsize=64)
+def get_match_context(events_df):
+    """
+    Build the match context of a game from its prepared events (of both teams or of a single team).
+    The result is memoized on the game identifiers.
+
+    Parameters:
+    - events_df (pd.DataFrame): The prepared events of the game.
+
+    Returns:
+    - MatchContext: The match context.
+    """
+    first = events_df.iloc[0]
+    # Clubs of the game from the home / away events, from the game name for the events of a single team
+    clubs = get_game_clubs(first["game"])
+    for h_a, index in [("h", 0), ("a", 1)]:
+        team_names = events_df.loc[events_df["h_a"] == h_a, "team_name"]
+        if len(team_names):
+            clubs[index] = team_names.iat[0]
+    home_club, away_club = [club.replace("-", " ") for club in clubs]
+    return MatchContext(league=first["league"],
+                        game=first["game"],
+                        game_id=int(first["game_id"]),
+                        date=first["date"].split("T")[0],
+                        score=first["score"].replace(":", "-"),
+                        home_club=home_club,
+                        away_club=away_club,
+                        home_team_id=clubs_ids.get(clubs[0]),
+                        away_team_id=clubs_ids.get(clubs[1]),
+                        home_logo=get_path_logo(first["league"], home_club),
+                        away_logo=get_path_logo(first["league"], away_club),
+                        scales=None)
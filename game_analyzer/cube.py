@@ -0,0 +1,184 @@
+"""
+Precomputed event counts by team x player x minute x game state x pitch zone, to draw the positional maps and heat
+maps of any window, team, player or game state (and of a whole season) with sums over the counts instead of the raw
+events.
+
+The zone and fine grid cell of each event are computed once at ingest (add_zones), with the window minute
+of the clock module and the game state of the team (game_state module). A cube is a long DataFrame with one row
+per non-empty (team_id, player_name, window_minute, game_state, zone, cell) and its event count.
+"""
+import numpy as np
+from .cache import memoize, frame_key
+
+# Positional zones of the mplsoccer opta pitch (positional="full"), same edges as pitch.dim.positional_x / positional_y
+POSITIONAL_X = np.array([0, 17, 33.5, 50, 66.5, 83, 100])
+POSITIONAL_Y = np.array([0, 21.1, 36.8, 63.2, 78.9, 100])
+# Number of zones, in the order of the mplsoccer statistics: top row (6), bottom row (6), middle (3 x 2), penalty areas (2)
+ZONE_COUNT = 20
+# Size of the fine grid cells, in opta units
+CELL_SIZE = 1
+GRID_SIZE = int(100 / CELL_SIZE)
+
+CUBE_DIMENSIONS = ["team_id", "player_name", "window_minute", "game_state", "zone", "cell"]
+
+def get_bins(values, edges):
+    """
+    Get the bin of each value, with the scipy binned_statistic convention (last bin closed on the right).
+
+    Parameters:
+    - values (np.array): The values.
+    - edges (np.array): The bin edges.
+
+    Returns:
+    - np.array: The bin indexes, -1 outside of the edges (or NaN).
+    """
+    bins = np.searchsorted(edges, values, side="right") - 1
+    bins[values == edges[-1]] = len(edges) - 2
+    bins[~((values >= edges[0]) & (values <= edges[-1]))] = -1
+    return bins
+
+def get_zones(x, y):
+    """
+    Get the mplsoccer positional zone of each location.
+
+    Parameters:
+    - x (np.array): The opta x coordinates (along the length of the pitch).
+    - y (np.array): The opta y coordinates.
+
+    Returns:
+    - np.array: The zone indexes (see ZONE_COUNT), -1 out of the pitch.
+    """
+    x_bins = get_bins(x, POSITIONAL_X)
+    y_bins = get_bins(y, POSITIONAL_Y)
+    # Middle of the pitch: 2 columns (17-50, 50-83) x 3 rows from the top (y decreasing)
+    middle = 12 + (3 - y_bins) * 2 + (x_bins >= 3)
+    zones = np.select([y_bins == 4, y_bins == 0, x_bins == 0, x_bins == 5],
+                      [x_bins, 6 + x_bins, 18, 19], middle)
+    zones[(x_bins < 0) | (y_bins < 0)] = -1
+    return zones
+
+def add_zones(df):
+    """
+    Add the zone and cell (fine grid) columns of the events start location, for the precomputed counts.
+
+    Parameters:
+    - df (pd.DataFrame): The events, with the start_x and start_y columns (or x and y once prepared).
+
+    Returns:
+    - pd.DataFrame: The events with the zone and cell columns.
+    """
+    x = df["start_x" if "start_x" in df.columns else "x"].to_numpy(dtype=float)
+    y = df["start_y" if "start_y" in df.columns else "y"].to_numpy(dtype=float)
+    df["zone"] = get_zones(x, y).astype("int8")
+    cells = np.clip(np.floor(x / CELL_SIZE), 0, GRID_SIZE - 1) * GRID_SIZE + np.clip(np.floor(y / CELL_SIZE), 0, GRID_SIZE - 1)
+    df["cell"] = np.where(np.isnan(cells), -1, cells).astype("int16")
+    return df
+
+@memoize(key=frame_key, maxsize=64)
+def game_cube(events_df):
+    """
+    Count the events of a game (or of a team in a game) by team, player, window minute, zone and cell.
+    The result is memoized on the game identifiers, it must not be modified in place.
+
+    Parameters:
+    - events_df (pd.DataFrame): The events, with the window_minute, zone and cell columns.
+
+    Returns:
+    - pd.DataFrame: The cube, one row per non-empty combination with its count.
+    """
+    return events_df.groupby(CUBE_DIMENSIONS, dropna=False, sort=False).size().rename("count").reset_index()
+
+def league_cube(store, game_ids=None):
+    """
+    Count the events of a whole league season by game, team, player, window minute, zone and cell,
+    from the precomputed columns of the league store only.
+
+    Parameters:
+    - store (LeagueStore): The memory-mapped league events.
+    - game_ids (list): Only count the events of these games, all the games if None.
+
+    Returns:
+    - pd.DataFrame: The season cube, with a game_id column.
+    """
+    columns = ["game_id"] + CUBE_DIMENSIONS
+    table = store.table if game_ids is None else store.games_table(game_ids)
+    table = table.select(columns).group_by(columns).aggregate([([], "count_all")])
+    return table.to_pandas().rename(columns={"count_all": "count"})
+
+def cube_slice(cube, mins=None, team_id=None, player=None, state=None):
+    """
+    Select the counts of a window, a team, a player and / or a game state.
+
+    Parameters:
+    - cube (pd.DataFrame): The cube.
+    - mins (tuple): The game timelapse (start, end) in minutes, both included, None for the whole game.
+    - team_id (int): The team id, None for both teams.
+    - player (string): The player name, None for all the players.
+    - state (string): The game state of the teams (see game_state.GAME_STATES), None for all the states.
+
+    Returns:
+    - pd.DataFrame: The counts of the slice.
+    """
+    mask = np.ones(len(cube), dtype=bool)
+    if mins is not None:
+        mask &= ((cube["window_minute"] >= mins[0]) & (cube["window_minute"] <= mins[1])).to_numpy()
+    if team_id is not None:
+        mask &= (cube["team_id"] == team_id).to_numpy()
+    if player is not None:
+        mask &= (cube["player_name"] == player).to_numpy()
+    if state is not None:
+        mask &= (cube["game_state"] == state).to_numpy()
+    return cube[mask]
+
+def zone_counts(cube):
+    """
+    Sum the counts of a cube slice by positional zone.
+
+    Parameters:
+    - cube (pd.DataFrame): The cube slice.
+
+    Returns:
+    - np.array: The event count of each zone.
+    """
+    zones = cube[cube["zone"] >= 0]
+    return np.bincount(zones["zone"].to_numpy(dtype=int), weights=zones["count"].to_numpy(), minlength=ZONE_COUNT)
+
+def zone_bin_statistic(pitch, counts, normalize=True):
+    """
+    Build the mplsoccer positional statistics from the zone counts, as pitch.bin_statistic_positional does from events.
+
+    Parameters:
+    - pitch (mplsoccer.VerticalPitch): The opta pitch.
+    - counts (np.array): The event count of each zone.
+    - normalize (bool): Divide the counts by their total.
+
+    Returns:
+    - list: The mplsoccer positional bin statistics.
+    """
+    bin_statistic = pitch.bin_statistic_positional(np.array([]), np.array([]), statistic="count", positional="full")
+    total = counts.sum()
+    if normalize and total > 0:
+        counts = counts / total
+    start = 0
+    for stat in bin_statistic:
+        size = stat["statistic"].size
+        stat["statistic"] = counts[start:start + size].reshape(stat["statistic"].shape).astype(float)
+        start += size
+    return bin_statistic
+
+def cell_locations(cube):
+    """
+    Get the fine grid cells of a cube slice with their counts, to draw a weighted heat map.
+
+    Parameters:
+    - cube (pd.DataFrame): The cube slice.
+
+    Returns:
+    - np.array: The x coordinates of the cell centers.
+    - np.array: The y coordinates of the cell centers.
+    - np.array: The event count of each cell.
+    """
+    cells = cube[cube["cell"] >= 0].groupby("cell")["count"].sum()
+    x = (cells.index.to_numpy() // GRID_SIZE + 0.5) * CELL_SIZE
+    y = (cells.index.to_numpy() % GRID_SIZE + 0.5) * CELL_SIZE
+    return x, y, cells.to_numpy()
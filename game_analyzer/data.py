@@ -0,0 +1,130 @@
+import pandas as pd
+from .cache import with_identifiers
+from .clock import add_game_clock
+from .cube import add_zones
+from .game_state import add_game_state
+from .clubs import clubs_list, clubs_ids
+from .sequences import add_possessions
+from .utils import find_clubs, check_card_type, calculate_expected_threat
+from .xg import add_xg, fit_league_xg
+
+# Team id -> club name lookup
+team_names = {value: key for key, value in clubs_ids.items()}
+
+def league_events_path(league, data_dir):
+    """
+    Get the path of the events csv file of a league.
+
+    Parameters:
+    - league (string): The league selected by the user (ex: "Ligue 1").
+    - data_dir (string): The local folder or bucket prefix with the csv files (ex: "s3://footballanalytics/csv_data").
+
+    Returns:
+    - string: The path of the league events csv file.
+    """
+    return "{data_dir}/{league}_2025_events.csv".format(data_dir=data_dir.rstrip("/"), league=league)
+
+def load_league_events(path):
+    """
+    Load the events of a league from a local csv file or any fsspec url (s3://...).
+
+    Parameters:
+    - path (string): The path of the league events csv file.
+
+    Returns:
+    - pd.DataFrame: All the events of the league.
+    """
+    return pd.read_csv(path)
+
+def normalize_game_name(game):
+    """
+    Normalize a game name (ex: "paris-saint-germain-lille" -> "Paris-Saint-Germain-Lille").
+
+    Parameters:
+    - game (string): The raw game name.
+
+    Returns:
+    - string: The normalized game name.
+    """
+    return '-'.join(word.capitalize() for word in game.split('-'))
+
+def get_game_clubs(game):
+    """
+    Find the two clubs of a game from its normalized name.
+
+    Parameters:
+    - game (string): The normalized game name.
+
+    Returns:
+    - list: The two clubs of the game, home club first.
+    """
+    clubs = find_clubs(game, clubs_list)
+    # Determine the order of the clubs in the string
+    club_order = [game.index(club) for club in clubs]
+    # Reorganise the clubs list according to this order
+    return [club for _, club in sorted(zip(club_order, clubs))]
+
+def normalize_league_events(df):
+    """
+    Sort the league events by date and normalize the game names (ex: "paris-saint-germain-lille" -> "Paris-Saint-Germain-Lille").
+
+    Parameters:
+    - df (pd.DataFrame): All the events of the league.
+
+    Returns:
+    - pd.DataFrame: The normalized league events.
+    """
+    df = df.sort_values(by="date", kind="stable")
+    # Normalize each game name once, not once per event
+    df['game'] = df['game'].map({game: normalize_game_name(game) for game in df['game'].unique()})
+    return df
+
+def prepare_game_events(df, game, league, clubs_sorted=None):
+    """
+    Select the events of a game and add all the columns needed by the visualisations.
+
+    Parameters:
+    - df (pd.DataFrame): All the normalized events of the league, or only the events of the game.
+    - game (string): The game selected by the user.
+    - league (string): The league of the game.
+    - clubs_sorted (list): The two clubs of the game, home club first, found from the game name if not given.
+
+    Returns:
+    - pd.DataFrame: The events of the game, ready for the visualisations.
+    - list: The two clubs of the game, home club first.
+    """
+    events_df = df[df["game"] == game].reset_index()
+    if "clock" not in events_df.columns:
+        events_df = add_game_clock(events_df).sort_values(by="clock", kind="stable").reset_index(drop=True)
+    if "possession_id" not in events_df.columns:
+        events_df = add_possessions(events_df)
+    if "zone" not in events_df.columns:
+        events_df = add_zones(events_df)
+    if "game_state" not in events_df.columns:
+        events_df = add_game_state(events_df)
+    if "xg" not in events_df.columns:
+        events_df, _ = add_xg(events_df, fit_league_xg(df))
+
+    events_df["league"] = league.replace("_", " ")
+    if clubs_sorted is None:
+        clubs_sorted = get_game_clubs(events_df.loc[0, "game"])
+    events_df["team_name"] = events_df["team_id"].apply(lambda x: team_names[x])
+    events_df["h_a"] = events_df["team_name"].apply(lambda x: 'h' if x == clubs_sorted[0] else 'a')
+    events_df["qualifiers"] = events_df["qualifiers"].apply(lambda x: eval(x))
+    events_df['cardType'] = events_df.apply(lambda row: check_card_type(row['qualifiers']) if row['type_name'] == 'Card' else None, axis=1)
+    events_df['xT_added'] = events_df.apply(calculate_expected_threat, axis=1)
+    events_df = events_df.rename(columns={'start_x': 'x', 'start_y': 'y'})
+    return events_df, clubs_sorted
+
+def select_team_events(events_df, club):
+    """
+    Select the events of a club in a game, keeping the cache identifiers of the game.
+
+    Parameters:
+    - events_df (pd.DataFrame): The events of the game.
+    - club (string): The club name.
+
+    Returns:
+    - pd.DataFrame: The events of the club.
+    """
+    return with_identifiers(events_df[events_df["team_name"] == club].reset_index(drop=True), team=club)
@@ -0,0 +1,285 @@
+"""
+Game state timeline: the score state of each team (leading, drawing, trailing) over the game clock, derived once
+from the goal events.
+
+A goal counts for the team of its event, or for the opponent for an own goal (OwnGoal qualifier); the goals of the
+penalty shootout do not change the state. The state changes just after the goal: the goal itself and the events
+of the same clock belong to the state it was scored in.
+
+The timeline of a game holds interval arrays over the game clock, (start, end] between two goals, with the goal
+difference of each team in each interval. The events of a state are selected by an interval slice (state_window):
+the row range of each interval is found by binary search in the clock column, as the minute windows of the clock
+module, so a state filter combines with the minute window of any chart without computing a state per event.
+
+The state of each event, from the point of view of its team, is also written at ingest in the game_state column
+of the league store (add_game_state): the season aggregates (season cube, season events) split by game state
+like any other column, ex: league.season_events(where(game_state="trailing", type_name="Pass")).
+"""
+import numpy as np
+import pandas as pd
+from .cache import memoize, frame_key
+from .sequences import has_qualifier
+
+GAME_STATES = ["leading", "drawing", "trailing"]
+OWN_GOAL = ["OwnGoal"]
+# Penalty shootout period: its goals do not change the game state
+SHOOTOUT_PERIOD = 5
+
+def state_names(goal_difference):
+    """
+    Get the game state of goal differences.
+
+    Parameters:
+    - goal_difference (np.array): The goals for minus the goals against.
+
+    Returns:
+    - np.array: The game states (see GAME_STATES).
+    """
+    return np.select([goal_difference > 0, goal_difference < 0], ["leading", "trailing"], "drawing")
+
+def goal_events(df):
+    """
+    Get the goals of one or several games with the team they count for.
+
+    Parameters:
+    - df (pd.DataFrame): The events, with the game_id, team_id, period_id, clock, goal and qualifiers columns.
+
+    Returns:
+    - pd.DataFrame: One row per goal, in the order of the events: game_id, clock, window_minute (if known) and
+      team_id (the team the goal counts for).
+    """
+    goals = df[(df["goal"] == True).to_numpy() & (df["period_id"] != SHOOTOUT_PERIOD).to_numpy() & df["team_id"].notnull().to_numpy()]
+    teams = df[df["team_id"].notnull()].groupby("game_id", sort=False)["team_id"].unique()
+    opponents = {(game_id, team_id): other for game_id, team_ids in teams.items() for team_id in team_ids
+                 for other in team_ids if other != team_id}
+    own_goal = has_qualifier(goals["qualifiers"], OWN_GOAL)
+    team_id = goals["team_id"].to_numpy()
+    scorer = np.array([opponents.get((game_id, team), team) if own else team
+                       for game_id, team, own in zip(goals["game_id"].to_numpy(), team_id, own_goal)], dtype=team_id.dtype)
+    columns = {"game_id": goals["game_id"].to_numpy(), "clock": goals["clock"].to_numpy(dtype=float)}
+    if "window_minute" in goals.columns:
+        columns["window_minute"] = goals["window_minute"].to_numpy()
+    return pd.DataFrame({**columns, "team_id": scorer})
+
+def add_game_state(df):
+    """
+    Add the game_state column to the events of a game or of a whole season: the state of the team of each event
+    when it happened (None for the events without a team).
+
+    Parameters:
+    - df (pd.DataFrame): The events sorted by game then clock, with the game_id, team_id, period_id, clock, goal
+      and qualifiers columns.
+
+    Returns:
+    - pd.DataFrame: The events with the game_state column.
+    """
+    goals = goal_events(df)
+    games = pd.factorize(pd.concat([df["game_id"], goals["game_id"]], ignore_index=True))[0]
+    teams = pd.factorize(pd.concat([df["team_id"], goals["team_id"]], ignore_index=True))[0]
+    clock = np.r_[df["clock"].to_numpy(dtype=float), goals["clock"].to_numpy(dtype=float)]
+    # Keys ordered by game then clock, and by game, team then clock (the clocks are non negative)
+    span = np.nanmax(clock, initial=0) + 1
+    game_keys = games * span + clock
+    team_keys = (games * (teams.max(initial=0) + 1) + teams) * span + clock
+
+    def goals_before(keys):
+        # Goals of the same game (or team in the game) before each event: binary searches in the sorted goal keys
+        goal_keys = np.sort(keys[len(df):])
+        event_keys = keys[:len(df)]
+        return np.searchsorted(goal_keys, event_keys, side="left") - np.searchsorted(goal_keys, event_keys - event_keys % span, side="left")
+
+    total, scored = goals_before(game_keys), goals_before(team_keys)
+    event_teams = teams[:len(df)]
+    states = state_names(2 * scored - total).astype(object)
+    states[event_teams < 0] = None
+    df["game_state"] = states
+    return df
+
+class GameStateTimeline:
+    """
+    Goal difference of the teams of a game over the game clock, as interval arrays between the goals.
+    """
+    def __init__(self, team_ids, goals):
+        """
+        Parameters:
+        - team_ids (list): The teams of the game.
+        - goals (pd.DataFrame): The goals of the game in clock order (goal_events).
+        """
+        self.team_ids = list(team_ids)
+        clock = goals["clock"].to_numpy(dtype=float)
+        minutes = goals["window_minute"].to_numpy(dtype=float) if "window_minute" in goals.columns else clock // 60
+        # Interval k is (starts[k], ends[k]]: after k goals
+        self.starts = np.r_[-np.inf, clock]
+        self.ends = np.r_[clock, np.inf]
+        self.start_minutes = np.r_[-np.inf, minutes]
+        self.end_minutes = np.r_[minutes, np.inf]
+        scorers = goals["team_id"].to_numpy()
+        self.goal_difference = {team_id: np.r_[0, np.cumsum(np.where(scorers == team_id, 1, -1))] for team_id in self.team_ids}
+
+    def states(self, team_id):
+        """
+        Get the state of a team in each interval.
+
+        Parameters:
+        - team_id (int): The team id.
+
+        Returns:
+        - np.array: The game state of each interval (see GAME_STATES).
+        """
+        return state_names(self.goal_difference[team_id])
+
+    def intervals(self, team_id, state):
+        """
+        Get the clock intervals of a team in a game state, the consecutive intervals merged.
+
+        Parameters:
+        - team_id (int): The team id.
+        - state (string): The game state, one of GAME_STATES.
+
+        Returns:
+        - np.array: The starts of the intervals, excluded.
+        - np.array: The ends of the intervals, included.
+        """
+        return self.merged_intervals(team_id, state, self.starts, self.ends)
+
+    def minute_intervals(self, team_id, state):
+        """
+        Get the intervals of a team in a game state in window minutes (the minute of a goal is in the state before it).
+
+        Parameters:
+        - team_id (int): The team id.
+        - state (string): The game state, one of GAME_STATES.
+
+        Returns:
+        - np.array: The first minutes of the intervals, excluded.
+        - np.array: The last minutes of the intervals, included.
+        """
+        return self.merged_intervals(team_id, state, self.start_minutes, self.end_minutes)
+
+    def merged_intervals(self, team_id, state, starts, ends):
+        """
+        Select the intervals of a state and merge the consecutive ones (two goals of the leading team...).
+
+        Parameters:
+        - team_id (int): The team id.
+        - state (string): The game state.
+        - starts (np.array): The starts of all the intervals.
+        - ends (np.array): The ends of all the intervals.
+
+        Returns:
+        - np.array: The starts of the merged intervals.
+        - np.array: The ends of the merged intervals.
+        """
+        if state not in GAME_STATES:
+            raise ValueError(f"Unknown game state {state}, expected one of {GAME_STATES}")
+        selected = self.states(team_id) == state
+        first = selected & ~np.r_[False, selected[:-1]]
+        last = selected & ~np.r_[selected[1:], False]
+        return starts[first], ends[last]
+
+    def minute_states(self, team_id, minutes):
+        """
+        Get the state of a team at window minutes (after the goals of the previous minutes).
+
+        Parameters:
+        - team_id (int): The team id.
+        - minutes (np.array): The window minutes.
+
+        Returns:
+        - np.array: The game state at each minute.
+        """
+        return self.states(team_id)[np.searchsorted(self.end_minutes[:-1], np.asarray(minutes, dtype=float), side="left")]
+
+    def state_minutes(self, team_id, state, mins):
+        """
+        Get the number of minutes of a game timelapse a team spent in a game state.
+
+        Parameters:
+        - team_id (int): The team id.
+        - state (string): The game state.
+        - mins (tuple): The timelapse (start, end) in minutes, as the on-pitch interval of a player.
+
+        Returns:
+        - float: The minutes in the state.
+        """
+        starts, ends = self.minute_intervals(team_id, state)
+        return float(np.maximum(np.minimum(ends, mins[1]) - np.maximum(starts, mins[0]), 0).sum())
+
+@memoize(key=frame_key, maxsize=64)
+def game_state_timeline(events_df):
+    """
+    Build the game state timeline of a game from its goals.
+    The result is memoized on the game identifiers.
+
+    Parameters:
+    - events_df (pd.DataFrame): The prepared events of the game, of both teams (the goals of both teams are needed).
+
+    Returns:
+    - GameStateTimeline: The timeline.
+    """
+    team_ids = events_df.loc[events_df["team_id"].notnull(), "team_id"].unique()
+    return GameStateTimeline(team_ids, goal_events(events_df))
+
+def state_label(state):
+    """
+    Get the game state filter of a chart as displayed after its timelapse.
+
+    Parameters:
+    - state (string): The game state, None for all the states.
+
+    Returns:
+    - string: The label (ex: ", while trailing"), empty without state.
+    """
+    return f", while {state}" if state is not None else ""
+
+def state_window(df, timeline, state):
+    """
+    Select the events of each team while it was in a game state, with an interval slice: the row range of each
+    interval is found by binary search in the clock column.
+
+    Parameters:
+    - df (pd.DataFrame): The events sorted by clock (ex: the events of a minute window).
+    - timeline (GameStateTimeline): The game state timeline of the game.
+    - state (string): The game state, one of GAME_STATES, all the events if None.
+
+    Returns:
+    - pd.DataFrame: The events of the teams in the state.
+    """
+    if state is None:
+        return df
+    clock = df["clock"].to_numpy()
+    team = df["team_id"].to_numpy()
+    selected = np.zeros(len(df), dtype=bool)
+    for team_id in timeline.team_ids:
+        starts, ends = timeline.intervals(team_id, state)
+        # Start and stop rows of each interval: +1 / -1 marks summed into the rows inside an interval
+        marks = np.zeros(len(df) + 1, dtype=np.int64)
+        np.add.at(marks, np.searchsorted(clock, starts, side="right"), 1)
+        np.add.at(marks, np.searchsorted(clock, ends, side="right"), -1)
+        selected |= (np.cumsum(marks)[:-1] > 0) & (team == team_id)
+    return df[selected]
+
+## Minutes of each team in each game state, for the season aggregates
+
+STATE_SOURCE_COLUMNS = ["game_id", "team_id", "period_id", "minute", "window_minute", "clock", "goal", "qualifiers"]
+
+def league_state_minutes(store, game_ids):
+    """
+    Compute the minutes each team spent leading, drawing and trailing in games of a league, from the league store.
+
+    Parameters:
+    - store (LeagueStore): The memory-mapped league events.
+    - game_ids (list): The games.
+
+    Returns:
+    - pd.DataFrame: One row per game and team, with the minutes in each of GAME_STATES.
+    """
+    df = store.games_table(game_ids).select(STATE_SOURCE_COLUMNS).to_pandas()
+    rows = []
+    for game_id, game_df in df.groupby("game_id", sort=False):
+        team_ids = game_df.loc[game_df["team_id"].notnull(), "team_id"].unique()
+        timeline = GameStateTimeline(team_ids, goal_events(game_df))
+        mins = (0, game_df["minute"].max())
+        rows += [{"game_id": game_id, "team_id": team_id, **{state: timeline.state_minutes(team_id, state, mins) for state in GAME_STATES}}
+                 for team_id in team_ids]
+    return pd.DataFrame(rows, columns=["game_id", "team_id"] + GAME_STATES)
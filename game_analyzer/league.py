@@ -0,0 +1,247 @@
+import pandas as pd
+from .bitmaps import BitmapIndex, where
+from .cache import game_results, memoize, with_identifiers
+from .cube import league_cube
+from .game_state import GAME_STATES, league_state_minutes
+from .patterns import PatternMatcher
+from .percentiles import league_percentiles
+from .pressing import PRESSING_COLUMNS, league_pressing
+from .similarity import league_similarity_index
+from .data import get_game_clubs, prepare_game_events, team_names
+
+def split_by_game(df):
+    """
+    Split a season result by game.
+
+    Parameters:
+    - df (pd.DataFrame): The result, with a game_id column.
+
+    Returns:
+    - dict: The rows of each game.
+    """
+    return {game_id: game_df.reset_index(drop=True) for game_id, game_df in df.groupby("game_id", sort=False)}
+
+class League:
+    """
+    League events normalized once per data version, with the game -> row range index and the team names lookup.
+    Selecting a game is a slice of the league table, not a scan of the whole league.
+
+    The games are cached on their content hash and the season aggregates are kept game by game: after a data
+    refresh, only the new or corrected games and their share of the season aggregates are computed again.
+    """
+    def __init__(self, name, store):
+        self.name = name
+        self.store = store
+        self.version = store.version
+        self.game_hashes = store.game_hashes
+        self.games = store.games
+        self.team_names = team_names
+
+        # Game label -> game id, in date order (the date disambiguates two games with the same name)
+        self.game_ids = {}
+        for game in self.games:
+            label = game["game"] if game["game"] not in self.game_ids else f"{game['game']} ({game['date'].split('T')[0]})"
+            self.game_ids[label] = game["game_id"]
+        self.game_index = {game["game_id"]: game for game in self.games}
+        self.game_clubs = {game["game_id"]: get_game_clubs(game["game"]) for game in self.games}
+
+    def game_names(self):
+        """
+        Get the games of the league, ordered by date.
+
+        Returns:
+        - list: The game labels.
+        """
+        return list(self.game_ids)
+
+    def game_range(self, game_id):
+        """
+        Get the row range of a game in the league table.
+
+        Parameters:
+        - game_id (int): The game id.
+
+        Returns:
+        - tuple: The (start, stop) rows of the game.
+        """
+        if game_id not in self.game_index:
+            raise LookupError(f"Unknown game {game_id} in {self.name}")
+        return self.game_index[game_id]["start"], self.game_index[game_id]["stop"]
+
+    @memoize(key=lambda self, game_id: (self.name, game_id, self.game_hashes.get(game_id)), maxsize=32)
+    def game_events(self, game_id):
+        """
+        Get the events of a game, ready for the visualisations.
+        The result is memoized on the content hash of the game (it stays cached through the data refreshes which do
+        not change the game) and carries the game identifiers for the chart caches, it must not be modified in place.
+
+        Parameters:
+        - game_id (int): The game id.
+
+        Returns:
+        - pd.DataFrame: The events of the game.
+        - list: The two clubs of the game, home club first.
+        """
+        game_df = self.store.game_events(game_id)
+        events_df, clubs_sorted = prepare_game_events(game_df, self.game_index[game_id]["game"], self.name, self.game_clubs[game_id])
+        return with_identifiers(events_df, game_hash=self.game_hashes[game_id], league=self.name, game_id=game_id), clubs_sorted
+
+    @memoize(key=lambda self: (self.name, self.version), maxsize=4)
+    def event_index(self):
+        """
+        Get the bitmap index of the season events, for the composable event queries (see game_analyzer.bitmaps).
+        The result is memoized on the data version.
+
+        Returns:
+        - BitmapIndex: The index of the league events.
+        """
+        return BitmapIndex(self.store)
+
+    def season_events(self, query, columns=None):
+        """
+        Get the events of the season matching a query, resolved on the bitmap index (ex: the successful take-ons
+        in the final third of a player, where(type_name="TakeOn", outcome=True, third="final", player_name=player)).
+
+        Parameters:
+        - query (EventQuery): The query, built with game_analyzer.bitmaps.where.
+        - columns (list): The columns to read, all of them if None.
+
+        Returns:
+        - pd.DataFrame: The events, in date order.
+        """
+        return self.event_index().select(query, columns)
+
+    @memoize(key=lambda self: (self.name, self.version), maxsize=4)
+    def pattern_matcher(self):
+        """
+        Get the ordered event stream of the season for the event sequence patterns (see game_analyzer.patterns).
+        The result is memoized on the data version.
+
+        Returns:
+        - PatternMatcher: The pattern matcher of the league events.
+        """
+        return PatternMatcher(self.event_index())
+
+    def season_patterns(self, pattern, columns=None):
+        """
+        Get the event sequences of the season matching a pattern, in all the games at once (ex: a recovery followed
+        by a shot in the same possession, pattern(where(type_name="BallRecovery"), where(shot=True))).
+
+        Parameters:
+        - pattern (EventPattern): The pattern, built with game_analyzer.patterns.pattern.
+        - columns (list): The columns of the matched events, patterns.MATCH_COLUMNS (game and event ids, locations...) if None.
+
+        Returns:
+        - pd.DataFrame: One row per match and step (match_id, step and the event columns), in date order.
+        """
+        return self.pattern_matcher().select(pattern, columns)
+
+    @memoize(key=lambda self: (self.name, self.version), maxsize=4)
+    def season_cube(self):
+        """
+        Get the event counts of the whole season by game, team, player, window minute, game state and pitch zone,
+        read from the precomputed columns of the league store (season positional maps, rankings...).
+        The result is memoized on the data version, it must not be modified in place. The counts are kept by game,
+        only the games changed by a data refresh are counted again.
+
+        Returns:
+        - pd.DataFrame: The season cube.
+        """
+        cubes = game_results("cube", self.name).update(self.game_hashes, lambda game_ids: split_by_game(league_cube(self.store, game_ids)))
+        return pd.concat(cubes.values(), ignore_index=True) if cubes else league_cube(self.store, [])
+
+    @memoize(key=lambda self: (self.name, self.version), maxsize=4)
+    def season_shots(self):
+        """
+        Get the shots of the whole season with their xG, read from the precomputed xg column of the league store
+        (season shot maps, xG rankings...).
+        The result is memoized on the data version, it must not be modified in place.
+
+        Returns:
+        - pd.DataFrame: The shots (game, team, player, minute, game state, location, goal and xG).
+        """
+        columns = ["game_id", "team_id", "player_name", "minute", "game_state", "start_x", "start_y", "goal", "xg"]
+        shots = self.season_events(where(shot=True), columns)
+        shots["team_name"] = shots["team_id"].map(self.team_names)
+        return shots.rename(columns={"start_x": "x", "start_y": "y"})
+
+    @memoize(key=lambda self: (self.name, self.version), maxsize=4)
+    def season_state_minutes(self):
+        """
+        Get the minutes each team spent leading, drawing and trailing in each game of the season, to turn the
+        season counts split by game state into rates (ex: passes per 90 minutes while trailing).
+        The result is memoized on the data version, it must not be modified in place. Only the games changed by a
+        data refresh are computed again.
+
+        Returns:
+        - pd.DataFrame: One row per game and team, with the minutes in each game state.
+        """
+        minutes = game_results("state_minutes", self.name).update(self.game_hashes, lambda game_ids: split_by_game(league_state_minutes(self.store, game_ids)))
+        if not minutes:
+            return pd.DataFrame(columns=["game_id", "team_id"] + GAME_STATES)
+        state_minutes = pd.concat(minutes.values(), ignore_index=True)
+        state_minutes["team_name"] = state_minutes["team_id"].map(self.team_names)
+        return state_minutes
+
+    @memoize(key=lambda self: (self.name, self.version), maxsize=4)
+    def season_pressing(self):
+        """
+        Get the rolling pressing metrics of every team of every game of the season, computed in one pass over the
+        league store and split by game, so that a match view reads its pressing timeline without computing it.
+        The result is memoized on the data version, it must not be modified in place. Only the games changed by a
+        data refresh are computed again.
+
+        Returns:
+        - dict: For each game id, the pressing metrics of both teams by minute.
+        """
+        return game_results("pressing", self.name).update(self.game_hashes, lambda game_ids: split_by_game(league_pressing(self.store, game_ids=game_ids)))
+
+    def game_pressing(self, game_id):
+        """
+        Get the rolling pressing metrics of a game, from the season metrics.
+
+        Parameters:
+        - game_id (int): The game id.
+
+        Returns:
+        - pd.DataFrame: The pressing metrics of both teams by minute.
+        """
+        self.game_range(game_id)
+        return self.season_pressing().get(game_id, pd.DataFrame(columns=PRESSING_COLUMNS))
+
+    @memoize(key=lambda self: (self.name, self.version), maxsize=4)
+    def similarity_index(self):
+        """
+        Get the similar players index of the league, updated with the games not indexed yet on a data refresh.
+        The result is memoized on the data version.
+
+        Returns:
+        - SimilarityIndex: The index of the players of the league.
+        """
+        return league_similarity_index(self.name, self.store)
+
+    @memoize(key=lambda self: (self.name, self.version), maxsize=4)
+    def season_percentiles(self):
+        """
+        Get the distributions of the per-90 player metrics of the league by position group (quantile sketches),
+        with the games of a data refresh folded into the sketches of the previous version.
+        The result is memoized on the data version.
+
+        Returns:
+        - LeaguePercentiles: The percentiles of the league.
+        """
+        return league_percentiles(self.name, self.store)
+
+    def similar_players(self, player, club=None, k=10):
+        """
+        Get the players of the league most similar to a player over the season.
+
+        Parameters:
+        - player (string): The player name.
+        - club (string): The club of the player.
+        - k (int): The number of similar players.
+
+        Returns:
+        - pd.DataFrame: The k most similar players, most similar first.
+        """
+        return self.similarity_index().similar_players(player, club, k)
@@ -0,0 +1,80 @@
+"""
+Lineup timeline of a game: the on-pitch interval of each player, derived once from the substitution and card events.
+
+Each player who appears in the events has one row:
+- on_minute / on_reason: 0 and "start" for the starters, the minute of the SubstitutionOn event and "sub" otherwise.
+- off_minute / off_reason: the minute of the SubstitutionOff event ("sub") or of the red card ("red card"),
+  the last minute of the game and "end" if the player finished the game.
+
+A player is on the pitch during a window (start, end) if the interval overlaps it: on_minute <= end and off_minute >= start
+(both minutes of the window included, as in the clock module).
+"""
+import numpy as np
+import pandas as pd
+from .cache import memoize, frame_key
+
+RED_CARDS = ["SecondYellow", "Red"]
+
+@memoize(key=frame_key, maxsize=64)
+def game_lineups(events_df):
+    """
+    Build the lineup timeline of a game (or of a team in a game).
+    The result is memoized on the game identifiers, it must not be modified in place.
+
+    Parameters:
+    - events_df (pd.DataFrame): The prepared events of the game (with the team_name and cardType columns).
+
+    Returns:
+    - pd.DataFrame: One row per player: team_id, team_name, player_name, on_minute, on_reason, off_minute, off_reason.
+    """
+    players_df = events_df[events_df["player_name"].notnull()]
+    lineups = (players_df.groupby(["team_id", "player_name"], sort=False)
+               .agg(team_name=("team_name", "first"))
+               .reset_index())
+    players = pd.MultiIndex.from_frame(lineups[["team_id", "player_name"]])
+
+    def first_minute(mask):
+        # First minute of the selected events of each player, NaN if the player has none
+        return players_df[mask].groupby(["team_id", "player_name"])["minute"].min().reindex(players).to_numpy(dtype=float)
+
+    sub_on = first_minute(players_df["type_name"] == "SubstitutionOn")
+    sub_off = first_minute(players_df["type_name"] == "SubstitutionOff")
+    red_card = first_minute(players_df["cardType"].isin(RED_CARDS))
+
+    lineups["on_minute"] = np.where(np.isnan(sub_on), 0, sub_on)
+    lineups["on_reason"] = np.where(np.isnan(sub_on), "start", "sub")
+    # A player leaves the pitch at the first substitution or red card, whichever comes first
+    off_minute = np.fmin(sub_off, red_card)
+    lineups["off_minute"] = np.where(np.isnan(off_minute), events_df["minute"].max(), off_minute)
+    lineups["off_reason"] = np.select([np.isnan(off_minute), sub_off == off_minute], ["end", "sub"], "red card")
+    return lineups
+
+def players_on_pitch(lineups, mins):
+    """
+    Select the players on the pitch during a game timelapse, with a vectorized interval overlap test.
+
+    Parameters:
+    - lineups (pd.DataFrame): The lineup timeline, from game_lineups.
+    - mins (tuple): The game timelapse (start, end) in minutes, both included.
+
+    Returns:
+    - pd.DataFrame: The lineup rows of the players on the pitch during the timelapse.
+    """
+    return lineups[(lineups["on_minute"] <= mins[1]) & (lineups["off_minute"] >= mins[0])]
+
+def first_change_minute(lineups, team_id):
+    """
+    Get the minute of the first lineup change of a team (substitution or red card), the last minute of the game if none.
+
+    Parameters:
+    - lineups (pd.DataFrame): The lineup timeline, from game_lineups.
+    - team_id (int): The team id.
+
+    Returns:
+    - float: The number of minutes played by the first eleven of the team.
+    """
+    team_lineups = lineups[lineups["team_id"] == team_id]
+    changes = np.r_[team_lineups.loc[team_lineups["on_reason"] != "start", "on_minute"],
+                    team_lineups.loc[team_lineups["off_reason"] != "end", "off_minute"],
+                    team_lineups["off_minute"].max()]
+    return changes.min()
@@ -0,0 +1,58 @@
+import functools
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOGOS_DIR = os.path.join(ROOT_DIR, "logos")
+DEFAULT_LOGO = os.path.join(ROOT_DIR, "img", "logo_tr_139.png")
+
+dict_logo = {'EPL':'England - Premier League',
+             'Serie A':'Italy - Serie A',
+             'La Liga':'Spain - LaLiga',
+             'Bundesliga':'Germany - Bundesliga',
+             'Ligue 1':'France - Ligue 1',
+             'Eredivisie': 'Netherlands - Eredivisie',
+             'Liga Nos': 'Portugal - Liga Portugal',
+             'Jupiler Pro League': 'Belgium - Jupiler Pro League',
+             'Champions League': 'Europa - Champions League'}
+
+@functools.lru_cache(maxsize=None)
+def league_logos(league):
+    """
+    List the logo files of a league, scanned once per process.
+
+    Parameters:
+    - league (string): The league name.
+
+    Returns:
+    - list: The logo file names.
+    """
+    return os.listdir(os.path.join(LOGOS_DIR, dict_logo[league]))
+
+@functools.lru_cache(maxsize=None)
+def get_path_logo(league, club):
+    """
+    Get the path logo for a selected team.
+    The fuzzy match is cached per league and club.
+
+    Parameters:
+    - league (string): The league club.
+    - club (string): The selected club.
+
+    Returns:
+    - string: The path of the png logo.
+    """
+    # fuzzywuzzy is only needed when a chart is drawn, keep it out of the import path
+    from fuzzywuzzy import process
+
+    club = club.replace('-', ' ')
+
+    path_to_league_logo = os.path.join(LOGOS_DIR, dict_logo[league])
+    choices = league_logos(league)
+    logo_name_matched = process.extractOne(club, choices, score_cutoff=80)
+
+    if logo_name_matched != None:
+        logo_name_matched = logo_name_matched[0]
+        path_return = os.path.join(path_to_league_logo, logo_name_matched)
+        return path_return
+    else:
+        return DEFAULT_LOGO
@@ -0,0 +1,387 @@
+"""
+Passing network of both teams over consecutive windows of a game (ex: rolling 15 minutes in 5 minutes steps),
+as an animation (gif) or a frame strip (png).
+
+The data of all the windows comes from a single pass over the passes of the game: each pass is assigned to every
+window containing it (window convention of the clock module), and the positions, counts and values of all the
+windows are computed by one groupby. The figure is built once (pitches, titles, logos) and rendered once as a
+background, then each frame restores the background and only redraws the node, edge and label artists updated in
+place (blitting on the Agg canvas), instead of rebuilding a 400 dpi figure per window.
+"""
+import io
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from .cache import memoize, cache_key
+from .context import get_match_context
+from .game_state import game_state_timeline, state_label, state_window
+from .lineups import game_lineups
+from .rendering import chart_style, new_figure, release_figure
+
+# Default window length and step, in minutes
+ANIMATION_WINDOW = 15
+ANIMATION_STEP = 5
+
+NODES_COLORS = ['#b5dcff', '#97cbfa', '#70b9fa', '#2f97f5', '#0586fa']
+
+# Frames of the animation (start, end minutes of each window), the nodes and the edges of each frame
+PassingWindows = namedtuple("PassingWindows", ["frames", "nodes", "edges"])
+
+def window_frames(last_minute, window=ANIMATION_WINDOW, step=ANIMATION_STEP):
+    """
+    Get the consecutive windows of a game, the last one ends at the last minute of the game.
+
+    Parameters:
+    - last_minute (int): The last minute of the game.
+    - window (int): The window length, in minutes.
+    - step (int): The step between two windows, in minutes.
+
+    Returns:
+    - pd.DataFrame: One row per frame, with the start and end minutes of the window (both included).
+    """
+    starts = np.arange(0, max(last_minute - window + 1, 0) + 1, step)
+    if starts[-1] + window - 1 < last_minute:
+        starts = np.r_[starts, last_minute - window + 1]
+    return pd.DataFrame({"start": starts, "end": starts + window - 1})
+
+@memoize(key=lambda events_df, window=ANIMATION_WINDOW, step=ANIMATION_STEP, state=None: cache_key(events_df, window, step, state), maxsize=32)
+def passing_windows(events_df, window=ANIMATION_WINDOW, step=ANIMATION_STEP, state=None):
+    """
+    Compute the passing network of both teams for all the consecutive windows of a game, in one pass.
+    As in PassingNetwork, the player positions are the medians of the locations of all their passes in the window,
+    and only the successful passes between players who made one in the window, on the pitch during it, are counted.
+    The result is memoized on the game identifiers, it must not be modified in place.
+
+    Parameters:
+    - events_df (pd.DataFrame): The prepared events of the game.
+    - window (int): The window length, in minutes.
+    - step (int): The step between two windows, in minutes.
+    - state (string): Only the passes of each team while it was leading, drawing or trailing, all of them if None.
+
+    Returns:
+    - PassingWindows: The frames, and for each frame:
+      - nodes: team_id, player_name, x, y (pitch plot coordinates), num_passes, pass_value, starter.
+      - edges: team_id, player_name, recipient, num_passes, pass_value, and the positions of both players.
+    """
+    frames = window_frames(int(events_df["window_minute"].max()), window, step)
+    passes = events_df[(events_df["type_name"] == "Pass").to_numpy() & events_df["player_name"].notnull().to_numpy()
+                       & (events_df["window_minute"] >= 0).to_numpy()]
+    passes = state_window(passes, game_state_timeline(events_df), state)
+
+    # Frames containing each pass: from the first window ending after it to the last window starting before it
+    minute = passes["window_minute"].to_numpy()
+    first = np.searchsorted(frames["end"].to_numpy(), minute, side="left")
+    last = np.searchsorted(frames["start"].to_numpy(), minute, side="right")
+    counts = np.maximum(last - first, 0)
+    rows = np.repeat(np.arange(len(passes)), counts)
+    frame = np.repeat(first, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    windowed = pd.DataFrame({"frame": frame,
+                             "team_id": passes["team_id"].to_numpy()[rows],
+                             "player_name": passes["player_name"].to_numpy()[rows],
+                             "recipient": passes["pass_recipient_name"].to_numpy()[rows],
+                             "successful": (passes["outcome"] == True).to_numpy()[rows],
+                             "x": passes["x"].to_numpy(dtype=float)[rows],
+                             "y": passes["y"].to_numpy(dtype=float)[rows],
+                             "xT_added": passes["xT_added"].to_numpy(dtype=float)[rows]})
+
+    keys = ["frame", "team_id", "player_name"]
+    # Vertical pitch: the plot x is the event y and the plot y is the event x
+    positions = windowed.groupby(keys)[["y", "x"]].median().set_axis(["x", "y"], axis=1)
+
+    # Players on the pitch during each window
+    lineups = game_lineups(events_df)
+    players = positions.reset_index()[keys].merge(lineups[["team_id", "player_name", "on_minute", "off_minute", "on_reason"]],
+                                                 on=["team_id", "player_name"], how="left")
+    on_pitch = ((players["on_minute"] <= frames["end"].to_numpy()[players["frame"]]).to_numpy()
+                & (players["off_minute"] >= frames["start"].to_numpy()[players["frame"]]).to_numpy())
+    players = players[on_pitch]
+    positions = positions.reindex(pd.MultiIndex.from_frame(players[keys]))
+
+    successful = windowed[windowed["successful"].to_numpy() & windowed["recipient"].notnull().to_numpy()
+                          & (windowed["recipient"] != windowed["player_name"]).to_numpy()]
+    successful = successful[pd.MultiIndex.from_frame(successful[["frame", "team_id", "recipient"]]).isin(positions.index)
+                            & pd.MultiIndex.from_frame(successful[keys]).isin(positions.index)]
+
+    nodes = (successful.groupby(keys)["xT_added"].agg(num_passes="count", pass_value="sum")
+             .reindex(positions.index).fillna(0))
+    nodes = positions.join(nodes)
+    nodes["starter"] = (players["on_reason"] == "start").to_numpy()
+    nodes = nodes.reset_index()
+
+    edges = (successful.groupby(keys + ["recipient"])["xT_added"].agg(num_passes="count", pass_value="sum")
+             .reset_index())
+    start = positions.reindex(pd.MultiIndex.from_frame(edges[keys])).to_numpy()
+    end = positions.reindex(pd.MultiIndex.from_frame(edges[["frame", "team_id", "recipient"]])).to_numpy()
+    edges[["x", "y"]] = start
+    edges[["end_x", "end_y"]] = end
+    return PassingWindows(frames, nodes, edges)
+
+def change_range(values, old_range, new_range):
+    """
+    Map values from a range to another one, clipped to the new range (vectorized PassingNetwork.change_range).
+
+    Parameters:
+    - values (np.array): The values.
+    - old_range (tuple): The range of the values (min_value, max_value).
+    - new_range (tuple): The new range (min_value, max_value).
+
+    Returns:
+    - np.array: The values in the new range.
+    """
+    old_span = max(old_range[1] - old_range[0], 1e-9)
+    new_values = (np.asarray(values, dtype=float) - old_range[0]) / old_span * (new_range[1] - new_range[0]) + new_range[0]
+    return np.clip(new_values, new_range[0], new_range[1])
+
+class PassingNetworkAnimation():
+    """
+    Display the passing network of both teams over consecutive windows of the game, as an animation or a frame strip.
+    """
+    # Minimum number of passes between two players in a window to draw their edge
+    min_passes = 2
+    min_node_size = 5
+    max_node_size = 30
+    min_edge_width = 0.5
+    max_edge_width = 4
+
+    def __init__(self, events_df, window=ANIMATION_WINDOW, step=ANIMATION_STEP, context=None, state=None):
+        """
+        Parameters:
+        - events_df (pd.DataFrame): The prepared events of the game.
+        - window (int): The window length, in minutes.
+        - step (int): The step between two windows, in minutes.
+        - context (MatchContext): The match context, built from the events if None.
+        - state (string): Only the passes of each team while it was leading, drawing or trailing, all of them if None.
+        """
+        self.events_df = events_df
+        self.window = window
+        self.step = step
+        self.context = context if context is not None else get_match_context(events_df)
+        self.state = state
+        self.windows = passing_windows(events_df, window, step, state)
+
+    def get_stats(self):
+        """
+        Get the passing network of both teams for each window, as JSON serializable values.
+
+        Returns:
+        - dict: The window and step, and for each frame the window minutes and for each team (home team first, see
+          MatchContext.team) the nodes and edges.
+        """
+        frames = []
+        for frame, (start, end) in enumerate(self.windows.frames.itertuples(index=False)):
+            teams = []
+            for team_id in [self.context.home_team_id, self.context.away_team_id]:
+                team_stats = self.context.team(team_id)
+                for key, df in [("nodes", self.windows.nodes), ("edges", self.windows.edges)]:
+                    df = df[(df["frame"] == frame).to_numpy() & (df["team_id"] == team_id).to_numpy()].drop(columns=["frame", "team_id"])
+                    team_stats[key] = df.astype(object).where(df.notnull(), None).to_dict(orient="records")
+                teams.append(team_stats)
+            frames.append({"mins": [int(start), int(end)], "teams": teams})
+        return {"window": self.window, "step": self.step, "state": self.state, "frames": frames}
+
+    def iter_frames(self, dpi=100):
+        """
+        Render the frames of the animation: the figure is built and drawn once, then each frame only redraws
+        the nodes, edges and labels of both teams over the saved background.
+
+        Parameters:
+        - dpi (int): The resolution of the frames.
+
+        Returns:
+        - generator: The frames, as RGBA np.array (height, width, 4).
+        """
+        import matplotlib as mpl
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.collections import LineCollection
+        from mplsoccer.pitch import VerticalPitch
+
+        context = self.context
+        nodes, edges = self.windows.nodes, self.windows.edges
+        node_cmap = mpl.colors.LinearSegmentedColormap.from_list("", NODES_COLORS)
+        # Scales shared by all the frames, so that the sizes are comparable from one window to the next
+        max_player_count = max(nodes["num_passes"].max() if len(nodes) else 1, 2)
+        max_player_value = max(nodes["pass_value"].max() if len(nodes) else 0, 0.02)
+        max_pair_count = max(edges["num_passes"].max() if len(edges) else 1, self.min_passes + 1)
+        max_pair_value = max(edges["pass_value"].max() if len(edges) else 0, 0.02)
+
+        with chart_style():
+            fig, ax = new_figure(1, 2, figsize=(6, 5), dpi=dpi)
+            canvas = FigureCanvasAgg(fig)
+            font = 'serif'
+            artists = []
+            for i, team_id in enumerate([context.home_team_id, context.away_team_id]):
+                pitch = VerticalPitch(pitch_type='opta', line_color='#7c7c7c', goal_type='box', linewidth=0.5, pad_bottom=10)
+                pitch.draw(ax=ax[i], constrained_layout=False, tight_layout=False)
+                ax[i].annotate(xy=(102, 58), xytext=(102, 43), zorder=2, text='', ha='center',
+                               arrowprops=dict(arrowstyle='->, head_length=0.3, head_width=0.1', color='#7c7c7c', lw=0.5))
+                ax[i].annotate(xy=(104, 45), text='Play direction', ha='center', color='#7c7c7c', rotation=90, size=4)
+                fig.text(x=0.27 + 0.475 * i, y=.86, s=context.club(team_id), weight='bold', va="bottom", ha="center", fontsize=8, font=font)
+
+                team_edges = LineCollection([], zorder=2, capstyle='round', animated=True)
+                ax[i].add_collection(team_edges)
+                outlines = ax[i].scatter([], [], s=[], color='white', zorder=4, animated=True)
+                team_nodes = ax[i].scatter([], [], s=[], zorder=5, animated=True)
+                # A team can have no pass at all (ex: the leading team of a game it never led)
+                team_sizes = nodes[nodes["team_id"] == team_id].groupby("frame").size()
+                n_labels = int(team_sizes.max()) if len(team_sizes) else 0
+                labels = [ax[i].text(0, 0, "", ha="center", va="center", zorder=7, fontsize=4, color='black', font=font,
+                                     weight='heavy', animated=True) for _ in range(n_labels)]
+                artists.append((team_id, team_edges, outlines, team_nodes, labels))
+
+            fig.text(x=0.5, y=.93, s=f"Passing network for {context.home_club} {context.score} {context.away_club}", weight='bold', va="bottom", ha="center", fontsize=10, font=font)
+            fig.text(x=0.5, y=0.905, s=f"{context.league} | Season 2024-2025 | {context.date}", va="bottom", ha="center", fontsize=6, font=font)
+            minutes_label = fig.text(x=0.5, y=0.06, s="", va="bottom", ha="center", fontsize=7, font=font, color='#7c7c7c', animated=True)
+            self.add_logos(fig, dpi)
+            fig.subplots_adjust(left=0.02, right=0.98, top=0.85, bottom=0.08, wspace=0.1)
+
+            canvas.draw()
+            background = canvas.copy_from_bbox(fig.bbox)
+            try:
+                for frame, (start, end) in enumerate(self.windows.frames.itertuples(index=False)):
+                    canvas.restore_region(background)
+                    for team_id, team_edges, outlines, team_nodes, labels in artists:
+                        team_nodes_df = nodes[(nodes["frame"] == frame).to_numpy() & (nodes["team_id"] == team_id).to_numpy()]
+                        team_edges_df = edges[(edges["frame"] == frame).to_numpy() & (edges["team_id"] == team_id).to_numpy()
+                                              & (edges["num_passes"] >= self.min_passes).to_numpy()]
+                        self.update_nodes(team_nodes_df, outlines, team_nodes, labels, node_cmap,
+                                          (1, max_player_count), (0.01, max_player_value))
+                        self.update_edges(team_edges_df, team_edges, node_cmap,
+                                          (self.min_passes, max_pair_count), (0.01, max_pair_value))
+                        for artist in [team_edges, outlines, team_nodes] + labels:
+                            artist.axes.draw_artist(artist)
+                    minutes_label.set_text(f"Passes from minutes {start} to {end}{state_label(self.state)}")
+                    fig.draw_artist(minutes_label)
+                    yield np.asarray(canvas.buffer_rgba()).copy()
+            finally:
+                release_figure(fig)
+
+    def update_nodes(self, df, outlines, team_nodes, labels, node_cmap, count_range, value_range):
+        """
+        Update in place the nodes and labels of a team for a frame.
+
+        Parameters:
+        - df (pd.DataFrame): The nodes of the team in the frame.
+        - outlines, team_nodes (matplotlib.PathCollection): The white outlines and the nodes.
+        - labels (list): The label artists of the team, the unused ones are hidden.
+        - node_cmap (matplotlib.Colormap): The node colormap.
+        - count_range, value_range (tuple): The scales of the pass counts and of the pass values.
+        """
+        offsets = df[["x", "y"]].to_numpy()
+        marker_size = change_range(df["num_passes"], count_range, (self.min_node_size, self.max_node_size))
+        # The scatter sizes are areas, the marker sizes of PassingNetwork are diameters
+        for collection, size in [(outlines, marker_size + 2), (team_nodes, marker_size)]:
+            collection.set_offsets(offsets)
+            collection.set_sizes(size ** 2)
+        team_nodes.set_facecolor(node_cmap(change_range(df["pass_value"], value_range, (0, 1))))
+        team_nodes.set_paths([mpl_marker("." if starter else "^") for starter in df["starter"]])
+        outlines.set_paths(team_nodes.get_paths())
+
+        delta_y = np.select([marker_size > 30, marker_size > 20, marker_size > 10], [5, 3.5, 2.5], 1.5)
+        label_y = np.where(offsets[:, 1] > 48, offsets[:, 1] + delta_y, offsets[:, 1] - delta_y) if len(df) else []
+        for k, label in enumerate(labels):
+            if k < len(df):
+                name = df["player_name"].iloc[k]
+                label.set_text(' '.join(name.split(' ')[1:]) if len(name.split(' ')) > 1 else name)
+                label.set_position((offsets[k, 0], label_y[k]))
+            label.set_visible(k < len(df))
+
+    def update_edges(self, df, team_edges, node_cmap, count_range, value_range):
+        """
+        Update in place the edges of a team for a frame. The two directions of a pair are shifted on each side of the
+        line between the players, as in PassingNetwork.
+
+        Parameters:
+        - df (pd.DataFrame): The edges of the team in the frame.
+        - team_edges (matplotlib.LineCollection): The edges.
+        - node_cmap (matplotlib.Colormap): The edge colormap.
+        - count_range, value_range (tuple): The scales of the pass counts and of the pass values.
+        """
+        x, y, end_x, end_y = (df[column].to_numpy() for column in ["x", "y", "end_x", "end_y"])
+        dx, dy = end_x - x, end_y - y
+        shift_x = 2
+        shift_y = shift_x * 68 / 105
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = np.round(np.abs(dy * 105 / 100 / dx * 68 / 100), 1)
+        steep = slope > 0.5
+        offset_x = np.where(steep, np.where(dy > 0, shift_x, -shift_x), 0)
+        offset_y = np.where(steep, 0, np.where(dx > 0, -shift_y, shift_y))
+        segments = np.stack([np.column_stack([x + offset_x, y + offset_y]),
+                             np.column_stack([end_x + offset_x, end_y + offset_y])], axis=1)
+        # Stop the edges before the node of the recipient
+        segments[:, 1] -= np.column_stack([dx, dy]) * 0.15
+        team_edges.set_segments(segments)
+        team_edges.set_linewidths(change_range(df["num_passes"], count_range, (self.min_edge_width, self.max_edge_width)))
+        colors = node_cmap(change_range(df["pass_value"], value_range, (0, 1)))
+        colors[:, 3] = change_range(df["pass_value"], value_range, (0.4, 1))
+        team_edges.set_color(colors)
+
+    def add_logos(self, fig, dpi):
+        """
+        Add the club logos above the pitches.
+
+        Parameters:
+        - fig (matplotlib.Fig): The figure.
+        - dpi (int): The resolution of the figure.
+        """
+        from PIL import Image
+
+        # Same logo size relative to the figure as PassingNetwork (0.35 of the logo at 400 dpi)
+        pc = 0.35 * dpi / 400
+        width, height = fig.bbox.width, fig.bbox.height
+        for x, logo_path in [(0.08, self.context.home_logo), (0.84, self.context.away_logo)]:
+            img = Image.open(logo_path)
+            img = img.resize((max(int(img.width * pc), 1), max(int(img.height * pc), 1)))
+            fig.figimage(img, xo=int(x * width), yo=int(0.87 * height), zorder=2)
+
+    def plot_frame_strip(self, columns=4, dpi=100):
+        """
+        Plot all the frames of the animation in a grid.
+
+        Parameters:
+        - columns (int): The number of frames per row.
+        - dpi (int): The resolution of each frame.
+
+        Returns:
+        - np.array: The frame strip, RGBA (height, width, 4).
+        """
+        frames = list(self.iter_frames(dpi))
+        blank = np.full_like(frames[0], 255)
+        frames += [blank] * (-len(frames) % columns)
+        return np.concatenate([np.concatenate(frames[k:k + columns], axis=1) for k in range(0, len(frames), columns)], axis=0)
+
+    def encode_animation(self, fmt="gif", dpi=100, duration=800):
+        """
+        Encode the animation as a gif, or the frame strip as a png.
+
+        Parameters:
+        - fmt (string): "gif" or "png".
+        - dpi (int): The resolution of the frames.
+        - duration (int): The display duration of each gif frame, in milliseconds.
+
+        Returns:
+        - bytes: The encoded animation.
+        """
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        if fmt == "png":
+            Image.fromarray(self.plot_frame_strip(dpi=dpi)).save(buffer, format="png")
+        else:
+            images = [Image.fromarray(frame).convert("RGB") for frame in self.iter_frames(dpi)]
+            images[0].save(buffer, format="gif", save_all=True, append_images=images[1:], duration=duration, loop=0)
+        return buffer.getvalue()
+
+def mpl_marker(marker):
+    """
+    Get the path of a matplotlib marker, as drawn by a scatter.
+
+    Parameters:
+    - marker (string): The marker (ex: "." or "^").
+
+    Returns:
+    - matplotlib.Path: The marker path.
+    """
+    from matplotlib.markers import MarkerStyle
+
+    style = MarkerStyle(marker)
+    return style.get_path().transformed(style.get_transform())
@@ -1,25 +1,35 @@
 import pandas as pd
-import os
-import matplotlib as mpl
-from matplotlib import pyplot as plt
-from matplotlib.patches import ArrowStyle,FancyArrowPatch, Circle,FancyArrow
-from mplsoccer.pitch import VerticalPitch
-from matplotlib.colors import Normalize
-from matplotlib import cm
-import os
-from fuzzywuzzy import process
-from PIL import Image
+from collections import namedtuple
+from .cache import memoize, cache_key
+from .clock import window
+from .context import get_match_context
+from .game_state import game_state_timeline, state_label, state_window
+from .lineups import game_lineups, players_on_pitch, first_change_minute
+from .logos import get_path_logo
+from .rendering import new_figure, with_chart_style
 import warnings
 warnings.filterwarnings("ignore")
 
+# Scales shared by the two teams of a passing network, displayed in the legend
+PassingNetworkScales = namedtuple("PassingNetworkScales", ["max_player_count", "max_player_value", "max_pair_count", "max_pair_value"])
+
 class PassingNetwork():
     """
     Display the passing network of both teams with all the necessary details (game, score, visualisations, logos...).
     """
-    def __init__(self, events_df, mins):
+    def __init__(self, events_df, mins, context=None, state=None):
+        """
+        Parameters:
+        - events_df (pd.DataFrame): The prepared events of the game.
+        - mins (tuple): The game timelapse (start, end) in minutes.
+        - context (MatchContext): The match context, built from the events if None.
+        - state (string): Only the passes of each team while it was leading, drawing or trailing, all of them if None.
+        """
         self.events_df = events_df
         self.mins = mins
+        self.state = state
         self.ax = None
+        self.context = context if context is not None else get_match_context(events_df)
         self.res_dict = self.create_res_dict()
         self.head_length = 0.3
         self.head_width = 0.1
@@ -44,9 +54,11 @@ class PassingNetwork():
         else:
             return new_value
         
+    @memoize(key=lambda self: cache_key(self.events_df, tuple(self.mins), self.state))
     def create_res_dict(self):
         """
         Create a dict with all the necessary values for each team, in order to plot the passing network.
+        The result is memoized on the game identifiers, the game timelapse and the game state.
 
         Returns:
         - dict: The passing network data for each team
@@ -54,13 +66,9 @@ class PassingNetwork():
         res_dict = {}
 
         mins = self.mins
+        timeline = game_state_timeline(self.events_df)
 
         teamIds = self.events_df['team_id'].unique()
-        PassingNetwork.league = self.events_df.loc[0, "league"]
-        PassingNetwork.score = self.events_df.loc[0, "score"].replace(":", "-")
-        PassingNetwork.date = self.events_df.loc[0, "date"].split("T")[0]
-        PassingNetwork.home_club = self.events_df[self.events_df["h_a"] == "h"]["team_name"].values[0].replace("-", " ")
-        PassingNetwork.away_club = self.events_df[self.events_df["h_a"] == "a"]["team_name"].values[0].replace("-", " ")
 
         for teamId in teamIds:
             
@@ -71,45 +79,32 @@ class PassingNetwork():
                 
             venue = 'home' if df_[df_['team_id'] == teamId]['h_a'].unique()[0] == 'h' else 'away'
 
-            mask1 = df_['cardType'].apply(lambda x: x in ["SecondYellow", "Red"])
-            first_red_card_minute = df_[mask1].minute.min()
-
-            mask2 = self.events_df['type_name'] == 'SubstitutionOn'
-            first_sub_min = self.events_df[mask2].minute.min()
-
-            max_minute = df_.minute.max()
-
-            minutes_with_first_eleven = min(first_sub_min, first_red_card_minute, max_minute)
+            # The lineup timeline gives the first substitution or red card of the team itself
+            minutes_with_first_eleven = first_change_minute(game_lineups(self.events_df), teamId)
             
             passes_df = df_.reset_index().drop('index', axis=1)
             passes_df['player_id'] = passes_df['player_id'].astype('Int64')
             passes_df = passes_df[passes_df['player_id'].notnull()]
-            passes_df['passRecipientName'] = passes_df['player_name'].shift(-1)
-            passes_df = passes_df[passes_df['passRecipientName'].notnull()]
+            # Recipients computed at ingest from the possession chains (only the successful passes have one)
+            passes_df['passRecipientName'] = passes_df['pass_recipient_name']
             
             #DF with all passes
             mask1 = passes_df['type_name'].apply(lambda x: x in ['Pass'])
             passes_df_all = passes_df[mask1]
             
-            #DF with all passes before num_minutes (additional filter on first 11 players)
-            # mask2 = passes_df_all['minute'] < num_minutes
-            mask2 = (passes_df_all['minute'] > mins[0]) & (passes_df_all['minute'] < mins[1])
-            # players = passes_df_all[passes_df_all['minute'] < num_minutes]['player_name'].unique()
-            players = passes_df_all[(passes_df_all['minute'] > mins[0]) & (passes_df_all['minute'] < mins[1])]['player_name'].unique()
-            mask3 = passes_df_all['player_name'].apply(lambda x: x in players)
-            passes_df_short = passes_df_all[mask2 & mask3]
+            #DF with all passes during the timelapse (and the game state)
+            passes_df_short = state_window(window(passes_df_all, mins), timeline, self.state)
             
             
             #DF with successed / completed passes
-            mask2 = passes_df_all['player_name'] != passes_df_all['passRecipientName']
+            mask2 = passes_df_all['passRecipientName'].notnull() & (passes_df_all['player_name'] != passes_df_all['passRecipientName'])
             mask3 = passes_df_all['outcome'] == True
             passes_df_suc = passes_df_all[mask2&mask3]
             
-            mask2 = (passes_df_all['minute'] > mins[0]) & (passes_df_all['minute'] < mins[1])
-            players = passes_df_suc[(passes_df_suc['minute'] > mins[0]) & (passes_df_suc['minute'] < mins[1])]['player_name'].unique()
-            mask3 = passes_df_suc['player_name'].apply(lambda x: x in players) & \
-                    passes_df_suc['passRecipientName'].apply(lambda x: x in players)
-            passes_df_suc_short = passes_df_suc[mask2 & mask3]
+            #DF with successed passes during the timelapse, between players who made one during the timelapse
+            passes_df_suc_short = state_window(window(passes_df_suc, mins), timeline, self.state)
+            players = passes_df_suc_short['player_name'].unique()
+            passes_df_suc_short = passes_df_suc_short[passes_df_suc_short['passRecipientName'].isin(players)]
             
             res_dict[teamId] = {}
             
@@ -181,6 +176,25 @@ class PassingNetwork():
 
         return res_dict
         
+    def get_stats(self):
+        """
+        Get the passing network data of both teams, as JSON serializable values.
+
+        Returns:
+        - dict: For each team (home team first, see MatchContext.team), the player positions, the pass counts and
+          values by player and by pair of players.
+        """
+        stats = {"mins": list(self.mins), "state": self.state, "teams": []}
+        for teamId in [self.context.home_team_id, self.context.away_team_id]:
+            team_dict = self.res_dict[teamId]
+            team_stats = {**self.context.team(teamId), "minutes_with_first_eleven": float(team_dict["minutes_with_first_eleven"])}
+            for key in ["player_position", "player_pass_count", "pair_pass_count", "player_pass_value", "pair_pass_value"]:
+                df = team_dict[key].reset_index()
+                team_stats[key] = df.astype(object).where(df.notnull(), None).to_dict(orient="records")
+            stats["teams"].append(team_stats)
+        return stats
+
+    @with_chart_style
     def plot_passing_network(self):
         """
         Plot the passing network for the both teams.
@@ -188,6 +202,11 @@ class PassingNetwork():
         Returns:
         - matplotlib.Fig: The passing network.
         """
+        import matplotlib as mpl
+        from matplotlib.colors import Normalize
+        from matplotlib import cm
+        from mplsoccer.pitch import VerticalPitch
+
         nodes_cmap = mpl.colors.LinearSegmentedColormap.from_list("", ['#b5dcff',
                                                                '#97cbfa',
                                                                '#70b9fa',
@@ -198,7 +217,7 @@ class PassingNetwork():
 
         norm = Normalize(vmin=0, vmax=1)
 
-        res_dict = self.create_res_dict()
+        res_dict = self.res_dict
 
         # print(res_dict[304]['pair_pass_value'])
 
@@ -208,12 +227,10 @@ class PassingNetwork():
 
         # max_player_count = 90
         max_player_count = max([res_dict[list(res_dict.keys())[0]]["player_pass_count"]["num_passes"].max(), res_dict[list(res_dict.keys())[1]]["player_pass_count"]["num_passes"].max()])
-        PassingNetwork.max_player_count = max_player_count
         min_player_count = 1
 
         # max_player_value = 0.36
         max_player_value = max([res_dict[list(res_dict.keys())[0]]["player_pass_value"]["pass_value"].max(), res_dict[list(res_dict.keys())[1]]["player_pass_value"]["pass_value"].max()])
-        PassingNetwork.max_player_value = max_player_value
         min_player_value = 0.01
 
         #font
@@ -230,23 +247,21 @@ class PassingNetwork():
 
         # max_pair_count = 20
         max_pair_count = max([res_dict[list(res_dict.keys())[0]]["pair_pass_count"]["num_passes"].max(), res_dict[list(res_dict.keys())[1]]["pair_pass_count"]["num_passes"].max()])
-        PassingNetwork.max_pair_count = max_pair_count
         min_pair_count = 1
 
         min_pair_value  = 0.01
         # max_pair_value = 0.085
         max_pair_value = max([res_dict[list(res_dict.keys())[0]]["pair_pass_value"]["pass_value"].max(), res_dict[list(res_dict.keys())[1]]["pair_pass_value"]["pass_value"].max()])
-        PassingNetwork.max_pair_value = max_pair_value
+        context = self.context.with_scales(PassingNetworkScales(max_player_count, max_player_value, max_pair_count, max_pair_value))
 
         min_passes = 5
 
-        plt.style.use('fivethirtyeight')
-
-        fig,ax = plt.subplots(1,2,figsize=(6,6), dpi=400)
+        fig,ax = new_figure(1,2,figsize=(6,6), dpi=400)
         self.ax = ax
 
         teamId_home = self.events_df[self.events_df['h_a'] == 'h']['team_id'].unique()[0]
         teamId_away = self.events_df[self.events_df['h_a'] == 'a']['team_id'].unique()[0]
+        lineups = game_lineups(self.events_df)
 
         for i, teamid in enumerate([teamId_home, teamId_away]):    
 
@@ -256,8 +271,6 @@ class PassingNetwork():
             pair_pass_count = res_dict[teamid]['pair_pass_count']
             player_pass_value = res_dict[teamid]['player_pass_value']
             pair_pass_value = res_dict[teamid]['pair_pass_value']
-            minutes_ = res_dict[teamid]['minutes']
-            minutes_with_first_eleven = res_dict[teamid]['minutes_with_first_eleven']
 
             pitch = VerticalPitch(pitch_type='opta', 
                                 line_color='#7c7c7c',
@@ -276,23 +289,17 @@ class PassingNetwork():
             # Step 2: processing for plotting nodes
             player_stats = pd.merge(player_pass_count, player_pass_value, left_index=True, right_index=True)
 
-            #FILTER first 11 players
-            mask = self.events_df['minute'] < minutes_with_first_eleven
-            players_in_first_eleven = list(set(self.events_df[mask]['player_name'].dropna()))
-            
-            #FILTER players during timelapse selected 
-            mask = self.events_df['minute'] < minutes_
-            players_ = list(set(self.events_df[mask]['player_name'].dropna()))
-            
-            mask_ = player_stats.index.map(lambda x: x in players_)
-            player_stats = player_stats.loc[mask_]
-            
-            mask_ = pair_stats2.index.map(lambda x: (x.split('_')[0] in players_) &  (x.split('_')[1] in players_))
-            pair_stats2 = pair_stats2[mask_]
-            
-            ind = position.index.map(lambda x: x in players_)
-            position = position.loc[ind]
-            
+            #FILTER players of the team on the pitch during the timelapse selected
+            team_lineups = lineups[lineups['team_id'] == teamid]
+            players_in_first_eleven = set(team_lineups.loc[team_lineups['on_reason'] == 'start', 'player_name'])
+            players_ = players_on_pitch(team_lineups, self.mins)['player_name']
+
+            player_stats = player_stats[player_stats.index.isin(players_)]
+
+            pairs = pair_stats2.index.str.split('_')
+            pair_stats2 = pair_stats2[pairs.str[0].isin(players_) & pairs.str[1].isin(players_)]
+
+            position = position[position.index.isin(players_)]
             
             # Step 3: plotting nodes
             for var, row in player_stats.iterrows():
@@ -417,18 +424,25 @@ class PassingNetwork():
                 except KeyError:
                     pass
                     
-            self.add_legend(fig, i)
+            self.add_legend(fig, i, context)
 
         return fig
 
-    def add_legend(self, fig, i):
+    def add_legend(self, fig, i, context):
         """
         Add the legend for each ax (each passing network team) in the fig.
 
         Parameters:
         - fig (matplotlib.Fig): the matplotlib figure
         - i (int): the index for each ax of the figure.
+        - context (MatchContext): the match context, with the passing network scales.
         """
+        import matplotlib as mpl
+        from matplotlib.patches import ArrowStyle, FancyArrowPatch, Circle
+        from matplotlib.colors import Normalize
+        from matplotlib import cm
+        from PIL import Image
+
         ax = self.ax[i]
 
         nodes_cmap = mpl.colors.LinearSegmentedColormap.from_list("", ['#b5dcff',
@@ -466,14 +480,14 @@ class PassingNetwork():
                     arrowprops=dict(arrowstyle=f'->, head_length={self.head_length}, head_width={self.head_width}',
                                     color='#7c7c7c', lw=0.5))
         ax.annotate(xy=(104, 45), text='Play direction', ha='center', color='#7c7c7c', rotation=90, size=4)
-        ax.annotate(xy=(50, -5), text=f'Passes from minutes {self.mins[0]} to {self.mins[1]}', ha='center', color='#7c7c7c', size=6)
+        ax.annotate(xy=(50, -5), text=f'Passes from minutes {self.mins[0]} to {self.mins[1]}{state_label(self.state)}', ha='center', color='#7c7c7c', size=6)
 
         # Adding text annotations
         font = 'serif'
-        fig.text(x=0.5, y=.92, s=f"Passing network for {PassingNetwork.home_club} {PassingNetwork.score} {PassingNetwork.away_club}", weight='bold', va="bottom", ha="center", fontsize=10, font=font)
-        fig.text(x=0.26, y=.875, s=PassingNetwork.home_club, weight='bold', va="bottom", ha="center", fontsize=8, font=font)
-        fig.text(x=0.745, y=.875, s=PassingNetwork.away_club, weight='bold', va="bottom", ha="center", fontsize=8, font=font)
-        fig.text(x=0.5, y=0.90, s=f"{PassingNetwork.league} | Season 2024-2025 | {PassingNetwork.date}", va="bottom", ha="center", fontsize=6, font=font)
+        fig.text(x=0.5, y=.92, s=f"Passing network for {context.home_club} {context.score} {context.away_club}", weight='bold', va="bottom", ha="center", fontsize=10, font=font)
+        fig.text(x=0.26, y=.875, s=context.home_club, weight='bold', va="bottom", ha="center", fontsize=8, font=font)
+        fig.text(x=0.745, y=.875, s=context.away_club, weight='bold', va="bottom", ha="center", fontsize=8, font=font)
+        fig.text(x=0.5, y=0.90, s=f"{context.league} | Season 2024-2025 | {context.date}", va="bottom", ha="center", fontsize=6, font=font)
         fig.text(x=0.87, y=-0.0, s="Yannis R", va="bottom", ha="center", weight='bold', fontsize=12, font=font, color='black')
         fig.text(x=0.14, y=.14, s="Pass count between", va="bottom", ha="center", fontsize=6, font=font)
         fig.text(x=0.38, y=.14, s="Pass value between (xT)", va="bottom", ha="center", fontsize=6, font=font)
@@ -483,10 +497,10 @@ class PassingNetwork():
         fig.text(x=0.6, y=.038, s="High", va="bottom", ha="center", fontsize=6, font=font)
         fig.text(x=0.1, y=-0.0, s="linkedin.com/in/yannis-rachid-230/", va="bottom", ha="center", weight='bold', fontsize=6, font=font, color='black')
         fig.text(x=0.04, y=0.02, s="Template: FOOTSCI", va="bottom", ha="center", weight='bold', fontsize=6, font=font, color='black')
-        fig.text(x=0.13, y=0.07, s=f"5 to {int(PassingNetwork.max_pair_count)}", va="bottom", ha="center", fontsize=5, font=font, color='black')
-        fig.text(x=0.37, y=0.07, s=f"0 to {round(PassingNetwork.max_pair_value, 2)}", va="bottom", ha="center", fontsize=5, font=font, color='black')
-        fig.text(x=0.61, y=0.07, s=f"1 to {PassingNetwork.max_player_count}", va="bottom", ha="center", fontsize=5, font=font, color='black')
-        fig.text(x=0.84, y=0.07, s=f"0.01 to {round(PassingNetwork.max_player_value, 2)}", va="bottom", ha="center", fontsize=5, font=font, color='black')
+        fig.text(x=0.13, y=0.07, s=f"5 to {int(context.scales.max_pair_count)}", va="bottom", ha="center", fontsize=5, font=font, color='black')
+        fig.text(x=0.37, y=0.07, s=f"0 to {round(context.scales.max_pair_value, 2)}", va="bottom", ha="center", fontsize=5, font=font, color='black')
+        fig.text(x=0.61, y=0.07, s=f"1 to {context.scales.max_player_count}", va="bottom", ha="center", fontsize=5, font=font, color='black')
+        fig.text(x=0.84, y=0.07, s=f"0.01 to {round(context.scales.max_player_value, 2)}", va="bottom", ha="center", fontsize=5, font=font, color='black')
 
         head_length = 20
         head_width = 20
@@ -553,10 +567,10 @@ class PassingNetwork():
 
         fig.patches.extend([arrow9])
 
-        home_logo_path = self.get_path_logo(PassingNetwork.league, PassingNetwork.home_club)
+        home_logo_path = context.home_logo
         home_img = Image.open(home_logo_path)
 
-        away_logo_path = self.get_path_logo(PassingNetwork.league, PassingNetwork.away_club)
+        away_logo_path = context.away_logo
         away_img = Image.open(away_logo_path)
 
         pc = 0.35
@@ -566,8 +580,8 @@ class PassingNetwork():
         fig.figimage(home_img_redim, xo=160, yo=1060, zorder=2)
         fig.figimage(away_img_redim, xo=1130, yo=1060, zorder=2)
 
-        plt.tight_layout()
-        plt.subplots_adjust(wspace=0.1, hspace=0, bottom=0.1)
+        fig.tight_layout()
+        fig.subplots_adjust(wspace=0.1, hspace=0, bottom=0.1)
 
     def get_path_logo(self, league, club):
         """
@@ -580,25 +594,4 @@ class PassingNetwork():
         Returns:
         - string: The path of the png logo.
         """
-        dict_logo = {'EPL':'England - Premier League',
-                    'Serie A':'Italy - Serie A',
-                    'La Liga':'Spain - LaLiga',
-                    'Bundesliga':'Germany - Bundesliga',
-                    'Ligue 1':'France - Ligue 1',
-                    'Eredivisie': 'Netherlands - Eredivisie',
-                    'Liga Nos': 'Portugal - Liga Portugal',
-                    'Jupiler Pro League': 'Belgium - Jupiler Pro League',
-                    'Champions League': 'Europa - Champions League'}
-        
-        club = club.replace('-', ' ')
-
-        path_to_league_logo = f"logos/{dict_logo[league]}"
-        choices = os.listdir(path_to_league_logo)
-        logo_name_matched = process.extractOne(club, choices, score_cutoff=80)
-        
-        if logo_name_matched != None:
-            logo_name_matched = logo_name_matched[0]
-            path_return = os.path.join(path_to_league_logo, logo_name_matched)
-            return path_return
-        else:
-            return "img/logo_tr_139.png"
+        return get_path_logo(league, club)
@@ -0,0 +1,166 @@
+"""
+Event sequence patterns searched over the ordered events of a whole season in one vectorized pass.
+
+A pattern is a list of steps, each step a condition on the events (an EventQuery of game_analyzer.bitmaps, resolved
+on the bitmap index of the league), with constraints between the steps: the events are in the same game, by the
+same team, in the same possession, and close in time (max_gap seconds between two steps, within seconds from the
+first step to the last one).
+
+Matching semantics (skip till next match): each step matches the first event after the event of the previous step
+that satisfies its condition (by the same team when required), the events in between are ignored. The league store
+is sorted by game then clock, so the next event of a step is found for all the partial matches at once by a binary
+search (np.searchsorted) in the sorted rows of the step, and the constraints are checked on the shifted arrays of
+the candidates. When several starts reach the same events (two passes into the final third before the same shot),
+only the latest start is kept.
+
+Usage:
+    chance = pattern(where(type_name="Pass", outcome=True, end_third="final"), where(type_name="TakeOn", outcome=True),
+                     where(shot=True), within=10)
+    matches = league.season_patterns(chance)
+    recovery_shot = pattern(where(type_name="BallRecovery"), where(shot=True))
+"""
+import numpy as np
+import pandas as pd
+
+# Columns of the matched events returned by default, enough to draw them on a pitch
+MATCH_COLUMNS = ["game_id", "event_id", "period_id", "minute", "second", "team_id", "player_name", "type_name",
+                 "outcome", "start_x", "start_y", "end_x", "end_y"]
+
+class EventPattern:
+    """
+    Sequence of event conditions with time and possession constraints. Built with pattern().
+    """
+    def __init__(self, steps, max_gaps, within=None, same_possession=True, same_team=True):
+        """
+        Parameters:
+        - steps (list): The conditions of the steps (EventQuery), in order.
+        - max_gaps (list): The maximum number of seconds between each step and the next one (None for no limit).
+        - within (float): The maximum number of seconds between the first step and the last one, no limit if None.
+        - same_possession (bool): All the steps are in the same possession.
+        - same_team (bool): All the steps are events of the same team.
+        """
+        if len(steps) == 0:
+            raise ValueError("A pattern needs at least one step")
+        if len(max_gaps) != len(steps) - 1:
+            raise ValueError(f"Expected {len(steps) - 1} gaps between the {len(steps)} steps, got {len(max_gaps)}")
+        self.steps = list(steps)
+        self.max_gaps = list(max_gaps)
+        self.within = within
+        self.same_possession = same_possession
+        self.same_team = same_team or same_possession
+
+    def __repr__(self):
+        steps = " -> ".join(repr(step) for step in self.steps)
+        return f"pattern({steps}, max_gaps={self.max_gaps}, within={self.within}, same_possession={self.same_possession})"
+
+def pattern(*steps, max_gap=None, within=None, same_possession=True, same_team=True):
+    """
+    Build an event sequence pattern.
+
+    Parameters:
+    - steps (EventQuery): The conditions of the steps, in order (built with game_analyzer.bitmaps.where).
+    - max_gap (float or list): The maximum number of seconds between two consecutive steps, or one gap per pair of
+      steps (None for no limit).
+    - within (float): The maximum number of seconds between the first step and the last one.
+    - same_possession (bool): All the steps are in the same possession (and so by the same team).
+    - same_team (bool): All the steps are events of the same team.
+
+    Returns:
+    - EventPattern: The pattern.
+    """
+    max_gaps = list(max_gap) if isinstance(max_gap, (list, tuple)) else [max_gap] * (len(steps) - 1)
+    return EventPattern(steps, max_gaps, within, same_possession, same_team)
+
+class PatternMatcher:
+    """
+    Ordered event stream of a league (game, clock, team and possession of each row of the league store) and its
+    bitmap index, for the pattern searches over the whole season.
+    """
+    def __init__(self, index):
+        """
+        Parameters:
+        - index (BitmapIndex): The bitmap index of the league events.
+        """
+        self.index = index
+        columns = index.store.table.select(["game_id", "clock", "team_id", "possession_id"]).to_pandas()
+        self.game = pd.factorize(columns["game_id"])[0]
+        self.clock = columns["clock"].to_numpy(dtype=float)
+        self.team = pd.factorize(columns["team_id"])[0].astype(np.int64)
+        # The events before the first possession of a period match no possession constraint
+        self.possession = columns["possession_id"].fillna(-1).to_numpy(dtype=np.int64)
+
+    def next_rows(self, candidates, current, same_team):
+        """
+        Find the first candidate row after each current row.
+
+        Parameters:
+        - candidates (np.array): The sorted rows of a step.
+        - current (np.array): The rows of the partial matches.
+        - same_team (bool): Only the candidates of the team of the current row.
+
+        Returns:
+        - np.array: The next candidate row of each current row, -1 if none.
+        """
+        if same_team:
+            # Rows keyed by team then row: the next row of the same team is found by the same binary search
+            n = len(self.clock)
+            keys = self.team[candidates] * n + candidates
+            order = np.argsort(keys, kind="stable")
+            keys, candidates = keys[order], candidates[order]
+            positions = np.searchsorted(keys, self.team[current] * n + current, side="right")
+        else:
+            positions = np.searchsorted(candidates, current, side="right")
+        found = positions < len(candidates)
+        following = np.full(len(current), -1, dtype=np.int64)
+        following[found] = candidates[positions[found]]
+        if same_team:
+            following[found & (self.team[np.maximum(following, 0)] != self.team[current])] = -1
+        return following
+
+    def match(self, pattern):
+        """
+        Search a pattern over all the games of the league.
+
+        Parameters:
+        - pattern (EventPattern): The pattern.
+
+        Returns:
+        - np.array: The rows of the matched events in the league store, one row per match and one column per step.
+        """
+        starts = self.index.rows(pattern.steps[0]).astype(np.int64)
+        matches = [starts]
+        for step, max_gap in zip(pattern.steps[1:], pattern.max_gaps):
+            current = matches[-1]
+            following = self.next_rows(self.index.rows(step).astype(np.int64), current, pattern.same_team)
+            rows = np.maximum(following, 0)
+            valid = (following >= 0) & (self.game[rows] == self.game[current])
+            if pattern.same_possession:
+                valid &= (self.possession[current] >= 0) & (self.possession[rows] == self.possession[current])
+            if max_gap is not None:
+                valid &= self.clock[rows] - self.clock[current] <= max_gap
+            if pattern.within is not None:
+                valid &= self.clock[rows] - self.clock[matches[0]] <= pattern.within
+            matches = [step_rows[valid] for step_rows in matches] + [following[valid]]
+        matches = np.column_stack(matches)
+        if matches.shape[1] > 1 and len(matches):
+            # The starts sharing the events of the next steps: the latest one is kept
+            _, last = np.unique(matches[::-1, 1], return_index=True)
+            matches = matches[np.sort(len(matches) - 1 - last)]
+        return matches
+
+    def select(self, pattern, columns=None):
+        """
+        Get the events of the matches of a pattern, only their rows are read from the league table.
+
+        Parameters:
+        - pattern (EventPattern): The pattern.
+        - columns (list): The columns of the events, MATCH_COLUMNS if None.
+
+        Returns:
+        - pd.DataFrame: One row per match and step (match_id, step and the event columns), in date order.
+        """
+        matches = self.match(pattern)
+        events = self.index.store.table.select(columns or MATCH_COLUMNS).take(matches.ravel()).to_pandas()
+        events.insert(0, "match_id", np.repeat(np.arange(len(matches)), matches.shape[1]))
+        events.insert(1, "step", np.tile(np.arange(matches.shape[1]), len(matches)))
+        return events
@@ -0,0 +1,370 @@
+"""
+League percentiles of the player metrics: the distribution of each per-90 metric over the player games of a league,
+by position group, held in mergeable quantile sketches.
+
+The observations are the player games of at least MIN_GAME_MINUTES minutes: the per-90 value of each metric of the
+player charts (passes, forward and last third passes, take-ons, shots, xG, defensive actions...) in the game, and the
+position group of the player in the game (goalkeeper if they have a goalkeeper event, else from the median depth of
+their touches). They are computed game by game and kept through the data refreshes (cache.game_results).
+
+Each (position group, metric) distribution is a KLL sketch (Karnin, Lang, Liberty): a stack of compactors, level h
+holding items of weight 2^h; when a level is full, it is sorted and every other item (from a random offset) is
+promoted to the next level. The sketch has O(k log(n / k)) items with a rank error of about 1 / k, and two sketches
+merge level by level, so the games of a refresh are folded into the sketches of the previous data version without
+reading the season again. A corrected or deleted game cannot be taken out of a sketch: the sketches are then
+rebuilt from the kept observations. A percentile lookup is a binary search in the sorted items of the sketch.
+
+Usage:
+    percentiles = league.season_percentiles()
+    percentiles.percentile("passes_p90", 62.3, group="midfielder")  # 84.5
+"""
+import threading
+import numpy as np
+import pandas as pd
+from .cache import game_results
+from .similarity import minutes_played
+from .utils import defensive_actions
+
+## Metrics
+
+# Per-90 metrics of the player charts
+METRICS = ["passes_p90", "successful_passes_p90", "forward_passes_p90", "successful_forward_passes_p90",
+           "last_third_passes_p90", "successful_last_third_passes_p90", "take_ons_p90", "successful_take_ons_p90",
+           "last_third_take_ons_p90", "successful_last_third_take_ons_p90", "shots_p90", "xg_p90", "defensive_actions_p90"]
+LAST_THIRD_X = 67
+
+# Position groups, from the goalkeeper events and the median depth of the touches of a player in a game
+POSITION_GROUPS = ["goalkeeper", "defender", "midfielder", "forward"]
+ALL_PLAYERS = "all"
+KEEPER_TYPES = ["Save", "KeeperPickup", "Claim", "Punch", "Smother", "KeeperSweeper"]
+DEFENDER_MAX_X = 40
+MIDFIELDER_MAX_X = 58
+
+# Player games with fewer minutes are not observed (their per-90 values are too noisy)
+MIN_GAME_MINUTES = 30
+SKETCH_SIZE = 200
+
+def metric_counts(df, x="start_x"):
+    """
+    Count the events behind the metrics of each player in each game, as in the player charts.
+
+    Parameters:
+    - df (pd.DataFrame): The events, with the game_id, team_id, player_name, type_name, outcome, end_x, shot and xg
+      columns and the start x column.
+    - x (string): The start x column ("start_x" in the league store, "x" in the prepared events).
+
+    Returns:
+    - pd.DataFrame: One row per (game_id, team_id, player_name) with the count of each metric.
+    """
+    type_name = df["type_name"].to_numpy()
+    successful = (df["outcome"] == True).to_numpy()
+    is_pass = type_name == "Pass"
+    is_take_on = type_name == "TakeOn"
+    forward = df["end_x"].to_numpy(dtype=float) > df[x].to_numpy(dtype=float)
+    last_third_pass = is_pass & (df["end_x"].to_numpy(dtype=float) > LAST_THIRD_X)
+    last_third_take_on = is_take_on & (df[x].to_numpy(dtype=float) > LAST_THIRD_X)
+
+    counts = pd.DataFrame({"passes": is_pass,
+                           "successful_passes": is_pass & successful,
+                           "forward_passes": is_pass & forward,
+                           "successful_forward_passes": is_pass & forward & successful,
+                           "last_third_passes": last_third_pass,
+                           "successful_last_third_passes": last_third_pass & successful,
+                           "take_ons": is_take_on,
+                           "successful_take_ons": is_take_on & successful,
+                           "last_third_take_ons": last_third_take_on,
+                           "successful_last_third_take_ons": last_third_take_on & successful,
+                           "shots": (df["shot"] == True).to_numpy(),
+                           "xg": np.nan_to_num(df["xg"].to_numpy(dtype=float)),
+                           "defensive_actions": defensive_actions(type_name, successful)}, index=df.index).astype(float)
+    keys = [df[key].to_numpy() for key in ["game_id", "team_id", "player_name"]]
+    players = df["player_name"].notnull().to_numpy()
+    return counts[players].groupby([key[players] for key in keys], sort=False).sum().rename_axis(["game_id", "team_id", "player_name"])
+
+def per_90(counts, minutes):
+    """
+    Get the per-90 metrics from the counts and the minutes played.
+
+    Parameters:
+    - counts (pd.DataFrame): The counts of the metrics (metric_counts).
+    - minutes (np.array): The minutes played of each row.
+
+    Returns:
+    - pd.DataFrame: The METRICS of each row (0 without minute played).
+    """
+    minutes = np.asarray(minutes, dtype=float)[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = np.where(minutes > 0, counts.to_numpy(dtype=float) / minutes * 90, 0)
+    return pd.DataFrame(values, index=counts.index, columns=[f"{column}_p90" for column in counts.columns])
+
+def position_groups(df, x="start_x"):
+    """
+    Get the position group of each player in each game: goalkeeper if they have a goalkeeper event, else defender,
+    midfielder or forward from the median x of their touches.
+
+    Parameters:
+    - df (pd.DataFrame): The events, with the game_id, team_id, player_name, type_name and touch columns and the start x column.
+    - x (string): The start x column ("start_x" in the league store, "x" in the prepared events).
+
+    Returns:
+    - pd.Series: The position group of each (game_id, team_id, player_name).
+    """
+    players = df[df["player_name"].notnull()]
+    touch = (players["touch"] == True).to_numpy()
+    groups = pd.DataFrame({"keeper": players["type_name"].isin(KEEPER_TYPES).to_numpy(),
+                           "x": np.where(touch, players[x].to_numpy(dtype=float), np.nan)})
+    groups = groups.groupby([players[key].to_numpy() for key in ["game_id", "team_id", "player_name"]], sort=False).agg(keeper=("keeper", "any"), x=("x", "median"))
+    return pd.Series(np.select([groups["keeper"], groups["x"] < DEFENDER_MAX_X, groups["x"] < MIDFIELDER_MAX_X],
+                               POSITION_GROUPS[:3], POSITION_GROUPS[3]),
+                     index=groups.index.rename(["game_id", "team_id", "player_name"]))
+
+def game_observations(df):
+    """
+    Get the observations of the percentiles in one or several games: the per-90 metrics of the player games of at
+    least MIN_GAME_MINUTES minutes.
+
+    Parameters:
+    - df (pd.DataFrame): The events of the games, with the OBSERVATION_SOURCE_COLUMNS of the league store.
+
+    Returns:
+    - pd.DataFrame: One row per player game: game_id, team_id, player_name, group, minutes and METRICS.
+    """
+    counts = metric_counts(df)
+    minutes = minutes_played(df, counts.index)
+    observations = per_90(counts, minutes)
+    observations.insert(0, "group", position_groups(df).reindex(counts.index).to_numpy())
+    observations.insert(1, "minutes", minutes)
+    return observations[minutes >= MIN_GAME_MINUTES].reset_index()
+
+## Quantile sketches
+
+class QuantileSketch:
+    """
+    KLL quantile sketch of a stream of values, mergeable with the sketches of other streams.
+    """
+    def __init__(self, k=SKETCH_SIZE, seed=0):
+        """
+        Parameters:
+        - k (int): The capacity of the top level, the rank error is about 1 / k.
+        - seed (int): The seed of the compaction offsets (the sketch of the same stream is the same).
+        """
+        self.k = k
+        self.seed = seed
+        self.levels = [np.zeros(0)]
+        self.count = 0
+        self.compactions = 0
+        self.cdf = None
+
+    def capacity(self, level):
+        """
+        Get the capacity of a level, the lower levels are smaller (factor 2/3).
+
+        Parameters:
+        - level (int): The level.
+
+        Returns:
+        - int: The maximum number of items of the level.
+        """
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - 1 - level))))
+
+    def compress(self):
+        """
+        Compact the full levels: the items of a full level are sorted and every other item is promoted.
+        """
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.zeros(0))
+                items = np.sort(items)
+                # The last item of an odd level stays, the others are halved from a random offset
+                kept, items = items[len(items) - len(items) % 2:], items[:len(items) - len(items) % 2]
+                offset = np.random.default_rng((self.seed, self.compactions)).integers(2)
+                self.compactions += 1
+                self.levels[level] = kept
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[offset::2]])
+            level += 1
+        self.cdf = None
+
+    def update(self, values):
+        """
+        Add values to the sketch.
+
+        Parameters:
+        - values (array-like): The values (the NaN are left out).
+
+        Returns:
+        - QuantileSketch: The sketch.
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += len(values)
+        self.compress()
+        return self
+
+    def merge(self, other):
+        """
+        Merge two sketches into a new one, the sketches are left unchanged.
+
+        Parameters:
+        - other (QuantileSketch): The sketch of the other values.
+
+        Returns:
+        - QuantileSketch: The sketch of the values of both sketches.
+        """
+        merged = QuantileSketch(self.k, self.seed)
+        merged.compactions = self.compactions + other.compactions
+        merged.levels = [np.concatenate([levels[level] for levels in (self.levels, other.levels) if level < len(levels)])
+                         for level in range(max(len(self.levels), len(other.levels)))]
+        merged.count = self.count + other.count
+        merged.compress()
+        return merged
+
+    def sorted_items(self):
+        """
+        Get the items of the sketch sorted, with their cumulative weights (computed once per sketch state).
+
+        Returns:
+        - np.array: The sorted items.
+        - np.array: The cumulative weights, starting at 0 (one more than the items).
+        """
+        if self.cdf is None:
+            items = np.concatenate(self.levels)
+            weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+            order = np.argsort(items, kind="stable")
+            self.cdf = items[order], np.r_[0, np.cumsum(weights[order])]
+        return self.cdf
+
+    def percentile(self, value):
+        """
+        Get the percentile of a value: the share of the values below it, the values equal to it counted for half.
+
+        Parameters:
+        - value (float): The value.
+
+        Returns:
+        - float: The percentile (0 to 100), None if the sketch is empty.
+        """
+        items, cumulative = self.sorted_items()
+        if cumulative[-1] == 0:
+            return None
+        below, upto = np.searchsorted(items, value, side="left"), np.searchsorted(items, value, side="right")
+        return float((cumulative[below] + cumulative[upto]) / 2 / cumulative[-1] * 100)
+
+    def quantile(self, q):
+        """
+        Get the value at a quantile.
+
+        Parameters:
+        - q (float): The quantile (0 to 1).
+
+        Returns:
+        - float: The value, None if the sketch is empty.
+        """
+        items, cumulative = self.sorted_items()
+        if cumulative[-1] == 0:
+            return None
+        return float(items[min(np.searchsorted(cumulative[1:], q * cumulative[-1], side="left"), len(items) - 1)])
+
+class LeaguePercentiles:
+    """
+    Sketches of the per-90 metrics of a league by position group (and for all the players), with the games folded in.
+    """
+    def __init__(self, sketches=None, folded=None, k=SKETCH_SIZE):
+        """
+        Parameters:
+        - sketches (dict): The QuantileSketch of each (group, metric).
+        - folded (dict): The content hash of each game folded in the sketches.
+        - k (int): The size of the sketches.
+        """
+        self.sketches = sketches or {}
+        self.folded = folded or {}
+        self.k = k
+
+    def fold(self, observations):
+        """
+        Fold the observations of new games into the sketches.
+
+        Parameters:
+        - observations (dict): The observations of each new game (game_observations) with its content hash: game id -> (hash, observations).
+
+        Returns:
+        - LeaguePercentiles: The percentiles with the new games, the percentiles are left unchanged.
+        """
+        frames = [game_df for _, game_df in observations.values()]
+        new_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["group"] + METRICS)
+        sketches = dict(self.sketches)
+        for group in POSITION_GROUPS + [ALL_PLAYERS]:
+            group_df = new_df if group == ALL_PLAYERS else new_df[new_df["group"] == group]
+            if len(group_df) == 0:
+                continue
+            for metric in METRICS:
+                sketch = QuantileSketch(self.k).update(group_df[metric].to_numpy(dtype=float))
+                sketches[(group, metric)] = sketches[(group, metric)].merge(sketch) if (group, metric) in sketches else sketch
+        return LeaguePercentiles(sketches, {**self.folded, **{game_id: game_hash for game_id, (game_hash, _) in observations.items()}}, self.k)
+
+    def percentile(self, metric, value, group=None):
+        """
+        Get the league percentile of a per-90 value.
+
+        Parameters:
+        - metric (string): The metric, one of METRICS.
+        - value (float): The per-90 value.
+        - group (string): The position group, all the players if None.
+
+        Returns:
+        - float: The percentile (0 to 100), None without observation.
+        """
+        sketch = self.sketches.get((group or ALL_PLAYERS, metric))
+        return sketch.percentile(value) if sketch is not None else None
+
+    def percentiles(self, values, group=None):
+        """
+        Get the league percentiles of several per-90 values.
+
+        Parameters:
+        - values (dict): The per-90 value of each metric.
+        - group (string): The position group, all the players if None.
+
+        Returns:
+        - dict: The percentile of each metric.
+        """
+        return {metric: self.percentile(metric, value, group) for metric, value in values.items()}
+
+## Percentiles of each league, kept from one data version to the next
+
+OBSERVATION_SOURCE_COLUMNS = ["game_id", "team_id", "player_name", "type_name", "outcome", "minute", "start_x", "end_x",
+                              "touch", "shot", "xg", "qualifiers"]
+
+_league_percentiles = {}
+_league_percentiles_lock = threading.Lock()
+
+def league_percentiles(league, store):
+    """
+    Get the percentiles of a league from its store. The observations are computed only for the games not observed
+    yet or whose content changed, and the new games are folded into the sketches of the previous data version; the
+    sketches are rebuilt when a game folded in them changed or left the data.
+
+    Parameters:
+    - league (string): The league name.
+    - store (LeagueStore): The memory-mapped league events.
+
+    Returns:
+    - LeaguePercentiles: The percentiles of the league.
+    """
+    def observe_games(game_ids):
+        observations = game_observations(store.games_table(game_ids).select(OBSERVATION_SOURCE_COLUMNS).to_pandas())
+        return {game_id: game_df for game_id, game_df in observations.groupby("game_id", sort=False)}
+
+    observations = game_results("percentiles", league).update(store.game_hashes, observe_games)
+    with _league_percentiles_lock:
+        previous = _league_percentiles.get(league)
+    if previous is None or any(store.game_hashes.get(game_id) != game_hash for game_id, game_hash in previous.folded.items()):
+        previous = LeaguePercentiles()
+    percentiles = previous.fold({game_id: (store.game_hashes[game_id], game_df) for game_id, game_df in observations.items()
+                                 if game_id not in previous.folded})
+    with _league_percentiles_lock:
+        _league_percentiles[league] = percentiles
+    return percentiles
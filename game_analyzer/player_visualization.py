@@ -0,0 +1,659 @@
+import pandas as pd
+import numpy as np
+from .cache import memoize, cache_key
+from .clock import window
+from .context import get_match_context
+from .cube import game_cube, cube_slice, cell_locations
+from .game_state import game_state_timeline, state_label, state_window
+from .lineups import game_lineups
+from .logos import get_path_logo
+from .percentiles import MIN_GAME_MINUTES, metric_counts, per_90, position_groups
+from .rendering import new_figure, with_chart_style
+from .sequences import has_qualifier
+from .utils import defensive_actions
+from .xg import qualifier_value
+import warnings
+warnings.filterwarnings("ignore")
+
+class PlayerVisualization():
+    """
+    Display all the player visualisations with all the necessary details (game, score, visualisations, logos...).
+    """
+    charts = ["passes", "heatmap", "dribbles", "shotmap", "defensive"]
+
+    def __init__(self, events_df, player, mins, club, context=None, percentiles=None, state=None, timeline=None):
+        """
+        Parameters:
+        - events_df (pd.DataFrame): The prepared events of the game (of the club or of both teams).
+        - player (string): The player name.
+        - mins (tuple): The game timelapse (start, end) in minutes.
+        - club (string): The player club.
+        - context (MatchContext): The match context, built from the events if None.
+        - percentiles (LeaguePercentiles): The league distributions of the per-90 metrics, the numbers are shown
+          without their league percentile if None.
+        - state (string): Only the events while the club of the player was leading, drawing or trailing, all of them if None.
+        - timeline (GameStateTimeline): The game state timeline of the game, built from the events if None
+          (the events must then include both teams).
+        """
+        self.events_df = events_df
+        self.player = player
+        self.mins = mins
+        self.club = club.replace("-", " ")
+        self.context = context if context is not None else get_match_context(events_df)
+        self.percentiles = percentiles
+        self.state = state
+        self.timeline = timeline if timeline is not None else game_state_timeline(events_df)
+        self.ax = None
+        self.head_length = 0.3
+        self.head_width = 0.1
+
+    def change_range(self, value, old_range, new_range):
+        """
+        Changes the value relative to all the values in the Series.
+
+        Parameters:
+        - value (int): Current value to change
+        - old_range (tuple): Current range of values (min_value, max_value) for the Series.
+        - new_range (tuple): New range of values (min_node_size, max_node_size).
+
+        Returns:
+        - int: New value in the new range.
+        """
+        new_value = ((value-old_range[0]) / (old_range[1]-old_range[0])) * (new_range[1]-new_range[0]) + new_range[0]
+        if new_value >= new_range[1]:
+            return new_range[1]
+        elif new_value <= new_range[0]:
+            return new_range[0]
+        else:
+            return new_value
+        
+    def preprocessing(self, events_df, player, mins):
+        """
+        Performs all data pre-processing based on information entered by the user.
+
+        Parameters:
+        - events_df (pd.DataFrame): All the events of the game.
+        - player (string): The player selected by the user.
+        - mins (tuple): The game timelapse selected by the user.
+
+        Returns:
+        - pd.DataFrame: The events of the player in the game timelapse (and the game state).
+        """
+        df = state_window(window(events_df, mins), self.timeline, self.state).reset_index(drop=True)
+        df_player = df[df["player_name"] == player].reset_index(drop=True)
+        return df_player
+    
+    def count_successes(self, df):
+        """
+        Count the successful events of a DataFrame.
+
+        Parameters:
+        - df (pd.DataFrame): The events.
+
+        Returns:
+        - int: The number of events with a successful outcome.
+        """
+        return int((df["outcome"] == True).sum())
+
+    def get_pct(self, success, total):
+        """
+        Get the success percentage, 0 if there is no event.
+
+        Parameters:
+        - success (int): The number of successful events.
+        - total (int): The number of events.
+
+        Returns:
+        - int: The success percentage.
+        """
+        return int((success/total) * 100) if total != 0 else 0
+
+    def get_dribbles_stats(self, df):
+        """
+        Get the player dribble numbers displayed on the dribble map.
+
+        Parameters:
+        - df (pd.DataFrame): The preprocessed player events.
+
+        Returns:
+        - dict: The dribbles attempted, successful and the success percentage, globally and in the last third.
+        """
+        df_dribbles = df[df["type_name"] == "TakeOn"]
+        df_dribbles_lt = df_dribbles[df_dribbles["x"] > 67]
+
+        total, success = len(df_dribbles), self.count_successes(df_dribbles)
+        dribbles_lt, success_lt = len(df_dribbles_lt), self.count_successes(df_dribbles_lt)
+
+        return {"total": total, "success": success, "pct": self.get_pct(success, total),
+                "dribbles_lt": dribbles_lt, "success_lt": success_lt, "pct_lt": self.get_pct(success_lt, dribbles_lt)}
+
+    def get_passes_stats(self, df):
+        """
+        Get the player pass numbers displayed on the pass map.
+
+        Parameters:
+        - df (pd.DataFrame): The preprocessed player events.
+
+        Returns:
+        - dict: The passes attempted, successful and the success percentage, globally, forward and in the last third.
+        """
+        df_passes = df[df["type_name"] == "Pass"]
+        df_forward = df_passes[df_passes["x"] < df_passes["end_x"]]
+        df_last_third = df_passes[df_passes["end_x"] > 67]
+
+        total, success = len(df_passes), self.count_successes(df_passes)
+        forward_passes, success_forward = len(df_forward), self.count_successes(df_forward)
+        last_third_passes, success_lt = len(df_last_third), self.count_successes(df_last_third)
+
+        return {"total": total, "success": success, "pct": self.get_pct(success, total),
+                "forward_passes": forward_passes, "success_forward": success_forward, "pct_forward": self.get_pct(success_forward, forward_passes),
+                "last_third_passes": last_third_passes, "success_lt": success_lt, "pct_lt": self.get_pct(success_lt, last_third_passes)}
+
+    def get_minutes_played(self):
+        """
+        Get the minutes played by the player in the game timelapse (and the game state), from the lineup timeline of the game.
+
+        Returns:
+        - float: The overlap of the game timelapse (and of the intervals of the game state) with the on-pitch interval of the player.
+        """
+        lineups = game_lineups(self.events_df)
+        lineup = lineups[lineups["player_name"] == self.player]
+        if len(lineup) == 0:
+            return 0
+        start, end = max(lineup["on_minute"].iat[0], self.mins[0]), min(lineup["off_minute"].iat[0], self.mins[1])
+        if self.state is not None:
+            return self.timeline.state_minutes(lineup["team_id"].iat[0], self.state, (start, end))
+        return max(end - start, 0)
+
+    def get_percentiles(self, df):
+        """
+        Get the league percentiles of the per-90 numbers of the player in the game timelapse, compared with the
+        players of the same position group. There is no percentile below MIN_GAME_MINUTES minutes played.
+
+        Parameters:
+        - df (pd.DataFrame): The preprocessed player events.
+
+        Returns:
+        - dict: The rounded percentile of each per-90 metric (percentiles.METRICS), empty without percentiles.
+        """
+        if self.percentiles is None:
+            return {}
+        minutes = self.get_minutes_played()
+        if minutes < MIN_GAME_MINUTES:
+            return {}
+        values = per_90(metric_counts(df, x="x").sum().to_frame().T, [minutes]).iloc[0]
+        groups = position_groups(self.events_df[self.events_df["player_name"] == self.player], x="x")
+        percentiles = self.percentiles.percentiles(values.to_dict(), groups.iat[0] if len(groups) else None)
+        return {metric: int(round(percentile)) for metric, percentile in percentiles.items() if percentile is not None}
+
+    def percentile_label(self, percentiles, metric):
+        """
+        Get the league percentile of a number as displayed after it on the charts.
+
+        Parameters:
+        - percentiles (dict): The percentiles of the player (get_percentiles).
+        - metric (string): The per-90 metric of the number.
+
+        Returns:
+        - string: The percentile label (ex: " (84th pct.)"), empty without percentile.
+        """
+        if metric not in percentiles:
+            return ""
+        value = percentiles[metric]
+        suffix = "th" if 10 <= value % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(value % 10, "th")
+        return f" ({value}{suffix} pct.)"
+
+    def get_stats(self, chart):
+        """
+        Get the data behind a player chart, as JSON serializable values.
+
+        Parameters:
+        - chart (string): The chart name, one of PlayerVisualization.charts.
+
+        Returns:
+        - dict: The chart numbers (for passes and dribbles) and the events displayed on the chart.
+        """
+        df = self.preprocessing(self.events_df, self.player, self.mins)
+        stats = {"player": self.player, **self.context.team(self.context.team_id(self.club)), "chart": chart,
+                 "mins": list(self.mins), "state": self.state}
+        if self.percentiles is not None:
+            stats["percentiles"] = self.get_percentiles(df)
+
+        if chart == "passes":
+            stats.update(self.get_passes_stats(df))
+            df_chart = df[df["type_name"] == "Pass"]
+        elif chart == "dribbles":
+            stats.update(self.get_dribbles_stats(df))
+            df_chart = df[df["type_name"] == "TakeOn"]
+        elif chart == "shotmap":
+            df_chart = df[df["shot"] == True]
+        elif chart == "defensive":
+            df_chart = df[defensive_actions(df["type_name"].to_numpy(), df["outcome"].to_numpy())]
+        else:
+            df_chart = df[df["x"].notnull() & df["y"].notnull()]
+
+        columns = [col for col in ["minute", "second", "type_name", "outcome", "x", "y", "end_x", "end_y", "goal", "xg", "xT_added"] if col in df_chart.columns]
+        stats["events"] = df_chart[columns].astype(object).where(df_chart[columns].notnull(), None).to_dict(orient="records")
+        return stats
+
+    def draw_pitch(self):
+        """
+        Draw a Vertical Pitch with the Opta type.
+
+        Returns:
+        - matplotlib.Fig: The matplotlib figure.
+        - matplotlib.ax: The matplotlib ax.
+        - pitch: The vertical pitch.
+        """
+        from mplsoccer.pitch import VerticalPitch
+
+        fig, ax = new_figure(figsize=[18,12], dpi=400)
+        self.ax = ax
+        pitch = VerticalPitch(pitch_type='opta', 
+                                line_color='#7c7c7c',
+                                goal_type='box',
+                                linewidth=0.5,
+                                pad_bottom=10)
+            
+        pitch.draw(ax=self.ax, constrained_layout=False, tight_layout=False)
+        ax.plot([21, 21], [ax.get_ylim()[0]+19, ax.get_ylim()[1]-19], ls=':',dashes=(1, 3), color='gray', lw=0.4)
+        ax.plot([78.8, 78.8], [ax.get_ylim()[0]+19, ax.get_ylim()[1]-19], ls=':',dashes=(1, 3), color='gray', lw=0.4)
+        ax.plot([36.8, 36.8], [ax.get_ylim()[0]+8.5, ax.get_ylim()[1]-8.5], ls=':',dashes=(1, 3), color='gray', lw=0.4)
+        ax.plot([100-36.8, 100-36.8], [ax.get_ylim()[0]+8.5, ax.get_ylim()[1]-8.5], ls=':',dashes=(1, 3), color='gray', lw=0.4)
+
+        ax.plot([ax.get_xlim()[0]-4, ax.get_xlim()[1]+4], [83,83], ls=':',dashes=(1, 3), color='gray', lw=0.4)
+        ax.plot([ax.get_xlim()[0]-4, ax.get_xlim()[1]+4], [67, 67], ls=':',dashes=(1, 3), color='gray', lw=0.4)
+
+        ax.plot([ax.get_xlim()[0]-4, ax.get_xlim()[1]+4], [100-83,100-83], ls=':',dashes=(1, 3), color='gray', lw=0.4)
+        ax.plot([ax.get_xlim()[0]-4, ax.get_xlim()[1]+4], [100-67, 100-67], ls=':',dashes=(1, 3), color='gray', lw=0.4)
+
+        ax.annotate(xy=(102, 58), xytext=(102, 43), zorder=2, text='', ha='center',
+                    arrowprops=dict(arrowstyle=f'->, head_length={self.head_length}, head_width={self.head_width}',
+                                    color='#7c7c7c', lw=0.5))
+        ax.annotate(xy=(104, 45), text='Play direction', ha='center', color='#7c7c7c', rotation=90, size=10)
+        ax.annotate(xy=(50, -5), text=f'Events from minutes {self.mins[0]} to {self.mins[1]}{state_label(self.state)}', ha='center', color='#7c7c7c', size=10)
+        return fig, ax, pitch
+
+    @with_chart_style
+    def plot_dribbles(self):
+        """
+        Plot the player dribble map.
+
+        Returns:
+        - matplotlib.Fig: The matplotlib figure with all the dribbles.
+        """
+        from matplotlib import pyplot as plt
+        from matplotlib.lines import Line2D
+
+        # Prepare data and pitch
+        df = self.preprocessing(self.events_df, self.player, self.mins)
+        fig, ax, pitch = self.draw_pitch()
+
+        # Get dribbles
+        df_dribbles = df[df["type_name"] == "TakeOn"]
+        stats = self.get_dribbles_stats(df)
+        total, success, pct = stats["total"], stats["success"], stats["pct"]
+        dribbles_lt, success_lt, pct_lt = stats["dribbles_lt"], stats["success_lt"], stats["pct_lt"]
+        percentiles = self.get_percentiles(df)
+
+        marker_size = 12
+        marker_type = "^"
+
+        # Plot
+        for index, row in df_dribbles.iterrows():
+            loc_z = row["x"]
+            loc_x = row["y"]
+            loc_y = loc_z
+            marker_color = "green" if row["outcome"] == True else "red"
+            ax.plot(loc_x, loc_y, marker_type, color=marker_color, markersize=marker_size, zorder=5)
+
+        # Legend details
+        # Créer des marqueurs personnalisés pour la légende
+        green_triangle = Line2D([0], [0], marker='^', color='g', markersize=10, label='Successful dribble', linestyle='None')
+        red_triangle = Line2D([0], [0], marker='^', color='r', markersize=10, label='Unsuccessful dribble', linestyle='None')
+
+        
+        font = 'serif'
+        fig.text(x=0.6, y=1, s=f"{self.player} | Dribble map | {self.club}", weight='bold', va="bottom", ha="center", fontsize=18, font=font)
+        fig.text(x=0.6, y=0.982, s=f"{self.context.league} | Season 2024-2025 | {self.context.date}", va="bottom", ha="center", fontsize=12, font=font)
+        fig.text(x=0.37, y=-0.0, s="linkedin.com/in/yannis-rachid-230/", va="bottom", ha="center", weight='bold', fontsize=12, font=font, color='black')
+
+        fig.text(x=0.8, y=0.8, s="GLOBAL", va="bottom", ha="center", weight='bold', fontsize=12, font=font, color='black')
+        fig.text(x=0.8, y=0.77, s=f"{total} dribbles attempted{self.percentile_label(percentiles, 'take_ons_p90')}", va="bottom", ha="center", fontsize=12, font=font, color='black')
+        fig.text(x=0.8, y=0.75, s=f"{success} successful dribbles{self.percentile_label(percentiles, 'successful_take_ons_p90')}", va="bottom", ha="center", fontsize=12, font=font, color='black')
+        fig.text(x=0.8, y=0.73, s=f"{pct}% of successful dribbles", va="bottom", ha="center", fontsize=12, font=font, color='black')
+
+        fig.text(x=0.8, y=0.65, s="DRIBBLES IN LAST THIRD", va="bottom", ha="center", weight='bold', fontsize=12, font=font, color='black')
+        fig.text(x=0.8, y=0.62, s=f"{dribbles_lt} dribbles attempted in last third{self.percentile_label(percentiles, 'last_third_take_ons_p90')}", va="bottom", ha="center", fontsize=12, font=font, color='black')
+        fig.text(x=0.8, y=0.60, s=f"{success_lt} successful dribbles in last third{self.percentile_label(percentiles, 'successful_last_third_take_ons_p90')}", va="bottom", ha="center", fontsize=12, font=font, color='black')
+        fig.text(x=0.8, y=0.58, s=f"{pct_lt}% of successful dribbles in last third", va="bottom", ha="center", fontsize=12, font=font, color='black')
+
+        fig.text(x=0.8, y=0.5, s=f"LEGEND", va="bottom", ha="center", weight='bold', fontsize=12, font=font, color='black')
+        ax.legend(handles=[green_triangle, red_triangle], loc='upper center', bbox_to_anchor=(1.22, 0.49))
+
+        # fig_logo = plt.figure()
+        logo_path = self.context.logo(self.club)
+        img = plt.imread(logo_path)
+        fig.figimage(img, xo=1830, yo=2100, zorder=2)
+
+        fig.tight_layout()
+        
+        return fig
+    
+    @with_chart_style
+    def plot_passes_game(self):
+        """
+        Plot the player pass map.
+
+        Returns:
+        - matplotlib.Fig: The matplotlib figure with all the passes.
+        """
+        from matplotlib import pyplot as plt
+        from matplotlib.patches import ArrowStyle, FancyArrowPatch
+
+        df = self.preprocessing(self.events_df, self.player, self.mins)
+        fig, ax, pitch = self.draw_pitch()
+
+        df_passes = df[df["type_name"] == "Pass"]
+        stats = self.get_passes_stats(df)
+        total, success, pct = stats["total"], stats["success"], stats["pct"]
+        forward_passes, success_forward, pct_forward = stats["forward_passes"], stats["success_forward"], stats["pct_forward"]
+        last_third_passes, success_lt, pct_lt = stats["last_third_passes"], stats["success_lt"], stats["pct_lt"]
+        percentiles = self.get_percentiles(df)
+
+        for index, row in df_passes.iterrows():
+            start_z = row["x"]
+            start_x = row["y"]
+            start_y = start_z
+
+            end_z = row["end_x"]
+            end_x = row["end_y"]
+            end_y = end_z
+
+            pass_value = row["xT_added"]
+
+            key_pass = False
+            for qualifier in row["qualifiers"]:
+                if qualifier["type"]["displayName"] == "KeyPass":
+                    key_pass = True
+
+            if key_pass == True:
+                arrow_color = "orange"
+            elif row["outcome"] == True:
+                arrow_color = "green"
+            else:
+                arrow_color = "red"
+
+            line_width = 0.5
+            alpha = 1
+
+            dx = end_x-start_x
+            dy = end_y-start_y
+            rel = 68/105
+            shift_x = 2
+            shift_y = shift_x*rel
+
+            # pitch.lines(row["x"], row["y"], row["end_x"], row["end_y"], color=arrow_color, ax=ax, lw=3, transparent=True)
+            pitch.lines(row["x"], row["y"], row["end_x"], row["end_y"], color=arrow_color, ax=ax, lw=4, comet=True, transparent=True)
+            # pitch.scatter(row["end_x"], row["end_y"], s=50, c="white", edgecolors=arrow_color, ax=ax, lw=2, zorder=2)
+            pitch.scatter(row["end_x"], row["end_y"], s=20, c=arrow_color, edgecolors=arrow_color, ax=ax, lw=2, zorder=2)
+
+        font = 'serif'
+        fig.text(x=0.6, y=1, s=f"{self.player} | Pass map | {self.club}", weight='bold', va="bottom", ha="center", fontsize=20, font=font)
+        fig.text(x=0.6, y=0.982, s=f"{self.context.league} | Season 2024-2025 | {self.context.date}", va="bottom", ha="center", fontsize=12, font=font)
+        fig.text(x=0.87, y=-0.0, s="Yannis R", va="bottom", ha="center", weight='bold', fontsize=12, font=font, color='black')
+        fig.text(x=0.37, y=-0.0, s="linkedin.com/in/yannis-rachid-230/", va="bottom", ha="center", weight='bold', fontsize=12, font=font, color='black')
+
+        fig.text(x=0.8, y=0.8, s=f"GLOBAL PASSES", va="bottom", ha="center", weight='bold', fontsize=12, font=font, color='black')
+        fig.text(x=0.8, y=0.77, s=f"{total} passes attempted{self.percentile_label(percentiles, 'passes_p90')}", va="bottom", ha="center", fontsize=12, font=font, color='black')
+        fig.text(x=0.8, y=0.75, s=f"{success} successful passes{self.percentile_label(percentiles, 'successful_passes_p90')}", va="bottom", ha="center", fontsize=12, font=font, color='black')
+        fig.text(x=0.8, y=0.73, s=f"{pct}% of successful passes", va="bottom", ha="center", fontsize=12, font=font, color='black')
+
+        fig.text(x=0.8, y=0.65, s=f"FORWARD PASSES", va="bottom", ha="center", weight='bold', fontsize=12, font=font, color='black')
+        fig.text(x=0.8, y=0.62, s=f"{forward_passes} forward passes attempted{self.percentile_label(percentiles, 'forward_passes_p90')}", va="bottom", ha="center", fontsize=12, font=font, color='black')
+        fig.text(x=0.8, y=0.60, s=f"{success_forward} successful forward passes{self.percentile_label(percentiles, 'successful_forward_passes_p90')}", va="bottom", ha="center", fontsize=12, font=font, color='black')
+        fig.text(x=0.8, y=0.58, s=f"{pct_forward}% of successful forward passes", va="bottom", ha="center", fontsize=12, font=font, color='black')
+
+        fig.text(x=0.8, y=0.50, s=f"LAST THIRD PASSES", va="bottom", ha="center", weight='bold', fontsize=12, font=font, color='black')
+        fig.text(x=0.8, y=0.47, s=f"{last_third_passes} passes in last third attempted{self.percentile_label(percentiles, 'last_third_passes_p90')}", va="bottom", ha="center", fontsize=12, font=font, color='black')
+        fig.text(x=0.8, y=0.45, s=f"{success_lt} successful passes in last third{self.percentile_label(percentiles, 'successful_last_third_passes_p90')}", va="bottom", ha="center", fontsize=12, font=font, color='black')
+        fig.text(x=0.8, y=0.43, s=f"{pct_lt}% of successful passes in last third", va="bottom", ha="center", fontsize=12, font=font, color='black')
+
+        style = ArrowStyle('->', head_length=5, head_width=3)
+        green_arrow_patch = FancyArrowPatch((1670, 780), (1670+50, 780+50), arrowstyle=style, color='green')
+        red_arrow_patch = FancyArrowPatch((1670, 730), (1670+50, 730+50), arrowstyle=style, color='red')
+        orange_arrow_patch = FancyArrowPatch((1670, 680), (1670+50, 680+50), arrowstyle=style, color='orange')
+        fig.patches.extend([green_arrow_patch, red_arrow_patch, orange_arrow_patch])
+        fig.text(x=0.8, y=0.35, s=f"LEGEND", va="bottom", ha="center", weight='bold', fontsize=12, font=font, color='black')
+        fig.text(x=0.8, y=0.32, s="Successful Pass", va="bottom", ha="center", fontsize=12, font=font, color='black')
+        fig.text(x=0.806, y=0.30, s="Unsuccessful Pass", va="bottom", ha="center", fontsize=12, font=font, color='black')
+        fig.text(x=0.784, y=0.28, s="Key Pass", va="bottom", ha="center", fontsize=12, font=font, color='black')
+
+        logo_path = self.context.logo(self.club)  # Chemin d'accès à l'image du logo
+        img = plt.imread(logo_path)
+        fig.figimage(img, xo=1830, yo=2100, zorder=2)
+        fig.tight_layout()
+
+        return fig
+    
+
+    @with_chart_style
+    def plot_heatmap_game(self):
+        """
+        Plot the player heat map.
+
+        Returns:
+        - matplotlib.Fig: The matplotlib figure with all the events.
+        """
+        from matplotlib import pyplot as plt
+        import seaborn as sns
+        from PIL import Image
+
+        fig, ax, pitch = self.draw_pitch()
+
+        # Event locations of the player from the precomputed counts of the game (fine grid cells)
+        cells_x, cells_y, counts = cell_locations(cube_slice(game_cube(self.events_df), self.mins, player=self.player, state=self.state))
+
+        # plot the heatmap, a density needs 3 cells not on a line (ex: few events of the player in the game state),
+        # the cells are drawn as a weighted scatter otherwise
+        cmap = plt.get_cmap("hot").reversed()
+        density = len(counts) >= 3 and np.linalg.matrix_rank(np.c_[cells_x - cells_x.mean(), cells_y - cells_y.mean()]) == 2
+        if density:
+            try:
+                ax = sns.kdeplot(x=cells_y, y=cells_x, weights=counts, ax=ax, shade=True, cmap=cmap, bw=0.1, n_levels=200)
+            except ValueError:
+                # A few cells close to a line give a density narrower than the grid, without distinct contour levels
+                density = False
+        if not density and len(counts):
+            pitch.scatter(cells_x, cells_y, s=400 * counts / counts.max(), c=counts, cmap=cmap, vmin=0, vmax=counts.max(),
+                          edgecolors="#7c7c7c", alpha=0.8, ax=ax, zorder=2)
+
+        font = 'serif'
+        fig.text(x=0.5, y=1, s=f"{self.player} | Heat map | {self.club}", weight='bold', va="bottom", ha="center", fontsize=12, font=font)
+        fig.text(x=0.5, y=0.982, s=f"{self.context.league} | Season 2024-2025 | {self.context.date}", va="bottom", ha="center", fontsize=10, font=font)
+        fig.text(x=0.7, y=-0.0, s="Yannis R", va="bottom", ha="center", weight='bold', fontsize=12, font=font, color='black')
+        fig.text(x=0.37, y=-0.0, s="linkedin.com/in/yannis-rachid-230/", va="bottom", ha="center", weight='bold', fontsize=12, font=font, color='black')
+
+        logo_path = self.context.logo(self.club)
+        img = Image.open(logo_path)
+        pc = 0.75
+        img_redim = img.resize((int(img.width * pc), int(img.height * pc)))
+        fig.figimage(img_redim, xo=1300, yo=2330, zorder=2)
+
+        fig.tight_layout()
+
+        return fig
+    
+    @memoize(key=lambda self: cache_key(self.events_df, self.player, tuple(self.mins), self.state))
+    def get_shots(self):
+        """
+        Get the player shots with their details (body part, goal mouth), extracted vectorially from the qualifiers.
+        The result is memoized on the game identifiers, the player, the game timelapse and the game state.
+
+        Returns:
+        - pd.DataFrame: The player shots, with the "body_part", "goal_mouth_y" and "goal_mouth_z" columns.
+        """
+        df = self.preprocessing(self.events_df, self.player, self.mins)
+        df_shots = df[df["shot"] == True].reset_index()
+        df_shots["body_part"] = None
+        for body_part in ["Head", "LeftFoot", "RightFoot"]:
+            df_shots.loc[has_qualifier(df_shots["qualifiers"], [body_part]), "body_part"] = body_part
+        df_shots["goal_mouth_y"] = qualifier_value(df_shots["qualifiers"], "GoalMouthY")
+        df_shots["goal_mouth_z"] = qualifier_value(df_shots["qualifiers"], "GoalMouthZ")
+        return df_shots
+
+    def xg_marker_size(self, xg):
+        """
+        Get the marker area of the shots from their xG (a shot without xG has the size of a 0.1 xG shot).
+
+        Parameters:
+        - xg (pd.Series): The xG of the shots.
+
+        Returns:
+        - np.array: The marker areas.
+        """
+        return 100 + 1000 * xg.fillna(0.1).to_numpy()
+
+    @with_chart_style
+    def plot_shotmap_player(self):
+        """
+        Plot the player shot map.
+
+        Returns:
+        - matplotlib.Fig: The matplotlib figure with all the shots.
+        """
+        from matplotlib import pyplot as plt
+        from mplsoccer.pitch import VerticalPitch
+
+        pitch = VerticalPitch(pitch_type='opta', 
+                                line_color='#7c7c7c',
+                                goal_type='box',
+                                linewidth=0.5,
+                                pad_bottom=-10,
+                                half=True)
+
+        fig, axs = pitch.grid(figheight=8, endnote_height=0,  # no endnote
+                            title_height=0.1, title_space=0.02,
+                            # Turn off the endnote/title axis. I usually do this after
+                            # I am happy with the chart layout and text placement
+                            axis=False,
+                            grid_height=0.83)
+        # mplsoccer creates the grid figure with pyplot: unregister it, the caller owns the figure
+        plt.close(fig)
+
+        #pitch.draw(ax=ax, constrained_layout=False, tight_layout=False)
+
+        df_shots = self.get_shots()
+
+        # One scatter per label (attempts, goals by body part), in the order of the shots, the marker area grows with the xG
+        is_goal = (df_shots["goal"] == True).to_numpy()
+        labels = np.where(is_goal, "Goal: " + df_shots["body_part"].astype(str), "Attempted")
+        for label in pd.unique(labels):
+            shots = df_shots[labels == label]
+            if label == "Attempted":
+                marker_color, edge_color = "#ADADAD", None
+            else:
+                body_part = shots["body_part"].iat[0]
+                marker_color = "black"
+                edge_color = "green" if body_part == "RightFoot" else ("red" if body_part == "LeftFoot" else "blue")
+            pitch.scatter(shots["x"], shots["y"], s=self.xg_marker_size(shots["xg"]), c=marker_color, edgecolors=edge_color,
+                          label=label, ax=axs["pitch"], linewidths=1)
+            #if label != "Attempted":
+            #    pitch.lines(shots["x"], shots["y"], shots["goal_mouth_z"], shots["goal_mouth_y"], comet=True, label=shots["body_part"].iat[0], color='#cb5a4c', ax=axs['pitch'])
+
+        legend = axs['pitch'].legend(loc='center left', labelspacing=0.5)
+
+        font = "serif"
+        axs['title'].text(0.5, 0.5, s=f"{self.player} | Shot map | {self.club}", weight='bold', va="bottom", ha="center", fontsize=18, font=font)
+        axs['title'].text(0.5, 0.1, s=f"{self.context.league} | Season 2024-2025 | {self.context.date}", va="bottom", ha="center", fontsize=12, font=font)
+
+        # fig_logo = plt.figure()
+        logo_path = self.context.logo(self.club)
+        img = plt.imread(logo_path)
+        fig.figimage(img, xo=1700, yo=1300, zorder=2)
+
+        return fig
+    
+    @with_chart_style
+    def plot_game_player_defensive(self):
+        """
+        Plot the player defensive map.
+
+        Returns:
+        - matplotlib.Fig: The matplotlib figure with all the defensives map.
+        """
+        from PIL import Image
+
+        df = self.preprocessing(self.events_df, self.player, self.mins)
+        fig, ax, pitch = self.draw_pitch()
+
+        df_def = df[defensive_actions(df["type_name"].to_numpy(), df["outcome"].to_numpy())].reset_index()
+
+        color_dict = {
+            "Tackle": "yellow",
+            "Interception": "orange", 
+            "BlockedPass": "red", 
+            "Clearance": "green", 
+            "Aerial": "blue"
+        }
+
+        used_labels = []
+
+        for index, row in df_def.iterrows():
+            marker_color = color_dict[row["type_name"]]
+
+            label = row["type_name"]
+
+            if label not in used_labels:
+                pitch.scatter(row["x"], row["y"], s=200, c=marker_color, label=label, linewidths=1, ax=ax)
+                used_labels.append(label)
+            else:
+                pitch.scatter(row["x"], row["y"], s=200, c=marker_color, linewidths=1, ax=ax)
+
+        legend = ax.legend(loc='best', labelspacing=0.5)
+
+        font = 'serif'
+        fig.text(x=0.5, y=0.905, s=f"{self.player} | Defensive map | {self.club}", weight='bold', va="bottom", ha="center", fontsize=12, font=font)
+        fig.text(x=0.5, y=0.890, s=f"{self.context.league} | Season 2024-2025 | {self.context.date}", va="bottom", ha="center", fontsize=10, font=font)
+        fig.text(x=0.7, y=-0.0, s="Yannis R", va="bottom", ha="center", weight='bold', fontsize=12, font=font, color='black')
+        fig.text(x=0.37, y=-0.0, s="linkedin.com/in/yannis-rachid-230/", va="bottom", ha="center", weight='bold', fontsize=12, font=font, color='black')
+
+        # fig_logo = plt.figure()
+        logo_path = self.context.logo(self.club)
+        img = Image.open(logo_path)
+        pc = 0.75
+        img_redim = img.resize((int(img.width * pc), int(img.height * pc)))
+        #img = plt.imread(logo_path)
+        fig.figimage(img_redim, xo=1300, yo=2100, zorder=2)
+
+        return fig
+    
+    def get_path_logo(self, league, club):
+        """
+        Get the path logo for a selected team.
+
+        Parameters:
+        - league (string): The league club.
+        - club (string): The selected club.
+
+        Returns:
+        - string: The path of the png logo.
+        """
+        return get_path_logo(league, club)
+
+    def plot_chart(self, chart):
+        """
+        Plot a player chart from its name.
+
+        Parameters:
+        - chart (string): The chart name, one of PlayerVisualization.charts.
+
+        Returns:
+        - matplotlib.Fig: The matplotlib figure of the chart.
+        """
+        plot_functions = {"passes": self.plot_passes_game,
+                          "heatmap": self.plot_heatmap_game,
+                          "dribbles": self.plot_dribbles,
+                          "shotmap": self.plot_shotmap_player,
+                          "defensive": self.plot_game_player_defensive}
+        return plot_functions[chart]()
@@ -0,0 +1,172 @@
+from .cache import memoize, cache_key
+from .context import get_match_context
+from .cube import game_cube, cube_slice, zone_counts, zone_bin_statistic
+from .game_state import state_label
+from .logos import get_path_logo
+from .rendering import new_figure, with_chart_style
+import warnings
+warnings.filterwarnings("ignore")
+
+class PositionalMap:
+    """
+    Display the positional map of both teams with all the necessary details (game, score, visualisations, logos...).
+    """
+    def __init__(self, events_df, mins, context=None, state=None):
+        """
+        Parameters:
+        - events_df (pd.DataFrame): The prepared events of the game.
+        - mins (tuple): The game timelapse (start, end) in minutes.
+        - context (MatchContext): The match context, built from the events if None.
+        - state (string): Only the events of each team while it was leading, drawing or trailing, all of them if None.
+        """
+        self.events_df = events_df
+        self.mins = mins
+        self.state = state
+        self.ax = None
+        self.context = context if context is not None else get_match_context(events_df)
+
+    @with_chart_style
+    def plot_positional_map(self):
+        """
+        Plot the positional map for the both teams.
+
+        Returns:
+        - matplotlib.Fig: The positional map.
+        """
+        import matplotlib as mpl
+
+        events_df = self.events_df
+        cmap = mpl.colors.LinearSegmentedColormap.from_list("", ['#b5dcff',
+                                                                '#97cbfa',
+                                                                '#70b9fa',
+                                                                '#2f97f5',
+                                                                '#0586fa'
+                                                                ])
+
+        fig, ax = new_figure(1,2,figsize=(6,6), dpi=400)
+        self.ax = ax
+        teamId_home = events_df[events_df['h_a'] == 'h']['team_id'].unique()[0]
+        teamId_away = events_df[events_df['h_a'] == 'a']['team_id'].unique()[0]
+
+        for i, teamid in enumerate([teamId_home, teamId_away]):
+            pitch = self.create_pitch()
+
+            #plot vertical pitches
+            pitch.draw(ax=ax[i], constrained_layout=False, tight_layout=False)
+            
+            bin_statistic = self.get_bin_statistic(pitch, teamid)
+            
+            pitch.heatmap_positional(bin_statistic, ax=ax[i], cmap=cmap, edgecolors='#7c7c7c')
+            # pitch.scatter(df.x, df.y, c='white', s=1, ax=ax[i])
+            pitch.label_heatmap(bin_statistic, color='#f4edf0', fontsize=14,
+                                ax=ax[i], ha='center', va='center',
+                                str_format='{:.0%}')
+            
+            self.add_legend(fig, i)
+            
+        return fig
+            
+    def create_pitch(self):
+        """
+        Create the Vertical Pitch with the Opta type of each team.
+
+        Returns:
+        - mplsoccer.VerticalPitch: The pitch.
+        """
+        from mplsoccer.pitch import VerticalPitch
+
+        return VerticalPitch(pitch_type='opta',
+                             line_color='#7c7c7c',
+                             goal_type='box',
+                             linewidth=0.5,
+                             pad_bottom=10)
+
+    @memoize(key=lambda self, pitch, teamid: cache_key(self.events_df, teamid, tuple(self.mins), self.state))
+    def get_bin_statistic(self, pitch, teamid):
+        """
+        Get the share of the team events in each positional zone of the pitch, from the precomputed event counts of the game.
+        The result is memoized on the game identifiers, the team, the game timelapse and the game state.
+
+        Parameters:
+        - pitch (mplsoccer.VerticalPitch): The pitch used for the binning, created by create_pitch.
+        - teamid (int): The team id.
+
+        Returns:
+        - list: The mplsoccer positional bin statistics.
+        """
+        counts = zone_counts(cube_slice(game_cube(self.events_df), self.mins, team_id=teamid, state=self.state))
+        return zone_bin_statistic(pitch, counts, normalize=True)
+
+    def get_stats(self):
+        """
+        Get the positional map data of both teams, as JSON serializable values.
+
+        Returns:
+        - dict: For each team (home team first, see MatchContext.team), the share of events in each positional zone
+          (same order as mplsoccer positional='full').
+        """
+        pitch = self.create_pitch()
+        stats = {"mins": list(self.mins), "state": self.state, "teams": []}
+        for teamid in [self.context.home_team_id, self.context.away_team_id]:
+            bin_statistic = self.get_bin_statistic(pitch, teamid)
+            stats["teams"].append({**self.context.team(teamid), "zones": [bin_stat["statistic"].tolist() for bin_stat in bin_statistic]})
+        return stats
+
+    def add_legend(self, fig, i):
+        """
+        Add the legend for each ax (each passing network team) in the fig.
+
+        Parameters:
+        - fig (matplotlib.Fig): the matplotlib figure
+        - i (int): the index for each ax of the figure.
+        """
+        from PIL import Image
+
+        context = self.context
+        ax = self.ax[i]
+
+        # Adding annotations
+        ax.annotate(xy=(102, 58), xytext=(102, 43), zorder=2, text='', ha='center',
+                    arrowprops=dict(arrowstyle='->, head_length=0.3, head_width=0.1',
+                                    color='#7c7c7c', lw=0.5))
+        ax.annotate(xy=(104, 45), text='Play direction', ha='center', color='#7c7c7c', rotation=90, size=4)
+        ax.annotate(xy=(50, -5), text=f'Passes from minutes {self.mins[0]} to {self.mins[1]}{state_label(self.state)}', ha='center', color='#7c7c7c', size=6)
+
+        font = 'serif'
+        fig.text(x=0.5, y=.92, s=f"Positional map for {context.home_club} {context.score} {context.away_club}", weight='bold', va="bottom", ha="center", fontsize=10, font=font)
+        fig.text(x=0.26, y=.875, s=context.home_club, weight='bold', va="bottom", ha="center", fontsize=8, font=font)
+        fig.text(x=0.745, y=.875, s=context.away_club, weight='bold', va="bottom", ha="center", fontsize=8, font=font)
+        fig.text(x=0.5, y=0.90, s=f"{context.league} | Season 2024-2025 | {context.date}", va="bottom", ha="center", fontsize=6, font=font)
+
+        fig.text(x=0.87, y=0.15, s="Yannis R", va="bottom", ha="center", weight='bold', fontsize=12, font=font, color='black')
+        fig.text(x=0.2, y=0.15, s="linkedin.com/in/yannis-rachid-230/", va="bottom", ha="center", weight='bold', fontsize=6, font=font, color='black')
+
+        home_logo_path = context.home_logo
+        home_img = Image.open(home_logo_path)
+
+        away_logo_path = context.away_logo
+        away_img = Image.open(away_logo_path)
+
+        pc = 0.35
+        home_img_redim = home_img.resize((int(home_img.width * pc), int(home_img.height * pc)))
+        away_img_redim = away_img.resize((int(away_img.width * pc), int(away_img.height * pc)))
+
+        fig.figimage(home_img_redim, xo=80, yo=880, zorder=2)
+        fig.figimage(away_img_redim, xo=1040, yo=880, zorder=2)
+        
+        fig.tight_layout()
+        fig.subplots_adjust(wspace=0.1, hspace=0, bottom=0.1)
+
+    def get_path_logo(self, league, club):
+        """
+        Get the path logo for a selected team.
+
+        Parameters:
+        - league (string): The league club.
+        - club (string): The selected club.
+
+        Returns:
+        - string: The path of the png logo.
+        """
+        return get_path_logo(league, club)
+                
@@ -0,0 +1,160 @@
+"""
+Background prefetch of the games and leagues a user is likely to open next.
+
+Users step through a matchweek game by game or flip between leagues: once a game is displayed, the games around
+it (in date order) are prepared and the recently visited leagues are loaded in the background, so the next
+selection hits the caches. The prefetches run on an asyncio loop in a daemon thread, with a bounded number of
+concurrent loads, and the pending prefetches of a previous selection are cancelled when the selection changes.
+
+The leagues of the app are also loaded in the background (prefetch_leagues), so that their stores, and the search
+manifests written in them at ingest, exist before a user opens them: the player and club search covers all the
+leagues, not only the ones already opened on the host. The leagues are loaded again after a failed load or once the
+loads are older than the league stores max age.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class Prefetcher:
+    """
+    Prefetch the adjacent games of the displayed game and the recent leagues of the user.
+    """
+    def __init__(self, load_league, neighbours=2, max_concurrency=2, leagues_max_age=600):
+        """
+        Parameters:
+        - load_league (callable): Returns the (cached) League of a league name.
+        - neighbours (int): The number of games prefetched before and after the displayed game.
+        - max_concurrency (int): The maximum number of concurrent loads.
+        - leagues_max_age (int): The age in seconds after which the leagues are loaded again (the stores max age).
+        """
+        self.load_league = load_league
+        self.neighbours = neighbours
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="prefetch")
+        self.loop = asyncio.new_event_loop()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.lock = threading.Lock()
+        self.selection = None
+        self.future = None
+        self.leagues_future = None
+        self.leagues_max_age = leagues_max_age
+        self.leagues_loaded_at = None
+        # The leagues whose last load failed, loaded again on the next prefetch_leagues call
+        self.failed_leagues = set()
+        threading.Thread(target=self.loop.run_forever, name="prefetch-loop", daemon=True).start()
+
+    def prefetch(self, league, game_id, recent_leagues=()):
+        """
+        Start the prefetch for a selection, cancelling the pending prefetches of the previous one.
+        A selection already prefetched (streamlit reruns on every widget change) is not prefetched again.
+
+        Parameters:
+        - league (string): The league displayed.
+        - game_id (int): The game displayed.
+        - recent_leagues (list): The other leagues recently visited by the user, most recent first.
+
+        Returns:
+        - concurrent.futures.Future: The prefetch, done when all its loads are done or cancelled.
+        """
+        selection = (league, game_id, tuple(recent_leagues))
+        with self.lock:
+            if selection != self.selection:
+                if self.future is not None:
+                    self.future.cancel()
+                self.selection = selection
+                self.future = asyncio.run_coroutine_threadsafe(self.run(league, game_id, recent_leagues), self.loop)
+            return self.future
+
+    def prefetch_leagues(self, leagues):
+        """
+        Load all the leagues in the background: their stores are built if missing, for the search index of all the
+        leagues. The loads share the concurrency slots of the game prefetches. The leagues are loaded once, then
+        again on the next call after a failed load or once the loads are older than leagues_max_age.
+
+        Parameters:
+        - leagues (list): The league names.
+
+        Returns:
+        - concurrent.futures.Future: The loads, done when all the leagues are loaded.
+        """
+        with self.lock:
+            if self.leagues_future is not None and self.leagues_future.done() and (
+                    self.failed_leagues or time.time() - self.leagues_loaded_at > self.leagues_max_age):
+                self.leagues_future = None
+            if self.leagues_future is None:
+                self.leagues_future = asyncio.run_coroutine_threadsafe(self.load_leagues(list(leagues)), self.loop)
+            return self.leagues_future
+
+    async def load_leagues(self, leagues):
+        """
+        Load leagues one after the other, so that at most one concurrency slot is taken from the game prefetches,
+        and record the leagues whose load failed.
+
+        Parameters:
+        - leagues (list): The league names.
+        """
+        for league in leagues:
+            if await self.load(self.load_league, league) is None:
+                self.failed_leagues.add(league)
+            else:
+                self.failed_leagues.discard(league)
+        self.leagues_loaded_at = time.time()
+
+    def adjacent_games(self, league_data, game_id):
+        """
+        Get the games to prefetch around a game, nearest first, within the cache budget of the games.
+
+        The budget is a quarter of the game cache, so that the prefetches never evict the games the user just saw,
+        and the games already cached are skipped.
+
+        Parameters:
+        - league_data (League): The league.
+        - game_id (int): The game displayed.
+
+        Returns:
+        - list: The game ids to prefetch.
+        """
+        game_ids = list(league_data.game_ids.values())
+        if game_id not in game_ids:
+            return []
+        index = game_ids.index(game_id)
+        budget = min(2 * self.neighbours, league_data.game_events.maxsize // 4)
+        candidates = []
+        for distance in range(1, self.neighbours + 1):
+            candidates += [game_ids[i] for i in (index + distance, index - distance) if 0 <= i < len(game_ids)]
+        # The memoized method is looked up on the class to test its cache with the league as first argument
+        is_cached = type(league_data).game_events.is_cached
+        return [candidate for candidate in candidates if not is_cached(league_data, candidate)][:budget]
+
+    async def load(self, func, *args):
+        """
+        Run a blocking load in the prefetch threads, once a concurrency slot is free.
+
+        Parameters:
+        - func (callable): The load function.
+        - args: The load function arguments.
+
+        Returns:
+        - The load function result, None if it failed (a prefetch never raises).
+        """
+        async with self.semaphore:
+            try:
+                return await self.loop.run_in_executor(self.executor, func, *args)
+            except Exception:
+                return None
+
+    async def run(self, league, game_id, recent_leagues):
+        """
+        Prefetch the adjacent games of the displayed game, then the recent leagues.
+
+        Parameters:
+        - league (string): The league displayed.
+        - game_id (int): The game displayed.
+        - recent_leagues (list): The other leagues recently visited by the user.
+        """
+        league_data = await self.load(self.load_league, league)
+        if league_data is not None:
+            await asyncio.gather(*[self.load(league_data.game_events, adjacent_game_id)
+                                   for adjacent_game_id in self.adjacent_games(league_data, game_id)])
+        await asyncio.gather(*[self.load(self.load_league, recent_league)
+                               for recent_league in recent_leagues if recent_league != league])
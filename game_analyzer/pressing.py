@@ -0,0 +1,141 @@
+"""
+Team pressing and defensive line metrics by rolling window, computed in one vectorized pass over the events of a
+game or of a whole season.
+
+The events are counted on a (game, team) x window minute grid with np.bincount, and the rolling sums of every
+team of every game are differences of cumulative sums along the minutes: no loop over the games.
+
+Metrics of a team at a minute, over the window of the last `window` minutes (minute included):
+- ppda: passes of the opponent in its own 60% of the pitch per defensive action of the team in that area
+  (tackles, interceptions, challenges and fouls committed), the lower the more intense the pressing.
+- action_height: mean x of the defensive actions of the team, fouls committed included (0: own goal line, 100:
+  opponent goal line).
+- defensive_line: mean x of the defensive actions of the team in its own half, a proxy of the height of the
+  back line (the data has no tracking of the players off the ball).
+"""
+import numpy as np
+import pandas as pd
+from .cache import memoize, frame_key
+
+# Defensive actions counted by the PPDA, the fouls only when committed (unsuccessful outcome)
+PPDA_ACTIONS = ["Tackle", "Interception", "Challenge"]
+# All the defensive actions, for the height metrics, with the committed fouls as for the PPDA
+DEFENSIVE_ACTIONS = ["Tackle", "Interception", "BlockedPass", "Clearance", "Aerial", "Challenge", "BallRecovery"]
+# The PPDA area: the defending team's actions beyond this x (the opponent's own 60%)
+PRESSING_ZONE_X = 40
+# Default rolling window, in minutes
+PRESSING_WINDOW = 15
+
+PRESSING_COLUMNS = ["game_id", "team_id", "minute", "opponent_passes", "pressing_actions", "ppda",
+                    "defensive_actions", "action_height", "defensive_line"]
+
+def rolling_sum(counts, window):
+    """
+    Sum the counts of each row over a trailing window of columns.
+
+    Parameters:
+    - counts (np.array): The counts, one row per (game, team) and one column per minute.
+    - window (int): The window length, in columns.
+
+    Returns:
+    - np.array: The rolling sums, same shape as counts.
+    """
+    cumulative = np.cumsum(counts, axis=1)
+    sums = cumulative.copy()
+    sums[:, window:] -= cumulative[:, :-window]
+    return sums
+
+def pressing_metrics(df, window=PRESSING_WINDOW):
+    """
+    Compute the rolling pressing metrics of every team of every game of the events.
+
+    Parameters:
+    - df (pd.DataFrame): The events of one or several games (both teams), with the game_id, team_id, window_minute,
+      type_name, outcome and start location (start_x, or x once prepared) columns.
+    - window (int): The rolling window, in minutes.
+
+    Returns:
+    - pd.DataFrame: One row per game, team and minute (until the last minute of the game), with PRESSING_COLUMNS.
+    """
+    minute = df["window_minute"].to_numpy().astype(int)
+    valid = minute >= 0
+    if not valid.any():
+        return pd.DataFrame(columns=PRESSING_COLUMNS)
+    game = df["game_id"].to_numpy()
+    team = df["team_id"].to_numpy()
+    type_name = df["type_name"].to_numpy()
+    x = df["start_x" if "start_x" in df.columns else "x"].to_numpy(dtype=float)
+
+    # One row of the grid per (game, team), the opponent of a team is the other team of its game
+    pairs = pd.DataFrame({"game_id": game[valid], "team_id": team[valid]}).drop_duplicates().sort_values(["game_id", "team_id"])
+    pair_index = pd.MultiIndex.from_frame(pairs)
+    team_sum = pairs.groupby("game_id")["team_id"].sum()
+    row = pair_index.get_indexer(pd.MultiIndex.from_arrays([game, team]))
+    opponent = team_sum.reindex(game).to_numpy() - team
+    opponent_row = pair_index.get_indexer(pd.MultiIndex.from_arrays([game, opponent]))
+
+    n_rows, n_minutes = len(pairs), minute.max() + 1
+
+    def grid(mask, rows, weights=None):
+        mask = mask & valid & (rows >= 0)
+        flat = rows[mask] * n_minutes + minute[mask]
+        return np.bincount(flat, weights=None if weights is None else weights[mask], minlength=n_rows * n_minutes).reshape(n_rows, n_minutes)
+
+    has_x = ~np.isnan(x)
+    outcome = df["outcome"].to_numpy() == True
+    committed_foul = (type_name == "Foul") & ~outcome
+    defensive = (np.isin(type_name, DEFENSIVE_ACTIONS) | committed_foul) & has_x
+    own_half = defensive & (x < 50)
+    # The opponent passes are counted in the grid row of the defending team
+    opponent_passes = rolling_sum(grid((type_name == "Pass") & has_x & (x <= 100 - PRESSING_ZONE_X), opponent_row), window)
+    pressing_actions = rolling_sum(grid((np.isin(type_name, PPDA_ACTIONS) | committed_foul)
+                                        & (x >= PRESSING_ZONE_X), row), window)
+    defensive_actions = rolling_sum(grid(defensive, row), window)
+    defensive_x = rolling_sum(grid(defensive, row, x), window)
+    own_half_actions = rolling_sum(grid(own_half, row), window)
+    own_half_x = rolling_sum(grid(own_half, row, x), window)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics = pd.DataFrame({"game_id": np.repeat(pairs["game_id"].to_numpy(), n_minutes),
+                                "team_id": np.repeat(pairs["team_id"].to_numpy(), n_minutes),
+                                "minute": np.tile(np.arange(n_minutes), n_rows),
+                                "opponent_passes": opponent_passes.ravel().astype(int),
+                                "pressing_actions": pressing_actions.ravel().astype(int),
+                                "ppda": np.where(pressing_actions > 0, opponent_passes / pressing_actions, np.nan).ravel(),
+                                "defensive_actions": defensive_actions.ravel().astype(int),
+                                "action_height": np.where(defensive_actions > 0, defensive_x / defensive_actions, np.nan).ravel(),
+                                "defensive_line": np.where(own_half_actions > 0, own_half_x / own_half_actions, np.nan).ravel()},
+                               columns=PRESSING_COLUMNS)
+    # Only the minutes played in each game
+    last_minute = pd.Series(minute[valid]).groupby(game[valid]).max()
+    return metrics[metrics["minute"].to_numpy() <= last_minute.reindex(metrics["game_id"]).to_numpy()].reset_index(drop=True)
+
+@memoize(key=frame_key, maxsize=64)
+def game_pressing(events_df):
+    """
+    Compute the rolling pressing metrics of a game (see pressing_metrics), with the default window.
+    The result is memoized on the game identifiers, it must not be modified in place.
+
+    Parameters:
+    - events_df (pd.DataFrame): The prepared events of the game (both teams).
+
+    Returns:
+    - pd.DataFrame: The pressing metrics of both teams by minute.
+    """
+    return pressing_metrics(events_df)
+
+def league_pressing(store, window=PRESSING_WINDOW, game_ids=None):
+    """
+    Compute the rolling pressing metrics of all the games of a league season at once, from the league store.
+
+    Parameters:
+    - store (LeagueStore): The memory-mapped league events.
+    - window (int): The rolling window, in minutes.
+    - game_ids (list): Only compute the metrics of these games, all the games if None.
+
+    Returns:
+    - pd.DataFrame: The pressing metrics of every team of every game by minute.
+    """
+    columns = ["game_id", "team_id", "window_minute", "type_name", "outcome", "start_x"]
+    table = store.table if game_ids is None else store.games_table(game_ids)
+    return pressing_metrics(table.select(columns).to_pandas(), window)
@@ -0,0 +1,91 @@
+from .context import get_match_context
+from .game_state import game_state_timeline, state_label
+from .pressing import PRESSING_WINDOW, game_pressing
+from .rendering import new_figure, with_chart_style
+import warnings
+warnings.filterwarnings("ignore")
+
+class PressingTimeline:
+    """
+    Display the pressing timeline of both teams (PPDA, defensive action height and defensive line by rolling window).
+    """
+    # Metrics of the timeline: column, axis label
+    metrics = [("ppda", "PPDA"), ("action_height", "Defensive actions height"), ("defensive_line", "Defensive line")]
+    colors = ["#0586fa", "#cb5a4c"]
+
+    def __init__(self, events_df, mins, context=None, pressing=None, state=None):
+        """
+        Parameters:
+        - events_df (pd.DataFrame): The prepared events of the game.
+        - mins (tuple): The game timelapse (start, end) in minutes, highlighted on the timeline.
+        - context (MatchContext): The match context, built from the events if None.
+        - pressing (pd.DataFrame): The pressing metrics of the game (ex: League.game_pressing), computed from the events if None.
+        - state (string): Only the minutes of each team while it was leading, drawing or trailing, all of them if None.
+        """
+        self.events_df = events_df
+        self.mins = mins
+        self.context = context if context is not None else get_match_context(events_df)
+        self.pressing = pressing if pressing is not None else game_pressing(events_df)
+        self.state = state
+
+    def team_metrics(self, team_id):
+        """
+        Get the pressing metrics of a team, the minutes out of the game state left empty (NaN).
+
+        Parameters:
+        - team_id (int): The team id.
+
+        Returns:
+        - pd.DataFrame: The metrics of the team by minute.
+        """
+        df = self.pressing[self.pressing["team_id"] == team_id]
+        if self.state is None:
+            return df
+        out_of_state = game_state_timeline(self.events_df).minute_states(team_id, df["minute"].to_numpy()) != self.state
+        return df.assign(**{column: df[column].where(~out_of_state) for column, _ in self.metrics})
+
+    def get_stats(self):
+        """
+        Get the pressing timeline of both teams, as JSON serializable values.
+
+        Returns:
+        - dict: For each team (home team first, see MatchContext.team), the metrics by minute in the game timelapse.
+        """
+        stats = {"mins": list(self.mins), "state": self.state, "window": PRESSING_WINDOW, "teams": []}
+        for team_id in [self.context.home_team_id, self.context.away_team_id]:
+            df = self.team_metrics(team_id)
+            df = df[(df["minute"] >= self.mins[0]) & (df["minute"] <= self.mins[1])].drop(columns=["game_id", "team_id"])
+            stats["teams"].append({**self.context.team(team_id), "metrics": df.astype(object).where(df.notnull(), None).to_dict(orient="records")})
+        return stats
+
+    @with_chart_style
+    def plot_pressing_timeline(self):
+        """
+        Plot the pressing timeline of both teams.
+
+        Returns:
+        - matplotlib.Fig: The pressing timeline.
+        """
+        context = self.context
+        fig, ax = new_figure(len(self.metrics), 1, figsize=(6, 6), dpi=400)
+        last_minute = self.pressing["minute"].max() if len(self.pressing) else self.mins[1]
+
+        for i, (column, label) in enumerate(self.metrics):
+            for team_id, color in zip([context.home_team_id, context.away_team_id], self.colors):
+                df = self.team_metrics(team_id)
+                ax[i].plot(df["minute"], df[column], color=color, linewidth=1, label=context.club(team_id))
+            ax[i].axvspan(self.mins[0], self.mins[1], color="#7c7c7c", alpha=0.1, linewidth=0)
+            ax[i].set_xlim(0, last_minute)
+            ax[i].set_ylabel(label, fontsize=6, font="serif")
+            ax[i].tick_params(labelsize=5)
+        # A low PPDA is an intense pressing: the most intense pressing at the top
+        ax[0].invert_yaxis()
+        ax[0].legend(loc="upper left", fontsize=5)
+        ax[-1].set_xlabel(f"Minute (rolling window of {PRESSING_WINDOW} minutes{state_label(self.state)})", fontsize=6, font="serif")
+
+        font = "serif"
+        fig.text(x=0.5, y=.95, s=f"Pressing timeline for {context.home_club} {context.score} {context.away_club}", weight='bold', va="bottom", ha="center", fontsize=10, font=font)
+        fig.text(x=0.5, y=0.93, s=f"{context.league} | Season 2024-2025 | {context.date}", va="bottom", ha="center", fontsize=6, font=font)
+
+        fig.subplots_adjust(top=0.91, hspace=0.15)
+        return fig
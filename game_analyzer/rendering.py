@@ -0,0 +1,227 @@
+"""
+Figure lifecycle of the charts: creation with the object-oriented API, style isolation and deterministic release.
+
+The figures are created with matplotlib.figure.Figure, not pyplot: they are not registered in the pyplot state
+machine and nothing keeps them alive once the caller drops them. The chart style is applied around each rendering
+only (chart_style), instead of mutating the global rcParams for the whole process, and an encoded figure is
+released at once (encode_figure), so that a long-running process does not grow with each rerun or request.
+
+Progressive rendering: the charts are drawn for print (dpi 400), far more pixels than a screen shows. A figure can
+first be encoded at the dpi of the client viewport (viewport_dpi, encode_preview), a fraction of the encoding time
+and size, and encoded at full quality afterwards from the same figure, the full quality image being kept in the
+render cache (render_chart) for the next reruns and the downloads.
+"""
+import contextlib
+import functools
+import io
+import threading
+import numpy as np
+from .cache import memoize
+
+CHART_STYLE = "fivethirtyeight"
+
+# The preview dpi are rounded down to this step, so that close viewports share their previews
+PREVIEW_DPI_STEP = 10
+PREVIEW_MIN_DPI = 40
+# Width of the main column of the streamlit app (centered layout), when the viewport of the client is unknown
+DEFAULT_VIEWPORT_WIDTH = 704
+# Total size of the encoded images of the render cache of a process: the full quality pngs weigh from 50 kB to a
+# few MB (heat map), a page of the app is about 5 MB
+RENDER_CACHE_BYTES = 32 * 1024 * 1024
+
+_style_lock = threading.Lock()
+_style_users = 0
+_saved_rc_params = None
+
+@contextlib.contextmanager
+def chart_style():
+    """
+    Apply the chart style to the rcParams during a rendering, and restore the previous rcParams after it.
+
+    The rcParams are global to the process: the style is applied by the first of the concurrent renderings and
+    restored by the last one, so that a rendering never sees the rcParams restored under its feet by another thread.
+    """
+    global _style_users, _saved_rc_params
+    import matplotlib
+    import matplotlib.style
+
+    with _style_lock:
+        if _style_users == 0:
+            _saved_rc_params = matplotlib.rcParams.copy()
+            matplotlib.style.use(CHART_STYLE)
+        _style_users += 1
+    try:
+        yield
+    finally:
+        with _style_lock:
+            _style_users -= 1
+            if _style_users == 0:
+                dict.update(matplotlib.rcParams, _saved_rc_params)
+                _saved_rc_params = None
+
+def with_chart_style(func):
+    """
+    Decorate a plot method so that it renders with the chart style (see chart_style).
+
+    Parameters:
+    - func (callable): The plot method.
+
+    Returns:
+    - callable: The decorated plot method.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with chart_style():
+            return func(*args, **kwargs)
+    return wrapper
+
+def new_figure(nrows=1, ncols=1, **kwargs):
+    """
+    Create a figure and its axes with the object-oriented API, out of the pyplot state machine.
+
+    Parameters:
+    - nrows (int): The number of rows of axes.
+    - ncols (int): The number of columns of axes.
+    - kwargs: The Figure parameters (figsize, dpi...).
+
+    Returns:
+    - matplotlib.Fig: The figure.
+    - matplotlib.ax or np.array: The axes.
+    """
+    from matplotlib.figure import Figure
+
+    fig = Figure(**kwargs)
+    return fig, fig.subplots(nrows, ncols)
+
+def release_figure(fig):
+    """
+    Release a figure: unregister it from pyplot if a library created it there, and clear its artists.
+
+    Parameters:
+    - fig (matplotlib.Fig): The figure, it must not be used after this call.
+    """
+    from matplotlib import pyplot as plt
+
+    plt.close(fig)
+    fig.clear()
+
+def viewport_dpi(fig, viewport_width=None, pixel_ratio=1):
+    """
+    Get the dpi at which a figure fills the width of the client viewport, at most the dpi of the figure.
+
+    Parameters:
+    - fig (matplotlib.Fig): The figure.
+    - viewport_width (int): The width available to the chart in the client, in CSS pixels (DEFAULT_VIEWPORT_WIDTH if None).
+    - pixel_ratio (float): The device pixel ratio of the client (2 on most phones and laptops).
+
+    Returns:
+    - int: The dpi.
+    """
+    width = (viewport_width or DEFAULT_VIEWPORT_WIDTH) * pixel_ratio
+    dpi = int(width / fig.get_figwidth()) // PREVIEW_DPI_STEP * PREVIEW_DPI_STEP
+    return int(min(max(dpi, PREVIEW_MIN_DPI), fig.dpi))
+
+@contextlib.contextmanager
+def scaled_pixel_artists(fig, dpi):
+    """
+    Scale the artists placed in pixels on a figure (figimage logos, legend patches added to fig.patches) for a
+    saving at another dpi, and restore them after it. The other artists are placed in figure or points units and
+    scale with the dpi.
+
+    Parameters:
+    - fig (matplotlib.Fig): The figure.
+    - dpi (float): The dpi of the saving.
+    """
+    from matplotlib.transforms import Affine2D, IdentityTransform
+
+    scale = dpi / fig.dpi
+    images = [(image, image.ox, image.oy, image.get_array()) for image in fig.images]
+    patches = [patch for patch in fig.patches if isinstance(patch.get_data_transform(), IdentityTransform)]
+    try:
+        for image, ox, oy, data in images:
+            # Nearest neighbour resampling, the logos are small
+            rows = (np.arange(max(int(data.shape[0] * scale), 1)) / scale).astype(int)
+            columns = (np.arange(max(int(data.shape[1] * scale), 1)) / scale).astype(int)
+            image.set_data(data[rows][:, columns])
+            image.ox, image.oy = ox * scale, oy * scale
+        for patch in patches:
+            patch.set_transform(Affine2D().scale(scale))
+        yield
+    finally:
+        for image, ox, oy, data in images:
+            image.set_data(data)
+            image.ox, image.oy = ox, oy
+        for patch in patches:
+            patch.set_transform(IdentityTransform())
+
+def save_figure(fig, fmt, dpi=None, **kwargs):
+    """
+    Encode a figure in an image format, without releasing it.
+
+    Parameters:
+    - fig (matplotlib.Fig): The figure.
+    - fmt (string): The image format (png or svg).
+    - dpi (float): The dpi of the image, the dpi of the figure if None.
+    - kwargs: The other savefig parameters.
+
+    Returns:
+    - bytes: The encoded image.
+    """
+    buffer = io.BytesIO()
+    if dpi is None or dpi == fig.dpi:
+        fig.savefig(buffer, format=fmt, bbox_inches="tight", **kwargs)
+    else:
+        with scaled_pixel_artists(fig, dpi):
+            fig.savefig(buffer, format=fmt, bbox_inches="tight", dpi=dpi, **kwargs)
+    return buffer.getvalue()
+
+def encode_figure(fig, fmt, dpi=None, **kwargs):
+    """
+    Encode a figure in an image format and release it.
+
+    Parameters:
+    - fig (matplotlib.Fig): The figure.
+    - fmt (string): The image format (png or svg).
+    - dpi (float): The dpi of the image, the dpi of the figure if None.
+    - kwargs: The other savefig parameters.
+
+    Returns:
+    - bytes: The encoded image.
+    """
+    try:
+        return save_figure(fig, fmt, dpi, **kwargs)
+    finally:
+        release_figure(fig)
+
+def encode_preview(fig, viewport_width=None, pixel_ratio=1):
+    """
+    Encode a low resolution png of a figure for the client viewport, the figure is kept for the full quality encoding.
+
+    Parameters:
+    - fig (matplotlib.Fig): The figure.
+    - viewport_width (int): The width available to the chart in the client, in CSS pixels.
+    - pixel_ratio (float): The device pixel ratio of the client.
+
+    Returns:
+    - bytes: The encoded png.
+    """
+    return save_figure(fig, "png", viewport_dpi(fig, viewport_width, pixel_ratio))
+
+@memoize(lambda key, build, fmt="png", viewport=None: None if key is None else (key, fmt, viewport),
+         maxsize=256, maxbytes=RENDER_CACHE_BYTES)
+def render_chart(key, build, fmt="png", viewport=None):
+    """
+    Encode a chart at full quality (or for a client viewport), the encoded image shared by all the callers with the
+    same chart key.
+
+    Parameters:
+    - key (tuple): The chart key (the frame key of the events, the chart name and its parameters), None to skip the cache.
+    - build (callable): Returns the figure of the chart, only called on a cache miss. The figure is released.
+    - fmt (string): The image format (png or svg).
+    - viewport (tuple): The (viewport width, device pixel ratio) of the client for a low resolution png, full quality if None.
+
+    Returns:
+    - bytes: The encoded image.
+    """
+    fig = build()
+    return encode_figure(fig, fmt, viewport_dpi(fig, *viewport) if viewport is not None and fmt == "png" else None)
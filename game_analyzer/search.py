@@ -0,0 +1,194 @@
+"""
+Fuzzy search of the players and clubs of all the leagues, on a trigram index.
+
+The search manifest of a league (its players with their games, its clubs) is computed at ingest and written in the
+metadata of the league store (search_manifest), so the index of all the leagues is built from the store metadata
+without reading the events. The names are normalized (accents removed, lower case, punctuation as spaces) and cut
+into trigrams, each word padded as in PostgreSQL pg_trgm ("  mb", " mba", ..., "pe "). The index is an inverted
+list of the names of each trigram in one sorted array: a query gathers the lists of its trigrams and counts the
+trigrams shared with each name in one np.bincount. The score of a name is the share of the query trigrams it has
+(a typo or a missing accent only loses the trigrams around it, a first name left out loses nothing), the ties are
+broken by the share of the trigrams of the name matched.
+
+Usage:
+    index = search_index()
+    index.search("mbape")  # [{"kind": "player", "name": "Kylian Mbappe", "league": ..., "games": [...]}, ...]
+"""
+import glob
+import json
+import os
+import re
+import unicodedata
+import numpy as np
+from .cache import memoize
+from .clubs import clubs_aliases
+from .data import team_names
+
+# Minimum share of the query trigrams found in a name
+MIN_SCORE = 0.5
+
+def normalize_text(text):
+    """
+    Normalize a name for the search: accents removed, lower case, the punctuation and dashes replaced by spaces.
+
+    Parameters:
+    - text (string): The name.
+
+    Returns:
+    - string: The normalized name.
+    """
+    text = "".join(char for char in unicodedata.normalize("NFKD", str(text)) if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", text.lower()).split())
+
+def trigrams(text):
+    """
+    Get the trigrams of a name, each word padded with two spaces before and one after.
+
+    Parameters:
+    - text (string): The name.
+
+    Returns:
+    - set: The trigrams of the normalized name.
+    """
+    grams = set()
+    for word in normalize_text(text).split():
+        padded = f"  {word} "
+        grams.update(padded[k:k + 3] for k in range(len(padded) - 2))
+    return grams
+
+def search_manifest(df):
+    """
+    Build the search manifest of a league at ingest: the games of each player and of each club.
+
+    Parameters:
+    - df (pd.DataFrame): The league events, sorted by game (with the game_id, team_id and player_name columns).
+
+    Returns:
+    - dict: The players ([player name, team id, game ids]) and the clubs ([team id, game ids]).
+    """
+    players = df[df["player_name"].notnull()].groupby(["player_name", "team_id"], sort=True)["game_id"].unique()
+    clubs = df[df["team_id"].notnull()].groupby("team_id", sort=True)["game_id"].unique()
+    return {"players": [[player, int(team_id), [int(game_id) for game_id in game_ids]] for (player, team_id), game_ids in players.items()],
+            "clubs": [[int(team_id), [int(game_id) for game_id in game_ids]] for team_id, game_ids in clubs.items()]}
+
+class SearchIndex:
+    """
+    Trigram index of the player and club names (and the club aliases) of one or several leagues.
+    """
+    def __init__(self, entries):
+        """
+        Parameters:
+        - entries (list): The searchable players and clubs (dicts with kind, name, league, club, aliases and games).
+        """
+        self.entries = entries
+        self.leagues = sorted({entry["league"] for entry in entries})
+        # One row per searchable name (the name of an entry or one of its aliases)
+        owners = [k for k, entry in enumerate(entries) for _ in range(1 + len(entry.get("aliases", [])))]
+        names = [name for entry in entries for name in [entry["name"]] + entry.get("aliases", [])]
+        self.owners = np.array(owners, dtype=np.int64)
+
+        self.vocabulary = {}
+        gram_ids, name_ids = [], []
+        for name_id, name in enumerate(names):
+            for gram in trigrams(name):
+                gram_ids.append(self.vocabulary.setdefault(gram, len(self.vocabulary)))
+                name_ids.append(name_id)
+        gram_ids = np.array(gram_ids, dtype=np.int64)
+        order = np.argsort(gram_ids, kind="stable")
+        # Inverted lists: the names of trigram g are postings[offsets[g]:offsets[g + 1]]
+        self.postings = np.array(name_ids, dtype=np.int64)[order]
+        self.offsets = np.r_[0, np.cumsum(np.bincount(gram_ids, minlength=len(self.vocabulary)))]
+        self.sizes = np.bincount(np.array(name_ids, dtype=np.int64), minlength=len(names))
+
+    def search(self, query, k=10, kind=None, min_score=MIN_SCORE):
+        """
+        Search the players and clubs whose name is close to a query (accent insensitive, typo tolerant).
+
+        Parameters:
+        - query (string): The searched name.
+        - k (int): The maximum number of results.
+        - kind (string): "player" or "club" to search only one kind of entries, both if None.
+        - min_score (float): The minimum share of the query trigrams found in a name.
+
+        Returns:
+        - list: The matching entries (kind, name, league, club, games...) with their score, best first.
+        """
+        grams = trigrams(query)
+        known = [self.vocabulary[gram] for gram in grams if gram in self.vocabulary]
+        if not known:
+            return []
+        postings = np.concatenate([self.postings[self.offsets[gram]:self.offsets[gram + 1]] for gram in known])
+        counts = np.bincount(postings, minlength=len(self.sizes))
+        names = np.flatnonzero(counts)
+        score = counts[names] / len(grams)
+        similarity = counts[names] / (len(grams) + self.sizes[names] - counts[names])
+        names, score, similarity = names[score >= min_score], score[score >= min_score], similarity[score >= min_score]
+        if kind is not None:
+            is_kind = np.array([self.entries[owner]["kind"] == kind for owner in self.owners[names]], dtype=bool)
+            names, score, similarity = names[is_kind], score[is_kind], similarity[is_kind]
+
+        # Best name of each entry, then the best entries
+        order = np.lexsort((-similarity, -score))
+        _, first = np.unique(self.owners[names[order]], return_index=True)
+        best = order[np.sort(first)][:k]
+        return [{**self.entries[owner], "score": round(float(entry_score), 3)}
+                for owner, entry_score in zip(self.owners[names[best]], score[best])]
+
+def league_search_entries(league, metadata):
+    """
+    Get the searchable players and clubs of a league from the metadata of its store.
+
+    Parameters:
+    - league (string): The league name.
+    - metadata (dict): The schema metadata of the league store.
+
+    Returns:
+    - list: The entries of the players and clubs of the league (see SearchIndex).
+    """
+    games = {game["game_id"]: {"game_id": game["game_id"], "game": game["game"], "date": game["date"]} for game in json.loads(metadata[b"games"])}
+    manifest = json.loads(metadata[b"search"])
+    entries = []
+    for team_id, game_ids in manifest["clubs"]:
+        club = team_names.get(team_id, str(team_id))
+        entries.append({"kind": "club", "name": club.replace("-", " "), "league": league, "club": club,
+                        "aliases": clubs_aliases.get(club, []), "games": [games[game_id] for game_id in game_ids]})
+    for player, team_id, game_ids in manifest["players"]:
+        entries.append({"kind": "player", "name": player, "league": league, "club": team_names.get(team_id, str(team_id)),
+                        "games": [games[game_id] for game_id in game_ids]})
+    return entries
+
+def league_stores(cache_dir=None):
+    """
+    List the league stores of a folder with their modification time.
+
+    Parameters:
+    - cache_dir (string): The folder of the Arrow files, defaults to store.CACHE_DIR.
+
+    Returns:
+    - tuple: The (path, modification time) of the league stores.
+    """
+    from .store import CACHE_DIR
+
+    return tuple((path, os.path.getmtime(path)) for path in sorted(glob.glob(os.path.join(cache_dir or CACHE_DIR, "*_events.arrow"))))
+
+@memoize(key=lambda cache_dir=None: league_stores(cache_dir), maxsize=4)
+def search_index(cache_dir=None):
+    """
+    Build the search index of all the leagues with a store, from the search manifests written at ingest.
+    The result is memoized on the league stores and their modification times (a data refresh rebuilds it).
+
+    Parameters:
+    - cache_dir (string): The folder of the Arrow files, defaults to store.CACHE_DIR.
+
+    Returns:
+    - SearchIndex: The index of the players and clubs of all the leagues.
+    """
+    from .store import STORE_FORMAT, read_store_metadata
+
+    entries = []
+    for path, _ in league_stores(cache_dir):
+        metadata = read_store_metadata(path)
+        # The stores in another format are rebuilt when their league is opened
+        if metadata.get(b"format", b"").decode() == STORE_FORMAT:
+            entries += league_search_entries(metadata[b"league"].decode(), metadata)
+    return SearchIndex(entries)
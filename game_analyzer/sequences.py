@@ -0,0 +1,102 @@
+"""
+Possession chains built in one vectorized pass over the events of a game or of a whole season.
+
+- possession_id: consecutive on-ball events of the same team, in the same game and period.
+- sequence_id: a possession split at each stoppage (set piece restart, foul, offside...).
+- pass_recipient_name: the player of the next on-ball event of the team in the same possession,
+  only for the successful passes (an unsuccessful pass has no recipient).
+
+The events must be sorted by game then event order (as in the league store).
+"""
+import numpy as np
+import pandas as pd
+
+# Duels and administrative events are recorded for both teams or do not mean that a team controls the ball:
+# they never start a possession, they take the possession of the event before them.
+NON_POSSESSION_TYPES = ["Aerial", "Challenge", "Foul", "Card", "SubstitutionOn", "SubstitutionOff", "FormationChange",
+                        "FormationSet", "Start", "End", "OffsideProvoked", "OffsideGiven", "CornerAwarded", "Dispossessed",
+                        "Error", "PenaltyFaced", "ShieldBallOpp", "Smother", "Claim", "KeeperSweeper", "Punch"]
+
+# Events after which the ball is dead, the next event starts a new sequence
+STOPPAGE_TYPES = ["Foul", "Card", "OffsideGiven", "OffsideProvoked", "SubstitutionOn", "SubstitutionOff", "Goal", "End"]
+
+# Qualifiers of the restarts, the event starts a new sequence
+SET_PIECE_QUALIFIERS = ["ThrowIn", "CornerTaken", "FreekickTaken", "GoalKick", "KickOff", "Penalty"]
+
+def has_qualifier(qualifiers, names):
+    """
+    Test vectorially if the events have one of the qualifiers.
+
+    Parameters:
+    - qualifiers (pd.Series): The qualifiers of the events, raw strings (as stored) or lists of dicts.
+    - names (list): The qualifier display names.
+
+    Returns:
+    - np.array: True for the events with one of the qualifiers.
+    """
+    if len(qualifiers) == 0:
+        return np.zeros(0, dtype=bool)
+    qualifiers = qualifiers.fillna("").astype(str)
+    pattern = "|".join(f"'displayName': '{name}'" for name in names)
+    return qualifiers.str.contains(pattern, regex=True).to_numpy()
+
+def add_possessions(df):
+    """
+    Add the possession_id, sequence_id and pass_recipient_name columns to the events.
+
+    Parameters:
+    - df (pd.DataFrame): The events of a game or a season, sorted by game then event order.
+
+    Returns:
+    - pd.DataFrame: The events with the possession columns.
+    """
+    df = df.reset_index(drop=True)
+    n = len(df)
+    game = df["game_id"].to_numpy()
+    period = df["period_id"].to_numpy()
+    team = df["team_id"].to_numpy()
+    type_name = df["type_name"].to_numpy()
+
+    new_period = np.ones(n, dtype=bool)
+    new_period[1:] = (game[1:] != game[:-1]) | (period[1:] != period[:-1])
+
+    # Possession events: on-ball events of a player
+    on_ball = df["player_name"].notnull().to_numpy() & ~np.isin(type_name, NON_POSSESSION_TYPES)
+    rows = np.flatnonzero(on_ball)
+
+    # A possession starts on the first on-ball event of a period or when the team on the ball changes
+    period_id = np.cumsum(new_period)
+    starts = np.ones(len(rows), dtype=bool)
+    starts[1:] = (period_id[rows[1:]] != period_id[rows[:-1]]) | (team[rows[1:]] != team[rows[:-1]])
+    possession = np.full(n, np.nan)
+    possession[rows] = np.cumsum(starts)
+    # The other events take the possession before them, in the same period
+    possession = pd.Series(possession).groupby(period_id).ffill().to_numpy()
+
+    # A sequence also starts after a stoppage and on a set piece restart
+    stoppage = np.isin(type_name, STOPPAGE_TYPES)
+    after_stoppage = np.zeros(len(rows), dtype=bool)
+    if len(rows) > 1:
+        # Stoppage between two consecutive on-ball events: from the previous one (included) to the next one (excluded)
+        after_stoppage[1:] = np.maximum.reduceat(stoppage, rows)[:-1]
+    seq_starts = starts | after_stoppage | has_qualifier(df["qualifiers"].iloc[rows], SET_PIECE_QUALIFIERS)
+    sequence = np.full(n, np.nan)
+    sequence[rows] = np.cumsum(seq_starts)
+    sequence = pd.Series(sequence).groupby(period_id).ffill().to_numpy()
+
+    # Pass recipient: player of the next on-ball event, in the same possession, for the successful passes
+    player = df["player_name"].to_numpy()
+    recipient = np.full(n, None, dtype=object)
+    if len(rows) > 1:
+        current, following = rows[:-1], rows[1:]
+        received = ((type_name[current] == "Pass") & df["outcome"].to_numpy()[current].astype(bool)
+                    & (possession[current] == possession[following]))
+        recipient[current[received]] = player[following[received]]
+
+    # Numbered from 1 in each game, so that the ids of a game do not depend on the other games of the season
+    possession = possession - pd.Series(possession).groupby(game).transform("min").to_numpy() + 1
+    sequence = sequence - pd.Series(sequence).groupby(game).transform("min").to_numpy() + 1
+    df["possession_id"] = pd.array(possession, dtype="Int64")
+    df["sequence_id"] = pd.array(sequence, dtype="Int64")
+    df["pass_recipient_name"] = recipient
+    return df
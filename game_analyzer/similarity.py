@@ -0,0 +1,252 @@
+"""
+Similar players search: per-player season feature vectors in a normalized matrix, queried by exact cosine similarity.
+
+The raw counts of each player in each game (passes, take-ons, shots, xG, defensive actions, pass xT, events by
+positional zone, minutes played) are computed in one vectorized pass over the league store columns. The season
+features are sums of the game counts: per-90 rates, pass and take-on success rates and the share of the events of
+the player in each positional zone, standardized feature by feature (z-scores) and scaled to unit rows, so that
+the similarity of a player with all the others is a single matrix-vector product.
+
+The game counts are kept by league: on a data refresh, only the new or corrected games (content hash) are read from
+the store, and the matrix is rebuilt from the counts in milliseconds.
+"""
+import numpy as np
+import pandas as pd
+from .cache import game_results
+from .cube import ZONE_COUNT
+from .data import team_names
+from .lineups import RED_CARDS
+from .sequences import has_qualifier
+from .utils import defensive_actions
+
+PASS_TYPES = ["Pass"]
+TAKE_ON_TYPES = ["TakeOn"]
+
+COUNT_COLUMNS = ["passes", "successful_passes", "take_ons", "successful_take_ons", "shots", "xg",
+                 "defensive_actions", "pass_xt", "events"] + [f"zone_{zone}" for zone in range(ZONE_COUNT)]
+
+RATE_FEATURES = ["passes", "take_ons", "shots", "xg", "defensive_actions", "pass_xt"]
+SIMILARITY_FEATURES = ([f"{feature}_p90" for feature in RATE_FEATURES] + ["pass_success", "take_on_success"]
+                       + [f"zone_{zone}_share" for zone in range(ZONE_COUNT)])
+
+# Players with fewer minutes in the season are not indexed (their rates are too noisy)
+MIN_MINUTES = 270
+
+def game_player_counts(df):
+    """
+    Count the events of each player in each game, and the minutes played.
+
+    Parameters:
+    - df (pd.DataFrame): The events of one or several games, with the store columns game_id, team_id, player_name,
+      type_name, outcome, minute, start_x, start_y, zone, xg and qualifiers.
+
+    Returns:
+    - pd.DataFrame: One row per game, team and player, with the minutes and COUNT_COLUMNS.
+    """
+    keys = ["game_id", "team_id", "player_name"]
+    type_name = df["type_name"].to_numpy()
+    successful = (df["outcome"] == True).to_numpy()
+    is_pass = np.isin(type_name, PASS_TYPES)
+    is_take_on = np.isin(type_name, TAKE_ON_TYPES)
+    # Expected threat of the successful passes, as calculate_expected_threat
+    distance = np.hypot(100 - df["start_x"].to_numpy(dtype=float), 50 - df["start_y"].to_numpy(dtype=float))
+    zone = df["zone"].to_numpy()
+
+    counts = pd.DataFrame({"passes": is_pass,
+                           "successful_passes": is_pass & successful,
+                           "take_ons": is_take_on,
+                           "successful_take_ons": is_take_on & successful,
+                           "shots": (df["shot"] == True).to_numpy(),
+                           "xg": np.nan_to_num(df["xg"].to_numpy(dtype=float)),
+                           "defensive_actions": defensive_actions(type_name, successful),
+                           "pass_xt": np.where(is_pass & successful, np.exp(-0.1 * np.nan_to_num(distance, nan=np.inf)), 0),
+                           "events": zone >= 0}, index=df.index).astype(float)
+    zones = np.zeros((len(df), ZONE_COUNT))
+    zones[np.flatnonzero(zone >= 0), zone[zone >= 0]] = 1
+    counts[[f"zone_{zone}" for zone in range(ZONE_COUNT)]] = zones
+    for key in keys:
+        counts[key] = df[key].to_numpy()
+    counts = counts[df["player_name"].notnull().to_numpy()].groupby(keys, sort=False)[COUNT_COLUMNS].sum()
+
+    counts.insert(0, "minutes", minutes_played(df, counts.index))
+    return counts.reset_index()
+
+def minutes_played(df, players):
+    """
+    Get the minutes played by players in their games, from the substitutions and red cards as in the lineup
+    timeline of a game (see lineups).
+
+    Parameters:
+    - df (pd.DataFrame): The events of one or several games, with the store columns game_id, team_id, player_name,
+      type_name, minute and qualifiers.
+    - players (pd.MultiIndex): The (game_id, team_id, player_name) of the players.
+
+    Returns:
+    - np.array: The minutes played by each player.
+    """
+    events = df[df["player_name"].notnull()]
+    last_minute = df.groupby("game_id")["minute"].max()
+
+    def first_minute(mask):
+        return events[mask].groupby(["game_id", "team_id", "player_name"])["minute"].min().reindex(players).to_numpy(dtype=float)
+
+    sub_on = first_minute((events["type_name"] == "SubstitutionOn").to_numpy())
+    sub_off = first_minute((events["type_name"] == "SubstitutionOff").to_numpy())
+    red_card = first_minute((events["type_name"] == "Card").to_numpy() & has_qualifier(events["qualifiers"], RED_CARDS))
+    off_minute = np.fmin(sub_off, red_card)
+    game_last_minute = last_minute.reindex(players.get_level_values("game_id")).to_numpy(dtype=float)
+    return np.maximum(np.where(np.isnan(off_minute), game_last_minute, off_minute) - np.where(np.isnan(sub_on), 0, sub_on), 0)
+
+def season_features(counts):
+    """
+    Compute the season features of the players from their game counts.
+
+    Parameters:
+    - counts (pd.DataFrame): The game counts (game_player_counts), of one or several leagues (league column).
+
+    Returns:
+    - pd.DataFrame: One row per league, team and player with the games, the minutes and SIMILARITY_FEATURES.
+    """
+    totals = counts.groupby(["league", "team_id", "player_name"], sort=False).agg(games=("game_id", "nunique"),
+                                                                                 **{column: (column, "sum") for column in ["minutes"] + COUNT_COLUMNS})
+    minutes = totals["minutes"].to_numpy()
+    features = pd.DataFrame(index=totals.index)
+    features["games"] = totals["games"]
+    features["minutes"] = minutes
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for feature in RATE_FEATURES:
+            features[f"{feature}_p90"] = np.where(minutes > 0, totals[feature].to_numpy() / minutes * 90, 0)
+        features["pass_success"] = np.where(totals["passes"] > 0, totals["successful_passes"] / totals["passes"], 0)
+        features["take_on_success"] = np.where(totals["take_ons"] > 0, totals["successful_take_ons"] / totals["take_ons"], 0)
+        events = totals["events"].to_numpy()[:, None]
+        zones = totals[[f"zone_{zone}" for zone in range(ZONE_COUNT)]].to_numpy()
+        features[[f"zone_{zone}_share" for zone in range(ZONE_COUNT)]] = np.where(events > 0, zones / events, 0)
+    return features.reset_index()
+
+class SimilarityIndex:
+    """
+    Normalized feature matrix of the players of one or several leagues, for the similar players queries.
+    """
+    def __init__(self, counts, min_minutes=MIN_MINUTES):
+        """
+        Parameters:
+        - counts (pd.DataFrame): The game counts of the players (game_player_counts), with a league column.
+        - min_minutes (int): The minimum number of minutes played in the season to be indexed.
+        """
+        self.counts = counts
+        self.min_minutes = min_minutes
+        features = season_features(counts)
+        self.players = features[features["minutes"] >= min_minutes].reset_index(drop=True)
+        self.players.insert(2, "team_name", self.players["team_id"].map(team_names))
+
+        values = self.players[SIMILARITY_FEATURES].to_numpy(dtype=float)
+        self.mean = values.mean(axis=0) if len(values) else np.zeros(len(SIMILARITY_FEATURES))
+        scale = values.std(axis=0) if len(values) else np.ones(len(SIMILARITY_FEATURES))
+        self.scale = np.where(scale < 1e-9, 1, scale)
+        matrix = (values - self.mean) / self.scale
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = matrix / np.where(norms < 1e-9, 1, norms)
+        self.lookup = {(row.player_name, row.team_name): k for k, row in enumerate(self.players[["player_name", "team_name"]].itertuples(index=False))}
+
+    def combine(self, *others):
+        """
+        Build the index of several leagues, the features standardized over all their players.
+
+        Parameters:
+        - others (SimilarityIndex): The indexes of the other leagues.
+
+        Returns:
+        - SimilarityIndex: The cross-league index.
+        """
+        return SimilarityIndex(pd.concat([self.counts] + [other.counts for other in others], ignore_index=True), self.min_minutes)
+
+    def player_row(self, player, club=None):
+        """
+        Get the row of a player in the matrix.
+
+        Parameters:
+        - player (string): The player name.
+        - club (string): The club name, the first club of the player if None.
+
+        Returns:
+        - int: The row of the player.
+        """
+        if club is not None and (player, club) in self.lookup:
+            return self.lookup[(player, club)]
+        rows = np.flatnonzero((self.players["player_name"] == player).to_numpy())
+        if club is not None or len(rows) == 0:
+            raise LookupError(f"{player} is not indexed (unknown player or less than {self.min_minutes} minutes played)")
+        return rows[0]
+
+    def similar_players(self, player, club=None, k=10, same_league=False):
+        """
+        Get the players most similar to a player (cosine similarity of their standardized features).
+
+        Parameters:
+        - player (string): The player name.
+        - club (string): The club of the player, to disambiguate two players with the same name.
+        - k (int): The number of similar players.
+        - same_league (bool): Only the players of the league of the player (for a cross-league index).
+
+        Returns:
+        - pd.DataFrame: The k most similar players (league, team, player, games, minutes, similarity and the features), most similar first.
+        """
+        return self.similar_players_batch([(player, club)], k, same_league)[0]
+
+    def similar_players_batch(self, queries, k=10, same_league=False):
+        """
+        Get the players most similar to several players, with one matrix product for all of them.
+
+        Parameters:
+        - queries (list): The (player name, club or None) of the query players.
+        - k (int): The number of similar players of each query.
+        - same_league (bool): Only the players of the league of each query player.
+
+        Returns:
+        - list: The similar players of each query (see similar_players).
+        """
+        rows = np.array([self.player_row(player, club) for player, club in queries], dtype=int)
+        similarities = self.matrix[rows] @ self.matrix.T
+        # The query player is not similar to itself
+        similarities[np.arange(len(rows)), rows] = -np.inf
+        if same_league:
+            leagues = self.players["league"].to_numpy()
+            similarities[leagues[rows][:, None] != leagues[None, :]] = -np.inf
+        k = min(k, max(len(self.players) - 1, 0))
+        results = []
+        for similarity in similarities:
+            top = np.argpartition(-similarity, k - 1)[:k] if k > 0 else np.zeros(0, dtype=int)
+            top = top[np.argsort(-similarity[top], kind="stable")]
+            top = top[np.isfinite(similarity[top])]
+            result = self.players.iloc[top].copy()
+            result.insert(6, "similarity", similarity[top].round(4))
+            results.append(result.reset_index(drop=True))
+        return results
+
+## Game counts of each league, kept from one data version to the next
+
+COUNT_SOURCE_COLUMNS = ["game_id", "team_id", "player_name", "type_name", "outcome", "minute", "start_x", "start_y",
+                        "zone", "shot", "xg", "qualifiers"]
+
+def league_similarity_index(league, store, min_minutes=MIN_MINUTES):
+    """
+    Build the similarity index of a league from its store, counting only the games not counted yet for this league
+    or whose content changed (ex: the new matchweek of the weekly refresh, a corrected game).
+
+    Parameters:
+    - league (string): The league name.
+    - store (LeagueStore): The memory-mapped league events.
+    - min_minutes (int): The minimum number of minutes played in the season to be indexed.
+
+    Returns:
+    - SimilarityIndex: The index of the league.
+    """
+    def count_games(game_ids):
+        counts = game_player_counts(store.games_table(game_ids).select(COUNT_SOURCE_COLUMNS).to_pandas())
+        counts.insert(0, "league", league)
+        return {game_id: game_counts for game_id, game_counts in counts.groupby("game_id", sort=False)}
+
+    counts = game_results("similarity", league).update(store.game_hashes, count_games)
+    if not counts:
+        return SimilarityIndex(pd.DataFrame(columns=["league", "game_id", "team_id", "player_name", "minutes"] + COUNT_COLUMNS), min_minutes)
+    return SimilarityIndex(pd.concat(counts.values(), ignore_index=True), min_minutes)
@@ -0,0 +1,229 @@
+"""
+League events held once per host in a memory-mapped Arrow IPC file.
+
+The file is written uncompressed, sorted by game, with the row range of each game in the schema metadata.
+Every process (streamlit sessions, API workers) maps the same file, so the league data lives once in the
+OS page cache, and a game is a zero-copy slice of the league table.
+
+Each game carries a content hash of its events, written at ingest: the hashes of all the games are the version
+vector of the league, and the league version is a digest of this vector. The game caches are keyed on the game
+hash, so after a data refresh only the new or corrected games are prepared again (see League).
+
+The search manifest of the league (the games of each player and club) is written in the metadata too, the player
+and club search index of all the leagues is built from it without reading the events (see search).
+"""
+import hashlib
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from .logos import ROOT_DIR
+from .clock import add_game_clock
+from .cube import add_zones
+from .game_state import add_game_state
+from .search import search_manifest
+from .sequences import add_possessions
+from .xg import add_xg, dump_xg_model, load_xg_model
+
+CACHE_DIR = os.environ.get("GAME_ANALYZER_CACHE_DIR", os.path.join(ROOT_DIR, "cache"))
+
+# Version of the columns computed at ingest, the Arrow files written with another format are rebuilt
+STORE_FORMAT = "9"
+
+def league_store_path(league, cache_dir=None):
+    """
+    Get the path of the Arrow file of a league.
+
+    Parameters:
+    - league (string): The league name.
+    - cache_dir (string): The folder of the Arrow files, defaults to CACHE_DIR.
+
+    Returns:
+    - string: The path of the league Arrow file.
+    """
+    return os.path.join(cache_dir or CACHE_DIR, "{league}_events.arrow".format(league=league.replace(" ", "_")))
+
+# The xG model of the previous store is kept on a refresh until the league has this much more shots (a refit
+# changes the xG, hence the content hash, of most games)
+XG_REFIT_GROWTH = 0.2
+
+def game_hashes(df, starts, stops):
+    """
+    Compute the content hash of each game, from the hashes of its rows (all the columns, derived ones included).
+
+    Parameters:
+    - df (pd.DataFrame): The league events, sorted by game.
+    - starts (np.array): The first row of each game.
+    - stops (np.array): The row after the last one of each game.
+
+    Returns:
+    - list: The hash of each game.
+    """
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return [hashlib.sha1(row_hashes[start:stop].tobytes()).hexdigest()[:16] for start, stop in zip(starts, stops)]
+
+def write_league_store(df, path, xg_model=None, xg_shots=0, league=None):
+    """
+    Write the league events in an Arrow IPC file, sorted by game so that each game is a contiguous row range.
+
+    Parameters:
+    - df (pd.DataFrame): The normalized league events, ordered by date.
+    - path (string): The path of the Arrow file.
+    - xg_model (XGModel): The xG model of the previous store, refitted if None or if the league has
+      XG_REFIT_GROWTH more shots than when it was fitted.
+    - xg_shots (int): The number of shots the previous model was fitted on.
+    - league (string): The league name, for the search index.
+    """
+    # Stable sort: the games stay ordered by date and the events are ordered by the game clock inside a game
+    # (the events of the same second keep their order)
+    df = add_game_clock(df).sort_values(by=["date", "game_id", "clock"], kind="stable").reset_index(drop=True)
+    df = add_game_state(add_zones(add_possessions(df)))
+    # xG model fitted on all the shots of the league, the xG of the season predicted in one call
+    shots = int((df["shot"] == True).sum())
+    if xg_model is None or shots > xg_shots * (1 + XG_REFIT_GROWTH):
+        xg_model, xg_shots = None, shots
+    df, xg_model = add_xg(df, xg_model)
+
+    game_ids = df["game_id"].to_numpy()
+    # No game at all for an empty frame (ex: no new game since the last refresh)
+    starts = np.flatnonzero(np.r_[True, game_ids[1:] != game_ids[:-1]]) if len(df) else np.zeros(0, dtype=int)
+    stops = np.r_[starts[1:], len(df)]
+    hashes = game_hashes(df, starts, stops)
+    games = [{"game_id": int(game_ids[start]), "game": df.at[start, "game"], "date": df.at[start, "date"], "score": df.at[start, "score"],
+              "start": int(start), "stop": int(stop), "hash": game_hash} for start, stop, game_hash in zip(starts, stops, hashes)]
+
+    # Fingerprint of the content (digest of the version vector), used as the data version by the season caches
+    version = hashlib.sha1(" ".join(f"{game['game_id']}:{game['hash']}" for game in games).encode()).hexdigest()[:16]
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = {b"games": json.dumps(games).encode(), b"version": version.encode(), b"format": STORE_FORMAT.encode(),
+                b"xg_model": dump_xg_model(xg_model).encode(), b"xg_shots": str(xg_shots).encode(),
+                b"league": (league or "").encode(), b"search": json.dumps(search_manifest(df)).encode()}
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write in a temporary file then rename, the processes which mapped the previous file keep reading it safely
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+class LeagueStore:
+    """
+    Memory-mapped view of the league events, with zero-copy per-game slices.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.source = pa.memory_map(path, "r")
+        self.table = pa.ipc.open_file(self.source).read_all()
+        self.games = json.loads(self.table.schema.metadata[b"games"])
+        self.version = self.table.schema.metadata[b"version"].decode()
+        self.xg_model = load_xg_model(self.table.schema.metadata[b"xg_model"])
+        self.offsets = {game["game_id"]: (game["start"], game["stop"]) for game in self.games}
+        # Version vector of the league: the content hash of each game
+        self.game_hashes = {game["game_id"]: game["hash"] for game in self.games}
+
+    def game_table(self, game_id):
+        """
+        Get the events of a game as a zero-copy slice of the league table.
+
+        Parameters:
+        - game_id (int): The game id.
+
+        Returns:
+        - pa.Table: The events of the game.
+        """
+        if game_id not in self.offsets:
+            raise LookupError(f"Unknown game {game_id}")
+        start, stop = self.offsets[game_id]
+        return self.table.slice(start, stop - start)
+
+    def games_table(self, game_ids):
+        """
+        Get the events of several games as one table (zero-copy slices of the league table).
+
+        Parameters:
+        - game_ids (list): The game ids.
+
+        Returns:
+        - pa.Table: The events of the games, in the order of the game ids.
+        """
+        if not game_ids:
+            return self.table.slice(0, 0)
+        return pa.concat_tables([self.game_table(game_id) for game_id in game_ids])
+
+    def game_events(self, game_id):
+        """
+        Get the events of a game as a DataFrame, only the rows of the game are materialized.
+
+        Parameters:
+        - game_id (int): The game id.
+
+        Returns:
+        - pd.DataFrame: The events of the game.
+        """
+        return self.game_table(game_id).to_pandas(split_blocks=True)
+
+    def to_pandas(self):
+        """
+        Get all the league events as a DataFrame (a full copy, for the season-level computations).
+
+        Returns:
+        - pd.DataFrame: The league events.
+        """
+        return self.table.to_pandas(split_blocks=True)
+
+def read_store_metadata(path):
+    """
+    Read the schema metadata of an Arrow file, without loading it.
+
+    Parameters:
+    - path (string): The path of the Arrow file.
+
+    Returns:
+    - dict: The metadata, empty if the file is missing.
+    """
+    if not os.path.exists(path):
+        return {}
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).schema.metadata or {}
+
+def read_store_format(path):
+    """
+    Read the format of an Arrow file, without loading it.
+
+    Parameters:
+    - path (string): The path of the Arrow file.
+
+    Returns:
+    - string: The store format, None if the file is missing.
+    """
+    return read_store_metadata(path).get(b"format", b"").decode() or None
+
+def open_league_store(league, load_events, cache_dir=None, max_age=None):
+    """
+    Open the Arrow file of a league, building it from the raw events when it is missing, too old or in another format.
+
+    Parameters:
+    - league (string): The league name.
+    - load_events (callable): Returns the raw league events DataFrame (csv file, S3 bucket...).
+    - cache_dir (string): The folder of the Arrow files, defaults to CACHE_DIR.
+    - max_age (int): Maximum age of the Arrow file in seconds, None to never rebuild it.
+
+    Returns:
+    - LeagueStore: The memory-mapped league events.
+    """
+    from .data import normalize_league_events
+
+    path = league_store_path(league, cache_dir)
+    metadata = read_store_metadata(path)
+    is_current = metadata.get(b"format", b"").decode() == STORE_FORMAT
+    if not is_current or (max_age is not None and time.time() - os.path.getmtime(path) > max_age):
+        # A refresh keeps the xG model of the current store, so that the unchanged games keep their content hash
+        xg_model = load_xg_model(metadata[b"xg_model"]) if is_current else None
+        xg_shots = int(metadata[b"xg_shots"]) if is_current else 0
+        write_league_store(normalize_league_events(load_events()), path, xg_model, xg_shots, league)
+    return LeagueStore(path)
@@ -1,5 +1,21 @@
 import numpy as np
 
+# Defensive actions of a player, counted only when successful (player defensive chart, similarity and percentiles)
+DEFENSIVE_TYPES = ["Tackle", "Interception", "BlockedPass", "Clearance", "Aerial"]
+
+def defensive_actions(type_name, outcome):
+    """
+    Select the successful defensive actions of the events.
+
+    Parameters:
+    - type_name (np.array): The type_name column of the events.
+    - outcome (np.array): The outcome column of the events.
+
+    Returns:
+    - np.array: The boolean mask of the successful defensive actions.
+    """
+    return np.isin(type_name, DEFENSIVE_TYPES) & (outcome == True)
+
 def check_card_type(qualifiers):
     """
     Check the card type from the event.
@@ -0,0 +1,182 @@
+"""
+Warm start of a fresh instance: restore a prebuilt cache snapshot, and warm the caches of a serving process.
+
+Usage:
+    # build the snapshot once, at image build time
+    python -m game_analyzer.warmup --data-dir csv_data --leagues "Ligue 1" "EPL" --create-snapshot snapshot
+
+    # restore it on each instance, at container start before the app or the API
+    python -m game_analyzer.warmup --snapshot snapshot
+
+The snapshot holds the Arrow files of the leagues (no download, no csv parse) and the matplotlib font list (no
+font scan on the first chart), files shared by all the processes of the instance. The in-process warm-up (warm_up:
+imports, game events, lineups, event counts, logo index, pitch templates and fonts) only benefits the process
+running it, so the command line does not run it: the API runs it in the initializer of each rendering process
+(--warm-up). A streamlit server warms its caches with its first session: the snapshot saves it the download, the
+csv parse and the font scan.
+"""
+import argparse
+import glob
+import os
+import shutil
+import time
+from .store import CACHE_DIR, STORE_FORMAT, league_store_path, open_league_store, read_store_format
+
+FONT_CACHE_PATTERN = "fontlist-v*.json"
+
+def copy_file(source, destination):
+    """
+    Copy a file atomically: the readers never see a partially copied file.
+
+    Parameters:
+    - source (string): The source path.
+    - destination (string): The destination path.
+    """
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    tmp_path = f"{destination}.{os.getpid()}.tmp"
+    shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, destination)
+
+def create_snapshot(load_events, leagues, snapshot_dir):
+    """
+    Build a cache snapshot: the Arrow files of the leagues and the matplotlib font list.
+
+    Parameters:
+    - load_events (callable): Returns the raw events DataFrame of a league name (csv file, S3 bucket...).
+    - leagues (list): The league names.
+    - snapshot_dir (string): The snapshot folder.
+
+    Returns:
+    - list: The paths of the snapshot files.
+    """
+    import matplotlib
+    from matplotlib import font_manager  # builds the font list in the matplotlib cache folder if missing
+
+    paths = []
+    for league in leagues:
+        open_league_store(league, lambda: load_events(league), cache_dir=snapshot_dir)
+        paths.append(league_store_path(league, snapshot_dir))
+    for source in glob.glob(os.path.join(matplotlib.get_cachedir(), FONT_CACHE_PATTERN)):
+        paths.append(os.path.join(snapshot_dir, "matplotlib", os.path.basename(source)))
+        copy_file(source, paths[-1])
+    return paths
+
+def restore_snapshot(snapshot_dir, cache_dir=None):
+    """
+    Restore a cache snapshot on a fresh instance.
+
+    The Arrow files are restored when the cache has no file of the current store format, or an older one, and the
+    font list is restored when matplotlib has none: a cache already up to date is left as is. A restored Arrow file
+    is dated from the restore, as a file built on the instance.
+    The font list must be restored before matplotlib.font_manager is imported (pyplot, mplsoccer...).
+
+    Parameters:
+    - snapshot_dir (string): The snapshot folder.
+    - cache_dir (string): The folder of the Arrow files, defaults to CACHE_DIR.
+
+    Returns:
+    - list: The restored files.
+    """
+    import matplotlib
+
+    restored = []
+    for source in glob.glob(os.path.join(snapshot_dir, "*.arrow")):
+        if read_store_format(source) != STORE_FORMAT:
+            continue
+        destination = os.path.join(cache_dir or CACHE_DIR, os.path.basename(source))
+        if read_store_format(destination) != STORE_FORMAT or os.path.getmtime(destination) < os.path.getmtime(source):
+            copy_file(source, destination)
+            # The max_age of the league stores starts at the restore: a snapshot built at image build time (often
+            # older than max_age) would otherwise be rebuilt from the raw events on the first request
+            os.utime(destination)
+            restored.append(destination)
+    for source in glob.glob(os.path.join(snapshot_dir, "matplotlib", FONT_CACHE_PATTERN)):
+        destination = os.path.join(matplotlib.get_cachedir(), os.path.basename(source))
+        if not os.path.exists(destination):
+            copy_file(source, destination)
+            restored.append(destination)
+    return restored
+
+def warm_up(load_league, leagues, games=10):
+    """
+    Warm the caches of the current process: imports, leagues, latest games, logo index, pitch templates and fonts.
+
+    Parameters:
+    - load_league (callable): Returns the (cached) League of a league name.
+    - leagues (list): The league names.
+    - games (int): The number of latest games prepared in each league (about a matchweek).
+
+    Returns:
+    - dict: The duration of each step in seconds.
+    """
+    timings = {}
+    start = time.perf_counter()
+
+    def step(name):
+        nonlocal start
+        timings[name] = time.perf_counter() - start
+        start = time.perf_counter()
+
+    # Chart dependencies, only imported when a chart is drawn otherwise
+    import mplsoccer.pitch
+    import seaborn
+    import PIL.Image
+    import fuzzywuzzy.process
+    from .passing_network import PassingNetwork
+    from .player_visualization import PlayerVisualization
+    from .positional_map import PositionalMap
+    step("imports")
+
+    league_games = []
+    for league in leagues:
+        league_data = load_league(league)
+        league_games += [(league_data, game_id) for game_id in list(league_data.game_ids.values())[-games:]]
+    step("leagues")
+
+    from .context import get_match_context
+    from .cube import game_cube
+    from .lineups import game_lineups
+
+    for league_data, game_id in league_games:
+        events_df, _ = league_data.game_events(game_id)
+        game_lineups(events_df)
+        game_cube(events_df)
+        # The match context resolves the logos of the clubs through the logo index
+        get_match_context(events_df)
+    step("games")
+
+    # First rendering: pitch templates, fonts lookup and chart style, with the chart of the latest game
+    if league_games:
+        from .rendering import encode_figure
+
+        league_data, game_id = league_games[-1]
+        events_df, _ = league_data.game_events(game_id)
+        encode_figure(PassingNetwork(events_df, (0, int(events_df["minute"].max()))).plot_passing_network(), "png")
+    step("first_chart")
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="csv_data", help="Folder (or fsspec url) with the league csv files")
+    parser.add_argument("--leagues", nargs="+", default=[], help="Leagues of the snapshot (--create-snapshot)")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--snapshot", default=None, help="Restore the cache snapshot of this folder")
+    group.add_argument("--create-snapshot", default=None, help="Build a cache snapshot in this folder")
+    args = parser.parse_args()
+
+    if args.create_snapshot is not None:
+        if not args.leagues:
+            parser.error("--create-snapshot needs --leagues")
+        from .data import league_events_path, load_league_events
+
+        load_events = lambda league: load_league_events(league_events_path(league, args.data_dir))
+        for path in create_snapshot(load_events, args.leagues, args.create_snapshot):
+            print(f"snapshot {path}")
+        return
+
+    start = time.perf_counter()
+    restored = restore_snapshot(args.snapshot)
+    print(f"snapshot {time.perf_counter() - start:8.2f}s  {len(restored)} files restored")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Expected goals (xG) of the shots: a logistic regression fitted per league on vectorized shot features.
+
+The features are extracted from the event columns and the qualifiers in one pass over all the shots (no per-row
+parsing), the model is fitted once per league when the league store is built, and the xG of every shot of the
+season is predicted in one call and stored in the "xg" column (NaN for the other events).
+
+Features:
+- distance: distance to the centre of the goal, in metres.
+- angle: angle of the goal mouth seen from the shot location, in radians.
+- head, big_chance, set_piece, penalty: qualifier flags.
+- goal_mouth_y, goal_mouth_z: where the shot crossed the goal line (distance to the centre of the goal mouth,
+  height), so the model is closer to a post-shot xG when they are recorded.
+- goal_mouth_missing: the goal mouth values are not recorded (blocked and most off-target shots), their
+  goal_mouth_y / goal_mouth_z are set to 0 and this flag carries their own effect.
+"""
+import json
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from .sequences import has_qualifier
+
+XG_FEATURES = ["distance", "angle", "head", "big_chance", "set_piece", "penalty", "goal_mouth_y", "goal_mouth_z", "goal_mouth_missing"]
+
+# Opta coordinates (0-100) to metres, and the goal mouth width
+PITCH_LENGTH = 105
+PITCH_WIDTH = 68
+GOAL_WIDTH = 7.32
+
+SET_PIECE_SHOT_QUALIFIERS = ["SetPiece", "FromCorner", "DirectFreekick", "ThrowinSetPiece"]
+
+XGModel = namedtuple("XGModel", ["features", "mean", "scale", "coefficients", "intercept"])
+
+def qualifier_value(qualifiers, name):
+    """
+    Extract vectorially the value of a qualifier.
+
+    Parameters:
+    - qualifiers (pd.Series): The qualifiers of the events, raw strings (as stored) or lists of dicts.
+    - name (string): The qualifier display name (ex: "GoalMouthY").
+
+    Returns:
+    - np.array: The qualifier values, NaN for the events without it.
+    """
+    if len(qualifiers) == 0:
+        return np.zeros(0)
+    values = qualifiers.fillna("").astype(str).str.extract(f"'displayName': '{name}'}}, 'value': '([-0-9.]+)'", expand=False)
+    return values.astype(float).to_numpy()
+
+def shot_features(shots):
+    """
+    Compute the xG features of the shots.
+
+    Parameters:
+    - shots (pd.DataFrame): The shots, with the start location (start_x / start_y, or x / y once prepared) and the qualifiers.
+
+    Returns:
+    - pd.DataFrame: The features (XG_FEATURES), on the index of the shots.
+    """
+    x_column, y_column = ("start_x", "start_y") if "start_x" in shots.columns else ("x", "y")
+    dx = (100 - shots[x_column].to_numpy(dtype=float)) * PITCH_LENGTH / 100
+    dy = (shots[y_column].to_numpy(dtype=float) - 50) * PITCH_WIDTH / 100
+    qualifiers = shots["qualifiers"]
+    # Missing goal mouth values (blocked shots) are flagged, their value alone would be a shot at the centre of the goal mouth
+    goal_mouth_y = qualifier_value(qualifiers, "GoalMouthY")
+    goal_mouth_z = qualifier_value(qualifiers, "GoalMouthZ")
+    return pd.DataFrame({"distance": np.hypot(dx, dy),
+                         "angle": np.arctan2(GOAL_WIDTH * dx, dx ** 2 + dy ** 2 - (GOAL_WIDTH / 2) ** 2),
+                         "head": has_qualifier(qualifiers, ["Head"]).astype(float),
+                         "big_chance": has_qualifier(qualifiers, ["BigChance"]).astype(float),
+                         "set_piece": has_qualifier(qualifiers, SET_PIECE_SHOT_QUALIFIERS).astype(float),
+                         "penalty": has_qualifier(qualifiers, ["Penalty"]).astype(float),
+                         "goal_mouth_y": np.nan_to_num(np.abs(goal_mouth_y - 50), nan=0),
+                         "goal_mouth_z": np.nan_to_num(goal_mouth_z, nan=0),
+                         "goal_mouth_missing": (np.isnan(goal_mouth_y) | np.isnan(goal_mouth_z)).astype(float)},
+                        index=shots.index, columns=XG_FEATURES)
+
+def fit_xg_model(features, goals, l2=1.0, iterations=25):
+    """
+    Fit a logistic regression of the goals on the shot features (Newton iterations with an L2 penalty).
+
+    Parameters:
+    - features (pd.DataFrame): The shot features.
+    - goals (np.array): True for the shots scored.
+    - l2 (float): The L2 penalty on the standardized coefficients, it keeps the model close to the
+      average conversion rate when a league has few shots.
+    - iterations (int): The maximum number of Newton iterations.
+
+    Returns:
+    - XGModel: The fitted model.
+    """
+    values = features.to_numpy(dtype=float)
+    goals = np.asarray(goals, dtype=float)
+    mean = values.mean(axis=0) if len(values) else np.zeros(values.shape[1])
+    scale = values.std(axis=0) if len(values) else np.ones(values.shape[1])
+    scale[scale < 1e-9] = 1
+    X = np.column_stack([np.ones(len(values)), (values - mean) / scale])
+    penalty = np.full(X.shape[1], l2)
+    penalty[0] = 0
+    # Start from the average conversion rate
+    rate = np.clip(goals.mean() if len(goals) else 0.1, 1e-3, 1 - 1e-3)
+    weights = np.zeros(X.shape[1])
+    weights[0] = np.log(rate / (1 - rate))
+    for _ in range(iterations):
+        p = 1 / (1 + np.exp(-X @ weights))
+        gradient = X.T @ (p - goals) + penalty * weights
+        hessian = (X * (p * (1 - p))[:, None]).T @ X + np.diag(penalty) + 1e-9 * np.eye(X.shape[1])
+        step = np.linalg.solve(hessian, gradient)
+        weights -= step
+        if np.abs(step).max() < 1e-8:
+            break
+    return XGModel(list(features.columns), mean.tolist(), scale.tolist(), weights[1:].tolist(), float(weights[0]))
+
+def fit_league_xg(df):
+    """
+    Fit the xG model of a league on all its shots.
+
+    Parameters:
+    - df (pd.DataFrame): The events of the league (or of a game).
+
+    Returns:
+    - XGModel: The fitted model.
+    """
+    shots = df[(df["shot"] == True).to_numpy()]
+    return fit_xg_model(shot_features(shots), (shots["goal"] == True).to_numpy())
+
+def predict_xg(model, features):
+    """
+    Predict the xG of a batch of shots.
+
+    Parameters:
+    - model (XGModel): The fitted model.
+    - features (pd.DataFrame): The shot features.
+
+    Returns:
+    - np.array: The xG of the shots.
+    """
+    values = (features[model.features].to_numpy(dtype=float) - np.array(model.mean)) / np.array(model.scale)
+    return 1 / (1 + np.exp(-(values @ np.array(model.coefficients) + model.intercept)))
+
+def add_xg(df, model=None):
+    """
+    Add the "xg" column to the events: the xG of the shots, NaN for the other events.
+
+    Parameters:
+    - df (pd.DataFrame): The events of a game or a season.
+    - model (XGModel): The model, fitted on the shots of df if None.
+
+    Returns:
+    - pd.DataFrame: The events with the xg column.
+    - XGModel: The model used.
+    """
+    if model is None:
+        model = fit_league_xg(df)
+    is_shot = (df["shot"] == True).to_numpy()
+    xg = np.full(len(df), np.nan)
+    xg[is_shot] = predict_xg(model, shot_features(df[is_shot]))
+    df["xg"] = xg
+    return df, model
+
+def dump_xg_model(model):
+    """
+    Serialize a model (stored in the league store metadata).
+
+    Parameters:
+    - model (XGModel): The model.
+
+    Returns:
+    - string: The JSON model.
+    """
+    return json.dumps(model._asdict())
+
+def load_xg_model(value):
+    """
+    Deserialize a model.
+
+    Parameters:
+    - value (string or bytes): The JSON model.
+
+    Returns:
+    - XGModel: The model.
+    """
+    return XGModel(**json.loads(value))